@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Query
 from langchain_core.messages import HumanMessage
-from src.agents.destination_agent import destination_graph
+from src.agents.registry import registry
 from src.agents.agent_utils import State
 from langgraph.types import Command
 from datetime import datetime, timezone
-import uuid
 from pydantic import BaseModel
+from backend.app.core.conversations import conversation_store
+from backend.app.core.streaming import sse_response, stream_graph_events
 
 
 class Inputs(BaseModel) : 
@@ -14,36 +15,44 @@ class Inputs(BaseModel) :
     
 router = APIRouter()
 
-destination_conversations = {}
+AGENT_ID = "destination_agent"
 
-@router.post("/search")
-async def search_destinations(inputs:Inputs):
-    thread_id = inputs.thread_id
-    if not thread_id:
-        thread_id = str(uuid.uuid4())
-        destination_conversations[thread_id] = []
-    
-    messages = destination_conversations.get(thread_id, [])
-    
-    messages.append(HumanMessage(content=inputs.thread_id))
-    
-    state = State(messages=messages)
-    
-    config = {
-    "configurable": {
-        "thread_id": thread_id
-    }
-    }
-    result = destination_graph.invoke(state , config=config)
-    response_message = result["messages"][-1]
-    
-    messages.append(response_message)
-    destination_conversations[thread_id] = messages
+
+def _finish_turn(config, final_state):
+    # The checkpointer holds the thread's full history; only its size is tracked here.
+    thread_id = config["configurable"]["thread_id"]
+    messages = final_state["messages"]
+    conversation_store.record(AGENT_ID, thread_id, messages)
     
     return {
-        "response": response_message.content,
-        "agent_id": "destination_agent",
+        "response": messages[-1].content,
+        "agent_id": AGENT_ID,
         "thread_id": thread_id,
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "messages_count": len(messages)
     }
+
+
+@router.post("/search")
+async def search_destinations(inputs: Inputs):
+    graph = (await registry.aget("destination")).graph
+    async with conversation_store.turn(AGENT_ID, graph.checkpointer, inputs.thread_id) as config:
+        state = State(messages=[HumanMessage(content=inputs.query)])
+        result: Command = await graph.ainvoke(state , config)
+        return _finish_turn(config, result)
+
+
+@router.post("/search/stream")
+async def stream_destinations(inputs: Inputs):
+    async def events():
+        graph = (await registry.aget("destination")).graph
+        async with conversation_store.turn(AGENT_ID, graph.checkpointer, inputs.thread_id) as config:
+            state = State(messages=[HumanMessage(content=inputs.query)])
+
+            async def on_complete(final_state):
+                return _finish_turn(config, final_state)
+
+            async for event in stream_graph_events(graph, state, config, on_complete):
+                yield event
+
+    return sse_response(events())
@@ -1,49 +1,84 @@
-from fastapi import APIRouter, Query
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
 from langchain_core.messages import HumanMessage
-from src.agents.flight_agent import flight_graph
+from src.agents.registry import registry
 from src.agents.agent_utils import State
 from langgraph.types import Command
 from datetime import datetime, timezone
-import uuid
 from pydantic import BaseModel
+from backend.app.core.conversations import conversation_store
+from backend.app.core.streaming import sse_response, stream_graph_events
 
 
 class Inputs(BaseModel) : 
     query : str  
     thread_id : str = Query(default=None) 
-    
+
+
+class FareCalendarInputs(BaseModel):
+    origin: str
+    destination: str
+    departure_date: str
+    flex_days: int = 3
+    return_date: Optional[str] = None
+    return_flex_days: Optional[int] = None
+    adults: int = 1
+    travel_class: Optional[str] = None
+
 router = APIRouter()
 
-flight_conversations = {}
+AGENT_ID = "flight"
 
-@router.post("/search")
-async def search_flights(inputs: Inputs):
-    thread_id = inputs.thread_id
-    if not thread_id:
-        thread_id = str(uuid.uuid4())
-        flight_conversations[thread_id] = []
-    
-    # Retrieve past messages for this thread
-    messages = flight_conversations.get(thread_id, [])
-    
-    messages.append(HumanMessage(content=inputs.query))
-    
-    state = State(messages=messages)
-    config = {
-    "configurable": {
-        "thread_id": thread_id
-    }
-    }
-    result: Command = flight_graph.invoke(state , config)
-    response_message = result["messages"][-1]
-    
-    messages.append(response_message)
-    flight_conversations[thread_id] = messages
+
+def _finish_turn(config, final_state):
+    # The checkpointer holds the thread's full history; only its size is tracked here.
+    thread_id = config["configurable"]["thread_id"]
+    messages = final_state["messages"]
+    conversation_store.record(AGENT_ID, thread_id, messages)
     
     return {
-        "response": response_message.content,
-        "agent_id": "flight",
+        "response": messages[-1].content,
+        "agent_id": AGENT_ID,
         "thread_id": thread_id,
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "messages_count": len(messages)
-    }
\ No newline at end of file
+    }
+
+
+@router.post("/search")
+async def search_flights(inputs: Inputs):
+    graph = (await registry.aget("flight")).graph
+    async with conversation_store.turn(AGENT_ID, graph.checkpointer, inputs.thread_id) as config:
+        state = State(messages=[HumanMessage(content=inputs.query)])
+        result: Command = await graph.ainvoke(state , config)
+        return _finish_turn(config, result)
+
+
+@router.post("/search/stream")
+async def stream_flights(inputs: Inputs):
+    async def events():
+        graph = (await registry.aget("flight")).graph
+        async with conversation_store.turn(AGENT_ID, graph.checkpointer, inputs.thread_id) as config:
+            state = State(messages=[HumanMessage(content=inputs.query)])
+
+            async def on_complete(final_state):
+                return _finish_turn(config, final_state)
+
+            async for event in stream_graph_events(graph, state, config, on_complete):
+                yield event
+
+    return sse_response(events())
+
+
+@router.post("/fare-calendar")
+async def fare_calendar(inputs: FareCalendarInputs):
+    # Imported here so the app still starts without loading any tool module (see src.agents.registry).
+    from src.tools.search_flights import afare_calendar
+
+    try:
+        return await afare_calendar(
+            inputs.origin, inputs.destination, inputs.departure_date, inputs.flex_days,
+            inputs.return_date, inputs.return_flex_days, inputs.adults, inputs.travel_class,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
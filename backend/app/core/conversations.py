@@ -0,0 +1,182 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+from dotenv import load_dotenv
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+from src.utils.checkpointer import SQLiteCheckpointer
+
+load_dotenv()
+
+
+def approx_size(messages: Sequence[BaseMessage]) -> int:
+    """Rough in-memory footprint of a history, in bytes of message text and tool-call arguments."""
+    size = 0
+    for message in messages:
+        size += len(str(message.content))
+        tool_calls = getattr(message, "tool_calls", None)
+        if tool_calls:
+            size += len(json.dumps(tool_calls, default=str))
+    return size
+
+
+@dataclass
+class _Thread:
+    agent: str
+    thread_id: str
+    checkpointer: Optional[BaseCheckpointSaver]
+    last_access: float
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    active: int = 0  # turns running or waiting on ``lock``; such threads are never evicted
+    size: int = 0
+    messages: int = 0
+
+
+class ConversationStore:
+    """Bookkeeping for the conversations held by the graphs' checkpointers.
+
+    The checkpointer keeps each thread's messages, so routers only send the
+    new user message and the history exists once. This store tracks when each
+    thread was last used and how large it is, serializes turns on the same
+    thread, and evicts threads when they expire (``ttl``), when there are more
+    than ``max_threads``, or when the tracked histories exceed ``max_bytes``,
+    least recently used first.
+
+    Evicting a thread deletes it from a process-local checkpointer such as
+    ``InMemorySaver``. A ``SQLiteCheckpointer`` is shared by every worker, and
+    this process may not have seen a thread that another worker is serving, so
+    evicting only stops tracking it there. Those files are instead swept every
+    ``sweep_interval`` seconds with ``expire(ttl)``, which uses the last write
+    time stored in the database. Only one worker sweeps a file per interval.
+    """
+
+    def __init__(self, max_threads: int = 1000, ttl: float = 6 * 3600, max_bytes: int = 256 * 1024 * 1024,
+                 sweep_interval: float = 300.0):
+        self.max_threads = max_threads
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self.evictions: Dict[str, int] = {"expired": 0, "max_threads": 0, "max_bytes": 0}
+        self.swept = 0
+        self._threads: "OrderedDict[tuple[str, str], _Thread]" = OrderedDict()
+        self._bytes = 0
+        self._durable: Dict[int, SQLiteCheckpointer] = {}
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ConversationStore":
+        return cls(
+            max_threads=int(os.getenv("CONVERSATION_MAX_THREADS", 1000)),
+            ttl=float(os.getenv("CONVERSATION_TTL", 6 * 3600)),
+            max_bytes=int(float(os.getenv("CONVERSATION_MAX_MB", 256)) * 1024 * 1024),
+            sweep_interval=float(os.getenv("CONVERSATION_SWEEP_INTERVAL", 300)),
+        )
+
+    def _checkout(self, agent: str, thread_id: str, checkpointer: Optional[BaseCheckpointSaver]) -> _Thread:
+        key = (agent, thread_id)
+        with self._lock:
+            thread = self._threads.get(key)
+            if thread is None:
+                thread = self._threads[key] = _Thread(agent, thread_id, checkpointer, time.time())
+            if isinstance(checkpointer, SQLiteCheckpointer):
+                self._durable[id(checkpointer)] = checkpointer
+            thread.last_access = time.time()
+            thread.active += 1
+            self._threads.move_to_end(key)
+            return thread
+
+    @asynccontextmanager
+    async def turn(self, agent: str, checkpointer: Optional[BaseCheckpointSaver],
+                   thread_id: Optional[str] = None) -> AsyncIterator[RunnableConfig]:
+        """Hold ``thread_id`` (a new one when None) for one turn and yield the graph config for it."""
+        thread = self._checkout(agent, thread_id or str(uuid.uuid4()), checkpointer)
+        try:
+            async with thread.lock:
+                yield {"configurable": {"thread_id": thread.thread_id}}
+        finally:
+            with self._lock:
+                thread.active -= 1
+                thread.last_access = time.time()
+                if (agent, thread.thread_id) in self._threads:
+                    self._threads.move_to_end((agent, thread.thread_id))
+            await self.evict()
+
+    def record(self, agent: str, thread_id: str, messages: Sequence[BaseMessage]) -> None:
+        """Update the tracked size of a thread from its history after a turn."""
+        size = approx_size(messages)
+        with self._lock:
+            thread = self._threads.get((agent, thread_id))
+            if thread is None:
+                return
+            self._bytes += size - thread.size
+            thread.size = size
+            thread.messages = len(messages)
+
+    def _pop_evictable(self) -> List[_Thread]:
+        now = time.time()
+        evicted = []
+        with self._lock:
+            for key, thread in list(self._threads.items()):
+                over_threads = len(self._threads) > self.max_threads
+                over_bytes = self._bytes > self.max_bytes
+                expired = now - thread.last_access > self.ttl
+                if not (expired or over_threads or over_bytes):
+                    # Threads are in LRU order: the rest are newer and the store is within bounds.
+                    break
+                if thread.active:
+                    continue
+                reason = "expired" if expired else "max_threads" if over_threads else "max_bytes"
+                self.evictions[reason] += 1
+                del self._threads[key]
+                self._bytes -= thread.size
+                evicted.append(thread)
+        return evicted
+
+    async def evict(self) -> int:
+        """Drop expired and over-capacity threads, with their process-local checkpoints; returns how many were evicted."""
+        evicted = self._pop_evictable()
+        for thread in evicted:
+            if thread.checkpointer is not None and not isinstance(thread.checkpointer, SQLiteCheckpointer):
+                await thread.checkpointer.adelete_thread(thread.thread_id)
+        await self.sweep()
+        return len(evicted)
+
+    async def sweep(self, force: bool = False) -> int:
+        """Expire idle threads in the shared checkpointers, at most once per ``sweep_interval``; returns how many."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now < self._next_sweep:
+                return 0
+            self._next_sweep = now + self.sweep_interval
+            durable = list(self._durable.values())
+        swept = 0
+        for checkpointer in durable:
+            swept += len(await checkpointer.aexpire(self.ttl, 0.0 if force else self.sweep_interval))
+        self.swept += swept
+        return swept
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "threads": len(self._threads),
+                "active_turns": sum(thread.active for thread in self._threads.values()),
+                "bytes": self._bytes,
+                "max_threads": self.max_threads,
+                "max_bytes": self.max_bytes,
+                "evictions": dict(self.evictions),
+                "swept_threads": self.swept,
+            }
+
+
+conversation_store = ConversationStore.from_env()
@@ -0,0 +1,75 @@
+import json
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict
+
+from fastapi.responses import StreamingResponse
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph.state import CompiledStateGraph
+
+# Nodes whose LLM output is internal (e.g. routing decisions) and never streamed to the client.
+HIDDEN_TOKEN_NODES = {"supervisor"}
+
+TOOL_OUTPUT_PREVIEW_CHARS = 500
+# Sent in place of the exception, which can carry upstream URLs, keys or file paths; the details are logged.
+STREAM_ERROR_MESSAGE = "The agent could not finish this answer. Please try again."
+
+logger = logging.getLogger(__name__)
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _chunk_text(chunk: Any) -> str:
+    content = getattr(chunk, "content", "")
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+
+async def stream_graph_events(
+    graph: CompiledStateGraph,
+    state: Dict[str, Any],
+    config: RunnableConfig,
+    on_complete: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+) -> AsyncIterator[str]:
+    """Run ``graph`` and translate its event stream into server-sent events.
+
+    Emits ``token`` events for LLM output, ``tool_start`` / ``tool_end`` around
+    tool calls and one ``final`` event whose payload is built by ``on_complete``
+    from the final graph state. A failure is logged and reported to the
+    client as an ``error`` event with a generic message and the error type.
+    """
+    try:
+        async for event in graph.astream_events(state, config, version="v2"):
+            kind = event["event"]
+            node = event.get("metadata", {}).get("langgraph_node")
+
+            if kind == "on_chat_model_stream":
+                text = _chunk_text(event["data"].get("chunk"))
+                if text and node not in HIDDEN_TOKEN_NODES:
+                    yield format_sse("token", {"content": text, "node": node})
+            elif kind == "on_tool_start":
+                yield format_sse("tool_start", {"tool": event["name"], "input": event["data"].get("input")})
+            elif kind == "on_tool_end":
+                output = event["data"].get("output")
+                output = getattr(output, "content", output)
+                yield format_sse(
+                    "tool_end",
+                    {"tool": event["name"], "output": str(output)[:TOOL_OUTPUT_PREVIEW_CHARS]},
+                )
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                final_state = event["data"].get("output") or {}
+                yield format_sse("final", await on_complete(final_state))
+    except Exception as e:
+        thread_id = (config.get("configurable") or {}).get("thread_id")
+        logger.exception("Streaming run failed for thread %s", thread_id)
+        yield format_sse("error", {"error": STREAM_ERROR_MESSAGE, "type": type(e).__name__})
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,8 +1,29 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from backend.app.core.config import settings
 from backend.app.api import flight, hotels, destination , team
 from fastapi.middleware.cors import CORSMiddleware
-app = FastAPI(title=settings.PROJECT_NAME)
+from backend.app.core.conversations import conversation_store
+from src.agents.agent_utils import model_stats
+from src.agents.registry import registry
+from src.utils.http_client import aclose_http_clients, breaker_stats
+from src.utils.llm_cache import llm_cache_stats
+
+# Build every agent at startup instead of on the first request that needs it.
+AGENT_WARMUP = os.getenv("AGENT_WARMUP", "false").lower() in ("1", "true", "yes")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if AGENT_WARMUP:
+        await asyncio.to_thread(registry.warm)
+    yield
+    await aclose_http_clients()
+
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 
 app.add_middleware(
@@ -21,3 +42,31 @@ app.include_router(team.router, prefix=f"{settings.API_V1_STR}/team", tags=["Tea
 @app.get("/")
 def root():
     return {"message": "Travel Agent API is running 🚀 "}
+
+
+@app.get("/conversations/stats")
+def conversation_stats():
+    return conversation_store.stats()
+
+
+@app.get("/agents/stats")
+def agent_stats():
+    return {**registry.stats(), "models": model_stats()}
+
+
+@app.get("/llm-cache/stats")
+def llm_cache_statistics():
+    return llm_cache_stats()
+
+
+@app.get("/upstreams/stats")
+def upstream_stats():
+    return {"breakers": breaker_stats()}
+
+
+@app.get("/amadeus/stats")
+def amadeus_stats():
+    # Imported here: the Amadeus client pulls in LangChain, which the app does not otherwise load at startup.
+    from src.utils.amadeus import amadeus_limiter, amadeus_requests
+
+    return {"rate_limit": amadeus_limiter.stats(), "coalescing": amadeus_requests.stats()}
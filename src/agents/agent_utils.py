@@ -1,27 +1,215 @@
-from typing import TypedDict  , Annotated  
-from langchain_core.messages import HumanMessage , AnyMessage
-from langchain_core.runnables import Runnable  , RunnableConfig
-from langgraph.graph.message import add_messages 
+import asyncio
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import TypedDict  , Annotated  , Callable , Dict , Optional
+from dotenv import load_dotenv
+from langchain_core.messages import AIMessage , HumanMessage , AnyMessage , ToolMessage
+from langchain_core.runnables import Runnable  , RunnableConfig , RunnableLambda
+from langgraph.graph.message import add_messages
+from src.agents.history import HistoryManager
+
+load_dotenv()
+
+
 class State(TypedDict):
     messages: Annotated[list[AnyMessage], add_messages]
 
 
+def graph_node(func: Callable, afunc: Callable, name: Optional[str] = None) -> RunnableLambda:
+    """Wrap a sync and an async implementation into one node usable by both ``invoke`` and ``ainvoke``."""
+    return RunnableLambda(func, afunc=afunc, name=name or getattr(func, "__name__", None))
+
+
+def _is_empty(results) -> bool:
+    return not results.tool_calls and (
+        not results.content
+        or (isinstance(results.content, list) and not results.content[0].get("text"))
+    )
+
+
+# Seconds before a model request is abandoned; the client raises and the assistant falls back.
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 60))
+# Model tried once an agent's own model keeps failing; unset to disable.
+FALLBACK_MODEL_ID = os.getenv("FALLBACK_MODEL_ID") or None
+
+NUDGE = "Respond with a real output"
+GIVE_UP_ANSWER = "Sorry, I could not produce an answer right now. Please try again."
+
+
+@dataclass
+class RetryPolicy:
+    """How often an assistant re-asks a model that returned an empty response.
+
+    Args:
+        max_attempts (int): Calls to the agent's own model per step, the first one included.
+        backoff (float): Seconds to wait before the second attempt, doubled after each further one.
+        max_backoff (float): Upper bound on the wait between attempts.
+    """
+
+    max_attempts: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 8.0
+
+    @classmethod
+    def from_env(cls, name: str) -> "RetryPolicy":
+        """Build a policy that can be overridden with ``<NAME>_RETRY_*`` variables."""
+        prefix = f"{name.upper()}_RETRY"
+        return cls(
+            max_attempts=max(1, int(os.getenv(f"{prefix}_MAX_ATTEMPTS", cls.max_attempts))),
+            backoff=float(os.getenv(f"{prefix}_BACKOFF", cls.backoff)),
+            max_backoff=float(os.getenv(f"{prefix}_MAX_BACKOFF", cls.max_backoff)),
+        )
+
+    def delay(self, attempt: int) -> float:
+        """Wait before ``attempt`` (1-based)."""
+        return 0.0 if attempt <= 1 else min(self.backoff * 2 ** (attempt - 2), self.max_backoff)
+
+
+_model_stats: Dict[str, Dict[str, int]] = {}
+_model_stats_lock = threading.Lock()
+
+
+def _count(model: Optional[str], counter: str) -> None:
+    with _model_stats_lock:
+        stats = _model_stats.setdefault(model or "unknown", dict.fromkeys(
+            ("calls", "empty", "errors", "fallbacks", "gave_up"), 0))
+        stats[counter] += 1
+
+
+def model_stats() -> Dict[str, Dict[str, object]]:
+    """Per-model call counters, with the share of calls that came back empty."""
+    with _model_stats_lock:
+        return {
+            model: {**stats, "empty_rate": stats["empty"] / stats["calls"] if stats["calls"] else 0.0}
+            for model, stats in _model_stats.items()
+        }
+
+
+def _tool_failed(message: ToolMessage) -> bool:
+    # Raised errors come back with status "error"; tools that catch their own errors return an {"error": ...} record.
+    if message.status == "error":
+        return True
+    try:
+        record = json.loads(message.content) if isinstance(message.content, str) else None
+    except ValueError:
+        return False
+    return isinstance(record, dict) and "error" in record
+
+
+def worker_failed(messages: list, start: int) -> bool:
+    """Whether the run that added ``messages[start:]`` failed.
+
+    It failed when it ended without an answer or with ``GIVE_UP_ANSWER``, or
+    when it called tools and every one of them returned an error.
+    """
+    added = messages[start:]
+    answer = added[-1] if added else None
+    if not isinstance(answer, AIMessage) or not answer.content or answer.content == GIVE_UP_ANSWER:
+        return True
+    tool_results = [msg for msg in added if isinstance(msg, ToolMessage)]
+    return bool(tool_results) and all(_tool_failed(msg) for msg in tool_results)
+
+
+def worker_update(state: State, results: Dict, name: str) -> Dict:
+    """Team state update carrying a worker's answer, signed with ``name``, and whether its run failed."""
+    return {
+        "messages": [AIMessage(content=results["messages"][-1].content, name=name)],
+        "worker_failed": worker_failed(results["messages"], len(state["messages"])),
+    }
+
+
 class Assistant:
-    def __init__(self, runnable: Runnable):
+    """Agent step calling the model, with a bounded retry when it returns nothing.
+
+    An empty response is retried with one nudge message appended (not one per
+    attempt, so the prompt does not grow) up to ``retry.max_attempts`` times
+    with backoff. Then ``fallback``, a second model with the same prompt and
+    tools, gets one try; an error from the agent's own model goes to
+    ``fallback`` straight away. If nothing produces an answer the step ends
+    with ``GIVE_UP_ANSWER``, which ``worker_failed`` reports to the team supervisor.
+    """
+
+    def __init__(self, runnable: Runnable, history: Optional[HistoryManager] = None,
+                 retry: Optional[RetryPolicy] = None, fallback: Optional[Runnable] = None,
+                 model: Optional[str] = None, fallback_model: Optional[str] = None):
         self.run = runnable
+        self.history = history
+        self.retry = retry or RetryPolicy()
+        self.fallback = fallback
+        self.model = model
+        self.fallback_model = fallback_model
+
+    def _prompt(self, state: State, attempt: int) -> State:
+        if attempt == 1:
+            return state
+        return {**state, "messages": state["messages"] + [HumanMessage(content=NUDGE)]}
+
+    def _usable(self, results, model: Optional[str]) -> bool:
+        _count(model, "calls")
+        if _is_empty(results):
+            _count(model, "empty")
+            return False
+        return True
+
+    def _give_up(self) -> Dict:
+        _count(self.model, "gave_up")
+        return {"messages": [AIMessage(content=GIVE_UP_ANSWER)]}
 
-    def __call__(self, state: State, config=RunnableConfig):
-        while True:
-            results = self.run.invoke(state)
-
-            # Check if assistant returned valid output
-            if not results.tool_calls and (
-                not results.content
-                or (isinstance(results.content, list) and not results.content[0].get("text"))
-            ):
-                message = state["messages"] + [HumanMessage(content="Respond with a real output")]
-                state = {**state, "messages": message}
-            else:
+    def __call__(self, state: State, config: Optional[RunnableConfig] = None):
+        if self.history is not None:
+            state = {**state, "messages": self.history.compact(state["messages"])}
+        for attempt in range(1, self.retry.max_attempts + 1):
+            time.sleep(self.retry.delay(attempt))
+            try:
+                results = self.run.invoke(self._prompt(state, attempt), config)
+            except Exception:
+                _count(self.model, "errors")
+                if self.fallback is None:
+                    raise
                 break
+            if self._usable(results, self.model):
+                return {"messages": [results]}
+
+        if self.fallback is not None:
+            _count(self.model, "fallbacks")
+            try:
+                results = self.fallback.invoke(state, config)
+            except Exception:
+                _count(self.fallback_model, "errors")
+                raise
+            if self._usable(results, self.fallback_model):
+                return {"messages": [results]}
+        return self._give_up()
+
+    async def acall(self, state: State, config: Optional[RunnableConfig] = None):
+        if self.history is not None:
+            state = {**state, "messages": await self.history.acompact(state["messages"])}
+        for attempt in range(1, self.retry.max_attempts + 1):
+            await asyncio.sleep(self.retry.delay(attempt))
+            try:
+                results = await self.run.ainvoke(self._prompt(state, attempt), config)
+            except Exception:
+                _count(self.model, "errors")
+                if self.fallback is None:
+                    raise
+                break
+            if self._usable(results, self.model):
+                return {"messages": [results]}
+
+        if self.fallback is not None:
+            _count(self.model, "fallbacks")
+            try:
+                results = await self.fallback.ainvoke(state, config)
+            except Exception:
+                _count(self.fallback_model, "errors")
+                raise
+            if self._usable(results, self.fallback_model):
+                return {"messages": [results]}
+        return self._give_up()
 
-        return {"messages": [results]}
\ No newline at end of file
+    def as_node(self) -> RunnableLambda:
+        """Graph node running ``__call__`` under ``invoke`` and ``acall`` under ``ainvoke``."""
+        return graph_node(self, self.acall, name="assistant")
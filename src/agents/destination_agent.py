@@ -8,60 +8,71 @@ from langchain_core.runnables import Runnable
 from langchain_core.runnables.config import RunnableConfig
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage, AnyMessage
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import InMemorySaver
+from src.utils.checkpointer import create_checkpointer
+from src.utils.llm_cache import llm_cache
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import tools_condition, ToolNode
 from langgraph.types import Command
 from langchain_together import ChatTogether
 from src.prompts.agents_prompts import DIESTINATION_AGENT_PROMPT
-from src.tools.destination_tools import get_tours_and_activities , city_search_amadeus , tavily_search_tool ,get_city_coordinates  , get_user_location
+from src.tools.destination_tools import get_tours_and_activities , city_search_amadeus , get_tavily_search_tool ,get_city_coordinates  , get_user_location
 from src.utils.help import *
 from langchain_groq import ChatGroq
 from src.utils.help import ChatOpenRouter
-from src.agents.agent_utils import Assistant , State
+from src.agents.agent_utils import FALLBACK_MODEL_ID, LLM_TIMEOUT, Assistant, RetryPolicy, State, worker_update
+from src.agents.history import HistoryManager
+from src.agents.registry import AgentGraphs, registry
 load_dotenv()
 model_id = os.environ.get("HOTEL_AGENT_MODEL_ID")
 
-tools = [
-    get_tours_and_activities , city_search_amadeus , tavily_search_tool ,get_city_coordinates , get_user_location
-]
  
 
-llm = ChatTogether(model_name=model_id , temperature=0.8 , max_tokens=8000)
-assistant_runnable = DIESTINATION_AGENT_PROMPT | llm.bind_tools(tools)
-
-
+def build_destination_agent() -> AgentGraphs:
+    """Build the destination agent's graphs; called once, on first use, by ``src.agents.registry``."""
+    tools = [
+        get_tours_and_activities , city_search_amadeus , get_tavily_search_tool() ,get_city_coordinates , get_user_location
+    ]
+    llm = ChatTogether(model_name=model_id , temperature=0.8 , max_tokens=8000, timeout=LLM_TIMEOUT, cache=llm_cache("destination_agent"))
+    assistant_runnable = DIESTINATION_AGENT_PROMPT | llm.bind_tools(tools)
+    fallback_runnable = None
+    if FALLBACK_MODEL_ID:
+        fallback_runnable = DIESTINATION_AGENT_PROMPT | llm.model_copy(update={"model_name": FALLBACK_MODEL_ID}).bind_tools(tools)
+    assistant = Assistant(
+        assistant_runnable,
+        HistoryManager.from_env("destination_agent"),
+        RetryPolicy.from_env("destination_agent"),
+        fallback=fallback_runnable,
+        model=model_id,
+        fallback_model=FALLBACK_MODEL_ID,
+    )
 
-destination_builder = StateGraph(State)
-destination_builder.add_node("assistant", Assistant(assistant_runnable))
-destination_builder.add_node("tools", create_tool_node_with_fallback(tools))
+    destination_builder = StateGraph(State)
+    destination_builder.add_node("assistant", assistant.as_node())
+    destination_builder.add_node("tools", create_tool_node_with_fallback(tools))
 
-destination_builder.add_edge(START, "assistant")
+    destination_builder.add_edge(START, "assistant")
 
-destination_builder.add_conditional_edges(
-    "assistant",
-    tools_condition, 
-)
+    destination_builder.add_conditional_edges(
+        "assistant",
+        tools_condition, 
+    )
 
-destination_builder.add_edge("tools", "assistant")
-destination_builder.set_finish_point("assistant")
+    destination_builder.add_edge("tools", "assistant")
+    destination_builder.set_finish_point("assistant")
 
-memory = InMemorySaver()
-destination_graph = destination_builder.compile(checkpointer=memory)
+    return AgentGraphs(
+        graph=destination_builder.compile(checkpointer=create_checkpointer("destination_agent")),
+        # Used as a team worker: the team graph checkpoints the conversation, so this copy keeps no history of its own.
+        worker=destination_builder.compile(checkpointer=False),
+    )
 
 
-def destination_node(state:State) : 
-    results = destination_graph.invoke(state) 
-    print(results)
-    return Command(
-        update={
-            "messages" : state["messages"] + [
-                AIMessage(content=results["messages"][-1].content , name="destination_node")
-            ]
-        } , 
-        goto="supervisor"
-    )
+def destination_node(state:State, config: RunnableConfig = None) : 
+    results = registry.get("destination").worker.invoke(state, config) 
+    return Command(update=worker_update(state, results, "destination_node"), goto="supervisor")
 
 
- 
- 
+async def adestination_node(state:State, config: RunnableConfig = None) : 
+    worker = (await registry.aget("destination")).worker
+    results = await worker.ainvoke(state, config) 
+    return Command(update=worker_update(state, results, "destination_node"), goto="supervisor")
@@ -0,0 +1,152 @@
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Keyword weights per worker; phrases are matched on word boundaries in the lower-cased query.
+KEYWORDS: Dict[str, Dict[str, int]] = {
+    "flight_agent": {
+        "flight": 3, "flights": 3, "fly": 3, "flying": 3, "airline": 3, "airlines": 3, "airfare": 3,
+        "plane": 2, "departure": 2, "departing": 2, "arrival": 2, "round trip": 2, "one way": 2,
+        "nonstop": 2, "non-stop": 2, "layover": 2, "boarding pass": 3, "flight status": 3,
+        "economy": 1, "business class": 2, "airport": 3, "airports": 3, "check-in link": 3,
+        "check-in links": 3, "online check-in": 3,
+    },
+    "hotel_agent": {
+        "hotel": 3, "hotels": 3, "accommodation": 3, "accommodations": 3, "hostel": 3, "resort": 2,
+        "motel": 3, "lodging": 3, "place to stay": 3, "where to stay": 3, "stay": 1, "room": 3,
+        "rooms": 3, "suite": 3, "nights": 1, "check-out": 1, "checkout": 1, "check out": 1,
+    },
+    "destination_agent": {
+        "things to do": 3, "activities": 3, "attractions": 3, "sightseeing": 3, "what to see": 3,
+        "restaurant": 3, "restaurants": 3, "food": 2, "cuisine": 3, "weather": 3, "best time": 3,
+        "culture": 2, "museum": 3, "museums": 3, "tour": 2, "tours": 2, "travel tips": 3, "tips": 1,
+        "guide": 1, "explore": 2, "visit": 1, "nightlife": 3, "beaches": 2, "landmarks": 3,
+    },
+}
+
+# "ALG to IST", "CDG-JFK", "LHR → DXB": two known location codes joined as a route.
+ROUTE_PATTERN = re.compile(r"\b([A-Z]{3})\s*(?:to|-|–|→|->|/)\s*([A-Z]{3})\b")
+# Airline flight numbers such as "AF1234" or "BA 117".
+FLIGHT_NUMBER_PATTERN = re.compile(r"\b(?:[A-Z]{2}|[A-Z]\d|\d[A-Z])\s?\d{2,4}\b")
+# ISO dates, "02/11/2026", "Nov 2", "2 November".
+DATE_PATTERN = re.compile(
+    r"\b\d{4}-\d{2}-\d{2}\b|\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b"
+    r"|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d{1,2}\b"
+    r"|\b\d{1,2}\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\b",
+    re.IGNORECASE,
+)
+
+
+def _keyword_pattern(keywords: Dict[str, int]) -> re.Pattern:
+    phrases = sorted(keywords, key=len, reverse=True)
+    return re.compile(r"(?<![\w-])(" + "|".join(re.escape(p) for p in phrases) + r")(?![\w-])")
+
+
+KEYWORD_PATTERNS = {worker: _keyword_pattern(keywords) for worker, keywords in KEYWORDS.items()}
+
+
+def _location_codes() -> FrozenSet[str]:
+    from src.utils.airports import get_airport_index
+    from src.utils.cities import get_city_index
+
+    return frozenset(get_airport_index().codes) | get_city_index().iata_codes()
+
+
+@dataclass
+class Classification:
+    worker: Optional[str]  # best-scoring worker, None without any signal
+    confidence: float  # share of the total score held by ``worker``
+    scores: Dict[str, int] = field(default_factory=dict)
+
+
+class FastRouter:
+    """Deterministic pre-router for single-domain queries.
+
+    Scores each worker from keywords, IATA route pairs, flight numbers and
+    dates, and routes without an LLM call only when one worker holds at least
+    ``min_confidence`` of the total score and ``min_score`` points; everything
+    else falls back to the LLM router.
+    """
+
+    def __init__(self, min_confidence: float = 0.85, min_score: int = 3, max_words: int = 40, enabled: bool = True):
+        self.min_confidence = min_confidence
+        self.min_score = min_score
+        self.max_words = max_words
+        self.enabled = enabled
+        self.lookups = 0
+        self.hits = 0
+        self.hits_by_worker: Dict[str, int] = {worker: 0 for worker in KEYWORDS}
+        self._codes: Optional[FrozenSet[str]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "FastRouter":
+        return cls(
+            min_confidence=float(os.getenv("FAST_ROUTER_MIN_CONFIDENCE", 0.85)),
+            min_score=int(os.getenv("FAST_ROUTER_MIN_SCORE", 3)),
+            enabled=os.getenv("FAST_ROUTER_ENABLED", "true").lower() in ("1", "true", "yes"),
+        )
+
+    @property
+    def codes(self) -> FrozenSet[str]:
+        if self._codes is None:
+            self._codes = _location_codes()
+        return self._codes
+
+    def classify(self, query: str) -> Classification:
+        text = query.lower()
+        scores = {worker: 0 for worker in KEYWORDS}
+        for worker, pattern in KEYWORD_PATTERNS.items():
+            for match in pattern.finditer(text):
+                scores[worker] += KEYWORDS[worker][match.group(1)]
+
+        if any(a in self.codes and b in self.codes and a != b for a, b in ROUTE_PATTERN.findall(query)):
+            scores["flight_agent"] += 4
+        if FLIGHT_NUMBER_PATTERN.search(query) and "status" in text:
+            scores["flight_agent"] += 3
+
+        total = sum(scores.values())
+        if not total:
+            return Classification(None, 0.0, scores)
+        worker = max(scores, key=scores.get)
+        # Dates back whichever domain the query already points at.
+        if DATE_PATTERN.search(query):
+            scores[worker] += 1
+            total += 1
+        return Classification(worker, scores[worker] / total, scores)
+
+    def route(self, query: str) -> Optional[str]:
+        """Worker to send ``query`` to, or None when the LLM router should decide."""
+        if not self.enabled:
+            return None
+        result = self.classify(query)
+        routed = (
+            result.worker is not None
+            and len(query.split()) <= self.max_words
+            and result.confidence >= self.min_confidence
+            and result.scores[result.worker] >= self.min_score
+        )
+        with self._lock:
+            self.lookups += 1
+            if routed:
+                self.hits += 1
+                self.hits_by_worker[result.worker] += 1
+        return result.worker if routed else None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "fallbacks": self.lookups - self.hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "hits_by_worker": dict(self.hits_by_worker),
+        }
+
+
+fast_router = FastRouter.from_env()
@@ -8,45 +8,64 @@ from langchain_core.runnables import Runnable
 from langchain_core.runnables.config import RunnableConfig
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage, AnyMessage
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import InMemorySaver
+from src.utils.checkpointer import create_checkpointer
+from src.utils.llm_cache import llm_cache
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import tools_condition, ToolNode
 from langgraph.types import Command
 from langchain_together import ChatTogether
 from src.prompts.agents_prompts import FLIGHT_AGENT_PROMPT
-from src.tools.search_flights import get_airport_name_from_iata , get_nearby_airports ,search_flight , book_flight_manually,get_checkin_links,check_flight_status 
+from src.tools.search_flights import get_airport_name_from_iata , get_nearby_airports ,search_flight , search_fare_calendar , search_flight_multi_airport , book_flight_manually,get_checkin_links,check_flight_status 
 from src.utils.help import *
 from langchain_groq import ChatGroq
 from src.utils.help import ChatOpenRouter
-from src.agents.agent_utils import State , Assistant
+from src.agents.agent_utils import FALLBACK_MODEL_ID, LLM_TIMEOUT, Assistant, RetryPolicy, State, worker_update
+from src.agents.history import HistoryManager
+from src.agents.registry import AgentGraphs, registry
 load_dotenv()
 model_id = os.environ.get("FLIGHT_AGENT_MODEL_ID")
 
-tools = [
-    get_airport_name_from_iata , get_nearby_airports ,search_flight , book_flight_manually,get_checkin_links,check_flight_status
-]
 
 
 
-llm = ChatTogether(model_name=model_id , temperature=0.8 , max_tokens=8000)
-assistant_runnable = FLIGHT_AGENT_PROMPT | llm.bind_tools(tools)
+def build_flight_agent() -> AgentGraphs:
+    """Build the flight agent's graphs; called once, on first use, by ``src.agents.registry``."""
+    tools = [
+        get_airport_name_from_iata , get_nearby_airports ,search_flight , search_fare_calendar , search_flight_multi_airport , book_flight_manually,get_checkin_links,check_flight_status
+    ]
+    llm = ChatTogether(model_name=model_id , temperature=0.8 , max_tokens=8000, timeout=LLM_TIMEOUT, cache=llm_cache("flight_agent"))
+    assistant_runnable = FLIGHT_AGENT_PROMPT | llm.bind_tools(tools)
+    fallback_runnable = None
+    if FALLBACK_MODEL_ID:
+        fallback_runnable = FLIGHT_AGENT_PROMPT | llm.model_copy(update={"model_name": FALLBACK_MODEL_ID}).bind_tools(tools)
+    assistant = Assistant(
+        assistant_runnable,
+        HistoryManager.from_env("flight_agent"),
+        RetryPolicy.from_env("flight_agent"),
+        fallback=fallback_runnable,
+        model=model_id,
+        fallback_model=FALLBACK_MODEL_ID,
+    )
 
-flight_builder = StateGraph(State)
-flight_builder.add_node("assistant", Assistant(assistant_runnable))
-flight_builder.add_node("tools", create_tool_node_with_fallback(tools))
+    flight_builder = StateGraph(State)
+    flight_builder.add_node("assistant", assistant.as_node())
+    flight_builder.add_node("tools", create_tool_node_with_fallback(tools))
 
-flight_builder.add_edge(START, "assistant")
+    flight_builder.add_edge(START, "assistant")
 
-flight_builder.add_conditional_edges(
-    "assistant",
-    tools_condition, 
-)
+    flight_builder.add_conditional_edges(
+        "assistant",
+        tools_condition, 
+    )
 
-flight_builder.add_edge("tools", "assistant")
-flight_builder.set_finish_point("assistant")
+    flight_builder.add_edge("tools", "assistant")
+    flight_builder.set_finish_point("assistant")
 
-memory = InMemorySaver()
-flight_graph = flight_builder.compile(checkpointer=memory)
+    return AgentGraphs(
+        graph=flight_builder.compile(checkpointer=create_checkpointer("flight_agent")),
+        # Used as a team worker: the team graph checkpoints the conversation, so this copy keeps no history of its own.
+        worker=flight_builder.compile(checkpointer=False),
+    )
 
 thread_id = str(uuid.uuid4())
 config = {
@@ -56,14 +75,12 @@ config = {
 }
 
 
-def flight_node(state:State) : 
-    results = flight_graph.invoke(state ) 
-    return Command(
-        update={
-            "messages" : state["messages"] + [
-                AIMessage(content=results["messages"][-1].content , name="flight_node")
-            ]
-        } , 
-        goto="supervisor"
-    )
+def flight_node(state:State, config: RunnableConfig = None) : 
+    results = registry.get("flight").worker.invoke(state, config) 
+    return Command(update=worker_update(state, results, "flight_node"), goto="supervisor")
+
 
+async def aflight_node(state:State, config: RunnableConfig = None) : 
+    worker = (await registry.aget("flight")).worker
+    results = await worker.ainvoke(state, config) 
+    return Command(update=worker_update(state, results, "flight_node"), goto="supervisor")
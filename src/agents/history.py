@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+from dotenv import load_dotenv
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_NAME = "history_summary"
+# Characters kept from each user question / answer in an extractive summary.
+SUMMARY_SNIPPET_CHARS = 300
+# Tool results older than the latest tool round are cut to this many characters when a turn is over budget.
+STALE_TOOL_RESULT_CHARS = 500
+
+# (previous summary or None, messages to fold in) -> new summary text
+Summarizer = Callable[[Optional[str], Sequence[AnyMessage]], str]
+
+
+def _text(message: AnyMessage) -> str:
+    content = message.content
+    if isinstance(content, list):
+        content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return " ".join(str(content).split())
+
+
+def _snippet(text: str, limit: int = SUMMARY_SNIPPET_CHARS) -> str:
+    return text if len(text) <= limit else text[:limit].rstrip() + "…"
+
+
+def extractive_summary(previous: Optional[str], messages: Sequence[AnyMessage]) -> str:
+    """Summary without an LLM call: each user question with the answer it got, tool traffic dropped."""
+    lines = [previous] if previous else []
+    for message in messages:
+        if isinstance(message, HumanMessage) and message.name != SUMMARY_NAME:
+            lines.append(f"- User: {_snippet(_text(message))}")
+        elif isinstance(message, AIMessage) and not message.tool_calls and _text(message):
+            speaker = message.name or "Assistant"
+            lines.append(f"  {speaker}: {_snippet(_text(message))}")
+    return "\n".join(lines)
+
+
+def llm_summarizer(llm: BaseChatModel) -> Summarizer:
+    """Summarizer that asks ``llm`` to extend the running summary with the new messages."""
+    def summarize(previous: Optional[str], messages: Sequence[AnyMessage]) -> str:
+        prompt = (
+            "Extend this summary of a travel-planning conversation with the new messages below. "
+            "Keep every concrete detail the user gave (cities, IATA codes, dates, travellers, budget) "
+            "and the options already proposed. Reply with the summary only.\n\n"
+            f"Current summary:\n{previous or '(none)'}\n\nNew messages:\n{extractive_summary(None, messages)}"
+        )
+        return _text(llm.invoke([HumanMessage(content=prompt)]))
+
+    return summarize
+
+
+@dataclass
+class CompactionReport:
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+def _turns(messages: Sequence[AnyMessage]) -> List[List[AnyMessage]]:
+    """Split at each user message, so tool calls always stay with their results."""
+    turns: List[List[AnyMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+class HistoryManager:
+    """Fit an agent's message history into a token budget before each LLM call.
+
+    The prompt's system message lives in the prompt template and is always
+    sent. When the history exceeds ``max_tokens``, the last ``keep_turns``
+    turns (a user message and everything after it) are kept verbatim and
+    older turns are folded into a rolling summary message. Summaries are
+    cached by the id of the last message they cover, so each call only
+    summarizes the turns that aged out since the previous one. If the kept
+    turns are still over budget, older ones are dropped into the summary too
+    and stale tool results in the current turn are shortened.
+
+    Args:
+        name (str): Agent name, used in ``stats()`` and ``from_env`` variables.
+        max_tokens (int): Approximate token budget for the messages sent to the LLM.
+        keep_turns (int): Recent turns always kept verbatim while they fit.
+        summarize: ``extractive_summary`` (default, no LLM call) or ``llm_summarizer(llm)``.
+        summary_tokens (int): Part of the budget reserved for the summary message.
+    """
+
+    def __init__(self, name: str, max_tokens: int = 6000, keep_turns: int = 3,
+                 summarize: Summarizer = extractive_summary, summary_tokens: int = 500,
+                 max_summaries: int = 256):
+        self.name = name
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        self.summarize = summarize
+        self.summary_tokens = summary_tokens
+        self.max_summaries = max_summaries
+        self.calls = 0
+        self.compacted_calls = 0
+        self.tokens_in = 0
+        self.tokens_sent = 0
+        self.last_report: Optional[CompactionReport] = None
+        self._summaries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, name: str, max_tokens: int = 6000, keep_turns: int = 3,
+                 summarize: Summarizer = extractive_summary) -> "HistoryManager":
+        """Build a manager whose budget can be overridden with ``<NAME>_HISTORY_*`` variables."""
+        prefix = f"{name.upper()}_HISTORY"
+        return cls(
+            name,
+            max_tokens=int(os.getenv(f"{prefix}_MAX_TOKENS", max_tokens)),
+            keep_turns=int(os.getenv(f"{prefix}_KEEP_TURNS", keep_turns)),
+            summarize=summarize,
+        )
+
+    def _cached_summary(self, older: Sequence[AnyMessage]) -> tuple[Optional[str], int]:
+        """Longest cached summary of a prefix of ``older`` and the number of messages it covers."""
+        with self._lock:
+            for i in range(len(older) - 1, -1, -1):
+                summary = self._summaries.get(older[i].id) if older[i].id else None
+                if summary is not None:
+                    self._summaries.move_to_end(older[i].id)
+                    return summary, i + 1
+        return None, 0
+
+    def _store_summary(self, last_id: Optional[str], summary: str) -> None:
+        if not last_id:
+            return
+        with self._lock:
+            self._summaries[last_id] = summary
+            while len(self._summaries) > self.max_summaries:
+                self._summaries.popitem(last=False)
+
+    def _summary_message(self, older: Sequence[AnyMessage]) -> Optional[HumanMessage]:
+        if not older:
+            return None
+        previous, covered = self._cached_summary(older)
+        summary = previous if covered == len(older) else self.summarize(previous, older[covered:])
+        self._store_summary(older[-1].id, summary)
+        return HumanMessage(content=f"[Summary of the earlier conversation]\n{summary}", name=SUMMARY_NAME)
+
+    def _shorten_stale_tool_results(self, turn: List[AnyMessage]) -> List[AnyMessage]:
+        last_call = max((i for i, m in enumerate(turn) if isinstance(m, AIMessage) and m.tool_calls), default=-1)
+        shortened = []
+        for i, message in enumerate(turn):
+            if isinstance(message, ToolMessage) and i < last_call and len(_text(message)) > STALE_TOOL_RESULT_CHARS:
+                message = message.model_copy(update={"content": _snippet(_text(message), STALE_TOOL_RESULT_CHARS)})
+            shortened.append(message)
+        return shortened
+
+    def compact(self, messages: Sequence[AnyMessage]) -> List[AnyMessage]:
+        """``messages`` trimmed to the budget; unchanged when they already fit."""
+        before = count_tokens_approximately(messages)
+        if before <= self.max_tokens:
+            self._record(CompactionReport(before, before))
+            return list(messages)
+
+        system = [m for m in messages if isinstance(m, SystemMessage)]
+        turns = _turns([m for m in messages if not isinstance(m, SystemMessage)])
+        keep = max(1, min(self.keep_turns, len(turns)))
+        budget = self.max_tokens - self.summary_tokens - count_tokens_approximately(system)
+        while keep > 1 and count_tokens_approximately([m for turn in turns[-keep:] for m in turn]) > budget:
+            keep -= 1
+
+        summary = self._summary_message([m for turn in turns[:-keep] for m in turn])
+        recent = [m for turn in turns[-keep:] for m in turn]
+        result = system + ([summary] if summary else []) + recent
+        if count_tokens_approximately(result) > self.max_tokens:
+            result = result[:-len(turns[-1])] + self._shorten_stale_tool_results(turns[-1])
+
+        self._record(CompactionReport(before, count_tokens_approximately(result)))
+        return result
+
+    async def acompact(self, messages: Sequence[AnyMessage]) -> List[AnyMessage]:
+        """Async counterpart of ``compact``; LLM summaries run off the event loop."""
+        if self.summarize is extractive_summary:
+            return self.compact(messages)
+        return await asyncio.to_thread(self.compact, messages)
+
+    def _record(self, report: CompactionReport) -> None:
+        with self._lock:
+            self.calls += 1
+            self.tokens_in += report.tokens_before
+            self.tokens_sent += report.tokens_after
+            self.last_report = report
+            if report.tokens_saved:
+                self.compacted_calls += 1
+        if report.tokens_saved:
+            logger.debug("[history:%s] %d -> %d tokens (%d saved)",
+                         self.name, report.tokens_before, report.tokens_after, report.tokens_saved)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "compacted_calls": self.compacted_calls,
+            "tokens_in": self.tokens_in,
+            "tokens_sent": self.tokens_sent,
+            "tokens_saved": self.tokens_in - self.tokens_sent,
+        }
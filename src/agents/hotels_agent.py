@@ -8,59 +8,71 @@ from langchain_core.runnables import Runnable
 from langchain_core.runnables.config import RunnableConfig
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage, AnyMessage
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import InMemorySaver
+from src.utils.checkpointer import create_checkpointer
+from src.utils.llm_cache import llm_cache
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import tools_condition, ToolNode
 from langgraph.types import Command
 from langchain_together import ChatTogether
 from src.prompts.agents_prompts import HOTEL_AGENT_PROMPT
-from src.tools.hotels_tools import get_hotel_offers ,search_hotels , tavily_search_tool
+from src.tools.hotels_tools import get_hotel_offers ,search_hotels , get_tavily_search_tool
 from src.utils.help import *
 from langchain_groq import ChatGroq
 from src.utils.help import ChatOpenRouter
-from src.agents.agent_utils import Assistant , State
+from src.agents.agent_utils import FALLBACK_MODEL_ID, LLM_TIMEOUT, Assistant, RetryPolicy, State, worker_update
+from src.agents.history import HistoryManager
+from src.agents.registry import AgentGraphs, registry
 load_dotenv()
 model_id = os.environ.get("HOTEL_AGENT_MODEL_ID")
 
-tools = [
-    get_hotel_offers ,search_hotels , tavily_search_tool
-]
  
 
-llm = ChatTogether(model_name=model_id , temperature=0.8 , max_tokens=8000)
-assistant_runnable = HOTEL_AGENT_PROMPT | llm.bind_tools(tools)
-
+def build_hotel_agent() -> AgentGraphs:
+    """Build the hotel agent's graphs; called once, on first use, by ``src.agents.registry``."""
+    tools = [
+        get_hotel_offers ,search_hotels , get_tavily_search_tool()
+    ]
+    llm = ChatTogether(model_name=model_id , temperature=0.8 , max_tokens=8000, timeout=LLM_TIMEOUT, cache=llm_cache("hotel_agent"))
+    assistant_runnable = HOTEL_AGENT_PROMPT | llm.bind_tools(tools)
+    fallback_runnable = None
+    if FALLBACK_MODEL_ID:
+        fallback_runnable = HOTEL_AGENT_PROMPT | llm.model_copy(update={"model_name": FALLBACK_MODEL_ID}).bind_tools(tools)
+    assistant = Assistant(
+        assistant_runnable,
+        HistoryManager.from_env("hotel_agent"),
+        RetryPolicy.from_env("hotel_agent"),
+        fallback=fallback_runnable,
+        model=model_id,
+        fallback_model=FALLBACK_MODEL_ID,
+    )
 
-    
-    
-    
+    hotel_builder = StateGraph(State)
+    hotel_builder.add_node("assistant", assistant.as_node())
+    hotel_builder.add_node("tools", create_tool_node_with_fallback(tools))
 
-hotel_builder = StateGraph(State)
-hotel_builder.add_node("assistant", Assistant(assistant_runnable))
-hotel_builder.add_node("tools", create_tool_node_with_fallback(tools))
+    hotel_builder.add_edge(START, "assistant")
 
-hotel_builder.add_edge(START, "assistant")
+    hotel_builder.add_conditional_edges(
+        "assistant",
+        tools_condition, 
+    )
 
-hotel_builder.add_conditional_edges(
-    "assistant",
-    tools_condition, 
-)
+    hotel_builder.add_edge("tools", "assistant")
+    hotel_builder.set_finish_point("assistant")
 
-hotel_builder.add_edge("tools", "assistant")
-hotel_builder.set_finish_point("assistant")
+    return AgentGraphs(
+        graph=hotel_builder.compile(checkpointer=create_checkpointer("hotel_agent")),
+        # Used as a team worker: the team graph checkpoints the conversation, so this copy keeps no history of its own.
+        worker=hotel_builder.compile(checkpointer=False),
+    )
 
-memory = InMemorySaver()
-hotel_graph = hotel_builder.compile(checkpointer=memory)
 
+def hotel_node(state:State, config: RunnableConfig = None) : 
+    results = registry.get("hotel").worker.invoke(state, config) 
+    return Command(update=worker_update(state, results, "hotel_node"), goto="supervisor")
 
-def hotel_node(state:State) : 
-    results = hotel_graph.invoke(state) 
-    return Command(
-        update={
-            "messages" : state["messages"] + [
-                AIMessage(content=results["messages"][-1].content , name="hotel_node")
-            ]
-        } , 
-        goto="supervisor"
-    )
 
+async def ahotel_node(state:State, config: RunnableConfig = None) : 
+    worker = (await registry.aget("hotel")).worker
+    results = await worker.ainvoke(state, config) 
+    return Command(update=worker_update(state, results, "hotel_node"), goto="supervisor")
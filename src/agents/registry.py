@@ -0,0 +1,74 @@
+import asyncio
+import importlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional
+
+from langgraph.graph.state import CompiledStateGraph
+
+# Agent name -> "module:factory". Modules are only imported when the agent is first needed,
+# so importing the API does not pull in the LLM clients, tool modules or graphs.
+AGENT_FACTORIES: Dict[str, str] = {
+    "flight": "src.agents.flight_agent:build_flight_agent",
+    "hotel": "src.agents.hotels_agent:build_hotel_agent",
+    "destination": "src.agents.destination_agent:build_destination_agent",
+    "team": "src.agents.team_agent:build_team_agent",
+}
+
+
+@dataclass(frozen=True)
+class AgentGraphs:
+    graph: CompiledStateGraph  # checkpointed graph served by the API
+    worker: Optional[CompiledStateGraph] = None  # checkpoint-free copy the team graph runs as a worker
+
+
+class AgentRegistry:
+    """Builds each agent's graphs on first use and keeps them for the life of the process.
+
+    ``get`` is safe to call from several threads; an agent is built once.
+    ``warm`` builds agents ahead of time, e.g. from the application lifespan.
+    """
+
+    def __init__(self, factories: Dict[str, str]):
+        self.factories = dict(factories)
+        self.build_seconds: Dict[str, float] = {}
+        self._agents: Dict[str, AgentGraphs] = {}
+        self._locks = {name: threading.Lock() for name in self.factories}
+
+    def _factory(self, name: str) -> Callable[[], AgentGraphs]:
+        module, _, attr = self.factories[name].partition(":")
+        return getattr(importlib.import_module(module), attr)
+
+    def get(self, name: str) -> AgentGraphs:
+        agent = self._agents.get(name)
+        if agent is not None:
+            return agent
+        if name not in self.factories:
+            raise KeyError(f"Unknown agent {name!r}; expected one of {sorted(self.factories)}")
+        with self._locks[name]:
+            if name not in self._agents:
+                start = time.perf_counter()
+                self._agents[name] = self._factory(name)()
+                self.build_seconds[name] = time.perf_counter() - start
+            return self._agents[name]
+
+    async def aget(self, name: str) -> AgentGraphs:
+        """``get`` without blocking the event loop while an agent is being built."""
+        agent = self._agents.get(name)
+        if agent is not None:
+            return agent
+        return await asyncio.to_thread(self.get, name)
+
+    def warm(self, names: Optional[Iterable[str]] = None) -> None:
+        for name in names or self.factories:
+            self.get(name)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "built": sorted(self._agents),
+            "build_seconds": {name: round(seconds, 3) for name, seconds in self.build_seconds.items()},
+        }
+
+
+registry = AgentRegistry(AGENT_FACTORIES)
@@ -0,0 +1,94 @@
+"""Measure the fast-path router, and optionally the LLM router, on the labeled benchmark set.
+
+    python -m src.agents.router_benchmark          # fast path only, no API keys needed
+    python -m src.agents.router_benchmark --llm    # also time and score the LLM router
+    python -m src.agents.router_benchmark --llm --cache   # replay LLM answers from the on-disk LLM cache
+
+With ``--cache`` the first run records the router's answers and later runs
+serve them without model calls, leaving only the routing overhead in the latencies.
+"""
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.agents.fast_router import FastRouter
+
+BENCHMARK_JSONL = Path(__file__).resolve().parent.parent / "data" / "router_benchmark.jsonl"
+
+
+def load_examples(path: Path = BENCHMARK_JSONL) -> List[Dict]:
+    """Labeled queries; ``worker`` is None for multi-domain or ambiguous ones the fast path must leave alone."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def evaluate_fast_path(examples: List[Dict], router: Optional[FastRouter] = None) -> Dict:
+    router = router or FastRouter()
+    routed, mistakes = 0, []
+    for example in examples:
+        worker = router.route(example["query"])
+        if worker is None:
+            continue
+        routed += 1
+        if worker != example["worker"]:
+            mistakes.append({**example, "routed_to": worker})
+    single = sum(1 for e in examples if e["worker"])
+    return {
+        "examples": len(examples),
+        "hit_rate": routed / len(examples),
+        "single_domain_coverage": (routed - len(mistakes)) / single if single else 0.0,
+        "precision": (routed - len(mistakes)) / routed if routed else 1.0,
+        "mistakes": mistakes,
+    }
+
+
+def evaluate_llm(examples: List[Dict], plan: Callable[[str], List[str]]) -> Dict:
+    """Score a router returning the planned workers for a query; multi-domain labels expect more than one."""
+    correct, latencies = 0, []
+    for example in examples:
+        start = time.perf_counter()
+        workers = plan(example["query"])
+        latencies.append(time.perf_counter() - start)
+        if example["worker"] is None:
+            correct += len(workers) != 1
+        else:
+            correct += workers == [example["worker"]]
+    return {
+        "examples": len(examples),
+        "accuracy": correct / len(examples),
+        "mean_latency_s": sum(latencies) / len(latencies),
+    }
+
+
+def _llm_plan(query: str) -> List[str]:
+    from langchain_core.messages import HumanMessage
+    from src.agents.team_agent import _router_messages, router_llm
+
+    response = router_llm().invoke(_router_messages({"messages": [HumanMessage(content=query)]}))
+    return list(response.get("workers") or [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm", action="store_true", help="also run the LLM router (needs API keys)")
+    parser.add_argument("--cache", action="store_true", help="serve repeated LLM calls from the on-disk LLM cache")
+    args = parser.parse_args()
+    if args.cache:
+        # Read when the router model is first built, below.
+        os.environ["LLM_CACHE"] = "sqlite"
+
+    examples = load_examples()
+    print("fast path:", json.dumps(evaluate_fast_path(examples), indent=2, ensure_ascii=False))
+    if args.llm:
+        print("llm router:", json.dumps(evaluate_llm(examples, _llm_plan), indent=2))
+        if args.cache:
+            from src.utils.llm_cache import llm_cache_stats
+
+            print("llm cache:", json.dumps(llm_cache_stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
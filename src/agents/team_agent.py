@@ -1,40 +1,87 @@
-from src.prompts.agents_prompts import COORDINATOR_AGENT_PROMPT
+from src.prompts.agents_prompts import COORDINATOR_AGENT_PROMPT, PARALLEL_DISPATCH_PROMPT, ROUTE_PLAN_PROMPT
+from typing import Optional
 from typing_extensions import TypedDict, Annotated, Literal
-from langchain_core.messages import AnyMessage, HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, SystemMessage
 from langgraph.graph.message import add_messages
-from langgraph.types import Command
+from langgraph.types import Command, Send
 from langchain_together import ChatTogether
 from dotenv import load_dotenv
 import os
+from functools import lru_cache
 from langgraph.graph import START, END, StateGraph
-from src.agents.flight_agent import flight_node
-from src.agents.hotels_agent import hotel_node
-from src.agents.destination_agent import destination_node
+from langchain_core.runnables import RunnableConfig
+from src.agents.flight_agent import flight_node, aflight_node
+from src.agents.hotels_agent import hotel_node, ahotel_node
+from src.agents.destination_agent import destination_node, adestination_node
+from src.agents.agent_utils import FALLBACK_MODEL_ID, LLM_TIMEOUT, graph_node
+from src.agents.fast_router import fast_router
+from src.agents.history import HistoryManager
+from src.agents.registry import AgentGraphs
 from src.utils.help import print_event
-from langgraph.checkpoint.memory import InMemorySaver
+from src.utils.checkpointer import create_checkpointer
+from src.utils.llm_cache import llm_cache
 import uuid
 from src.utils.help import ChatOpenRouter
 
 load_dotenv()
 model_id = os.environ.get("HOTEL_AGENT_MODEL_ID")
-llm = ChatTogether(model_name=model_id, temperature=0.85 , max_tokens=8000)
+
+# "sequential" routes to one worker at a time; "parallel" dispatches every needed worker at once
+# and merges their answers. Can be overridden per call with configurable["dispatch_mode"].
+TEAM_DISPATCH_MODE = os.getenv("TEAM_DISPATCH_MODE", "sequential").lower()
+
+WORKERS = ("flight_agent", "hotel_agent", "destination_agent")
+# Message name each worker signs its answer with, and the heading it gets in a merged answer.
+WORKER_SECTIONS = {
+    "flight_node": "✈️ Flights",
+    "hotel_node": "🏨 Hotels",
+    "destination_node": "🌍 Destination",
+}
+
+# Re-planning rounds allowed per user turn after a worker reports a failure.
+MAX_REPLANS = int(os.getenv("TEAM_MAX_REPLANS", 2))
+
+# The router only needs the gist of older turns to plan the current one.
+router_history = HistoryManager.from_env("team_router", max_tokens=4000, keep_turns=2)
 
 class State(TypedDict):
     messages: Annotated[list[AnyMessage], add_messages]
     next: str
     cur_reasoning: str
     query: str
+    plan: list[str]  # workers still to run this turn, in order
+    replans: int
+    fan_out: bool  # set on the input of workers dispatched in parallel
+    worker_failed: bool  # set by the worker that just answered; see agent_utils.worker_failed
+
+class RoutePlan(TypedDict):
+    workers: Annotated[list[Literal["flight_agent", "hotel_agent", "destination_agent"]], "every worker the request still needs, in order; empty to FINISH"]
+    reasoning: Annotated[str, "Support proper reasoning for routing to the workers"]
+
 
-class Router(TypedDict):
-    next: Annotated[Literal["flight_agent", "hotel_agent", "destination_agent", "FINISH"], "worker to route to next, or FINISH"]
-    reasoning: Annotated[str, "Support proper reasoning for routing to the worker"]
+@lru_cache(maxsize=None)
+def router_llm():
+    """The routing model with ``RoutePlan`` output, created on first use."""
+    llm = ChatTogether(model_name=model_id, temperature=0.85 , max_tokens=8000, timeout=LLM_TIMEOUT, cache=llm_cache("team_router"))
+    router = llm.with_structured_output(RoutePlan)
+    if FALLBACK_MODEL_ID:
+        router = router.with_fallbacks([llm.model_copy(update={"model_name": FALLBACK_MODEL_ID}).with_structured_output(RoutePlan)])
+    return router
 
-def supervisor_node(state: State) -> Command:
-    messages = [SystemMessage(content=COORDINATOR_AGENT_PROMPT)]
+
+def _dispatch_mode(config: RunnableConfig = None) -> str:
+    return ((config or {}).get("configurable") or {}).get("dispatch_mode", TEAM_DISPATCH_MODE)
+
+
+def _router_messages(state: State, parallel: bool = False) -> list:
+    messages = [SystemMessage(content=COORDINATOR_AGENT_PROMPT + (PARALLEL_DISPATCH_PROMPT if parallel else ROUTE_PLAN_PROMPT))]
     
     if state.get("messages"):
-        messages.extend(state["messages"])
-    
+        messages.extend(router_history.compact(state["messages"]))
+    return messages
+
+
+def _latest_query(state: State) -> str:
     # Try to extract the latest query
     query = state.get("query", "")
     if not query and state.get("messages"):
@@ -42,49 +89,156 @@ def supervisor_node(state: State) -> Command:
             if isinstance(msg, HumanMessage):
                 query = msg.content
                 break
-    
-    response = llm.with_structured_output(Router).invoke(messages)
-    goto = response["next"]
-    
-    
-    print(response)
-    if goto == "FINISH":
-        goto = END
-    
-    return Command(
-        goto=goto,
-        update={
-            "next": response["next"],
-            "cur_reasoning": response["reasoning"],
-            "query": query
-        }
-    )
+    return query
+
+
+def _worker_answer(state: State) -> Optional[AIMessage]:
+    """The last message when it is a worker's answer, i.e. the supervisor is mid-plan."""
+    last = state["messages"][-1] if state.get("messages") else None
+    if isinstance(last, AIMessage) and last.name in WORKER_SECTIONS:
+        return last
+    return None
+
+
+def _next_step(state: State) -> Optional[Command]:
+    """Next hop of the current plan, or None when the router has to (re-)plan.
+
+    The router is consulted on a new user turn and after a worker failure,
+    as long as ``MAX_REPLANS`` is not used up; otherwise the plan runs on.
+    """
+    if _worker_answer(state) is None:
+        return None
+    if state.get("worker_failed") and state.get("replans", 0) < MAX_REPLANS:
+        return None
+
+    plan = state.get("plan") or []
+    if not plan:
+        return Command(goto=END, update={"next": "FINISH", "plan": []})
+    return Command(goto=plan[0], update={"next": plan[0], "plan": plan[1:]})
 
-builder = StateGraph(State)
 
-builder.add_node("supervisor", supervisor_node)
-builder.add_node("flight_agent", flight_node)
-builder.add_node("hotel_agent", hotel_node)
-builder.add_node("destination_agent", destination_node)  # Added destination agent node
+def _fast_path(state: State) -> Optional[RoutePlan]:
+    """Plan for a new user turn the deterministic router is sure about, skipping the LLM call."""
+    if _worker_answer(state) is not None or not state.get("messages"):
+        return None
+    last = state["messages"][-1]
+    if not isinstance(last, HumanMessage) or not isinstance(last.content, str):
+        return None
+    worker = fast_router.route(last.content)
+    if worker is None:
+        return None
+    return {"workers": [worker], "reasoning": f"Fast path: unambiguous {worker} request"}
 
-builder.set_entry_point("supervisor")
 
-builder.add_conditional_edges(
-    "supervisor",
-    lambda state: state["next"],
-    {
-        "flight_agent": "flight_agent",
-        "hotel_agent": "hotel_agent",
-        "destination_agent": "destination_agent",  
-        "FINISH": END
+def _plan_workers(response: RoutePlan) -> list[str]:
+    return [worker for worker in dict.fromkeys(response.get("workers") or []) if worker in WORKERS]
+
+
+def _follow_plan(response: RoutePlan, state: State, query: str) -> Command:
+    """Start a new plan; later hops are taken by ``_next_step`` without another LLM call."""
+    workers = _plan_workers(response)
+    update = {
+        "next": workers[0] if workers else "FINISH",
+        "cur_reasoning": response["reasoning"],
+        "query": query,
+        "plan": workers[1:],
+        # A plan made after a worker answer is a re-plan; a new user turn starts the count over.
+        "replans": state.get("replans", 0) + 1 if _worker_answer(state) else 0,
+    }
+    return Command(goto=workers[0] if workers else END, update=update)
+
+
+def _fan_out(response: RoutePlan, state: State, query: str) -> Command:
+    """Send the request to every selected worker at once; they run in the same step."""
+    workers = _plan_workers(response)
+    update = {
+        "next": ",".join(workers) or "FINISH",
+        "cur_reasoning": response["reasoning"],
+        "query": query,
+        "plan": [],
     }
-)
+    if not workers:
+        return Command(goto=END, update=update)
+
+    worker_input = {**state, **update, "fan_out": True}
+    return Command(goto=[Send(worker, worker_input) for worker in workers], update=update)
+
+
+def supervisor_node(state: State, config: RunnableConfig = None) -> Command:
+    parallel = _dispatch_mode(config) == "parallel"
+    step = None if parallel else _next_step(state)
+    if step is not None:
+        return step
+
+    response = _fast_path(state) or router_llm().invoke(_router_messages(state, parallel), config)
+    if parallel:
+        return _fan_out(response, state, _latest_query(state))
+    return _follow_plan(response, state, _latest_query(state))
+
+
+async def asupervisor_node(state: State, config: RunnableConfig = None) -> Command:
+    parallel = _dispatch_mode(config) == "parallel"
+    step = None if parallel else _next_step(state)
+    if step is not None:
+        return step
+
+    response = _fast_path(state) or await router_llm().ainvoke(_router_messages(state, parallel), config)
+    if parallel:
+        return _fan_out(response, state, _latest_query(state))
+    return _follow_plan(response, state, _latest_query(state))
+
+
+def _after_worker(command: Command, state: State) -> Command:
+    # Workers hand back to the supervisor; in a parallel dispatch they hand to the merge step instead,
+    # without the failure flag, which only the supervisor's sequential plan reads.
+    if state.get("fan_out"):
+        update = {key: value for key, value in command.update.items() if key != "worker_failed"}
+        return Command(update=update, goto="merge")
+    return command
+
+
+def _team_worker(func, afunc, name: str):
+    """Worker node whose answer goes back to the supervisor, or to ``merge`` when dispatched in parallel."""
+    def run(state: State, config: RunnableConfig = None) -> Command:
+        return _after_worker(func(state, config), state)
+
+    async def arun(state: State, config: RunnableConfig = None) -> Command:
+        return _after_worker(await afunc(state, config), state)
+
+    return graph_node(run, arun, name=name)
+
+
+def merge_node(state: State) -> Command:
+    """Combine the answers of the workers dispatched this turn into one reply."""
+    answers = []
+    for msg in reversed(state["messages"]):
+        if isinstance(msg, HumanMessage):
+            break
+        if isinstance(msg, AIMessage) and msg.name in WORKER_SECTIONS:
+            answers.append(msg)
+    sections = list(WORKER_SECTIONS)
+    answers.sort(key=lambda msg: sections.index(msg.name))
+
+    if len(answers) == 1:
+        content = answers[0].content
+    else:
+        content = "\n\n".join(f"## {WORKER_SECTIONS[msg.name]}\n\n{msg.content}" for msg in answers)
+    return Command(
+        update={"messages": [AIMessage(content=content, name="team_merge")]},
+        goto=END,
+    )
 
-builder.add_edge("flight_agent", "supervisor")
-builder.add_edge("hotel_agent", "supervisor")
-builder.add_edge("destination_agent", "supervisor")  # Added destination agent return edge
+def build_team_agent() -> AgentGraphs:
+    """Build the supervisor graph; called once, on first use, by ``src.agents.registry``."""
+    builder = StateGraph(State)
 
-memory = InMemorySaver()
+    # Nodes route with Command(goto=...), so no static edges are needed between them.
+    builder.add_node("supervisor", graph_node(supervisor_node, asupervisor_node), destinations=(*WORKERS, END))
+    builder.add_node("flight_agent", _team_worker(flight_node, aflight_node, "flight_agent"), destinations=("supervisor", "merge"))
+    builder.add_node("hotel_agent", _team_worker(hotel_node, ahotel_node, "hotel_agent"), destinations=("supervisor", "merge"))
+    builder.add_node("destination_agent", _team_worker(destination_node, adestination_node, "destination_agent"), destinations=("supervisor", "merge"))
+    builder.add_node("merge", merge_node, destinations=(END,))
 
-final_graph = builder.compile(checkpointer=memory)
+    builder.set_entry_point("supervisor")
 
+    return AgentGraphs(graph=builder.compile(checkpointer=create_checkpointer("team_agent")))
@@ -127,7 +127,7 @@ TOOLS:
 
 1.  city_search_amadeus: Use this tool to identify cities based on keywords or partial names, specifying the optional country code where applicable. The tool provides essential metadata, including the IATA code, precise geographical coordinates, and related airport information.
 2.  get_city_coordinates: Retrieve the latitude and longitude for a specified city. This is crucial for interfacing with other tools, such as activity search, that require coordinate inputs.
-3.  get_tours_and_activities: Discover and list tours and activities available around a given location, using latitude and longitude coordinates. The tool returns detailed information, including name, customer ratings, pricing, visual media, and direct booking links.
+3.  get_tours_and_activities: Discover and list tours and activities available around a given location, using latitude and longitude coordinates. The tool returns detailed information, including name, customer ratings, pricing and direct booking links.
 4.  tavily_search_tool: Employ this general-purpose search tool as a fallback when the Amadeus API lacks sufficient or specific data. Ideal for gathering insights on local culture, travel tips, or unstructured information pertinent to a destination. Use judiciously to supplement, not replace, Amadeus data.
 5. If the user doesn't provide his city or something like that just recomande to him based on his city by using the tool  get_user_location to get his city then use this information to get tours and acitivities 
 
@@ -279,3 +279,37 @@ You MUST return a structured response with:
 
 Master Coordinator online. Analyzing requests and routing to optimal agents for comprehensive travel planning including flights, accommodations, and destination experiences.
 """
+
+
+ROUTE_PLAN_PROMPT = """
+## ROUTING PLAN 🗺️
+
+Instead of a single `next` agent, return the whole plan for this request at once:
+- `workers`: every agent still needed, in the priority order above (flights → hotels → destinations)
+- The agents run one after another **without consulting you again**, and the turn finishes after the last one
+- You are only called again if an agent reports a failure: then return the agents that are still needed, including a retry of the failed one only if it can do better
+- Return an empty `workers` list to FINISH (nothing to do, or clarification needed)
+
+**User**: "Plan my trip to Bangkok - need flights, hotel, and want to know about local attractions"
+→ `workers: ["flight_agent", "hotel_agent", "destination_agent"]`, `reasoning: "Complete travel planning request - flights, then accommodation, then activities"`
+
+**User**: "Find flights from London to Tokyo"
+→ `workers: ["flight_agent"]`, `reasoning: "Flight search request - routing to flight specialist"`
+"""
+
+
+PARALLEL_DISPATCH_PROMPT = """
+## PARALLEL DISPATCH MODE ⚡
+
+This turn runs in parallel mode, which overrides the one-agent-at-a-time routing above:
+- Select **every** agent the request needs in `workers`, all at once
+- The selected agents run concurrently and their answers are merged for the user, so there is no second routing step
+- Do not order agents by priority - order does not matter
+- Return an empty `workers` list when no agent is needed or the request needs clarification first
+
+**User**: "Plan my trip to Istanbul - flights from Paris, a hotel and things to do"
+→ `workers: ["flight_agent", "hotel_agent", "destination_agent"]`, `reasoning: "Complete trip request - all three specialists can work in parallel"`
+
+**User**: "Find me a hotel in Rome"
+→ `workers: ["hotel_agent"]`, `reasoning: "Hotel-only request"`
+"""
@@ -1,31 +1,38 @@
-from langchain_core.tools import tool 
 from dotenv import load_dotenv 
 from typing import Optional , Dict , List , Any 
 from pydantic import BaseModel , Field 
-import requests 
-from src.utils.help import get_amadeus_token 
+import httpx
+from src.utils.airports import get_airport_index
+from src.utils.amadeus import amadeus_get, amadeus_aget
+from src.utils.cities import City, get_city_index
+from src.utils.help import tool_with_async
+from src.utils.http_client import http_get, ahttp_get
+from src.utils.shaping import ResultShape
 from duckduckgo_search import DDGS
+from functools import lru_cache
 from langchain_tavily import TavilySearch
+from src.utils.tavily import TavilyAPIWrapper
 
 
 
 load_dotenv()
 
+AMADEUS_JSON_HEADERS = {"Accept": "application/vnd.amadeus+json"}
+
 class CitySearchInput(BaseModel):
     keyword: str = Field(description="Keyword that starts a city's name. Example: PARIS")
     countryCode: Optional[str] = Field(None, description="ISO 3166 Alpha-2 country code. Example: FR")
     max: Optional[int] = Field(3, description="Number of results to return")
     include: Optional[List[str]] = Field(default_factory=lambda: ["AIRPORTS"], description="Resources to include, e.g., AIRPORTS")
 
-@tool
-def city_search_amadeus(input: CitySearchInput) -> dict:
-    """Search for cities using a keyword and optional country code, using Amadeus API."""
-    token = get_amadeus_token()
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.amadeus+json"
-    }
+CITIES_PATH = "/v1/reference-data/locations/cities"
+ACTIVITIES_PATH = "/v1/shopping/activities"
+IP_LOCATION_URL = "http://ip-api.com/json/"
+# Airports listed with a locally resolved city when AIRPORTS is requested.
+CITY_AIRPORTS_RADIUS_KM = 50
 
+
+def _city_search_params(input: CitySearchInput) -> Dict[str, Any]:
     params = {
         "keyword": input.keyword,
         "max": input.max,
@@ -34,17 +41,91 @@ def city_search_amadeus(input: CitySearchInput) -> dict:
         params["countryCode"] = input.countryCode
     if input.include:
         params["include"] = ",".join(input.include)
+    return params
 
-    response = requests.get(
-        "https://test.api.amadeus.com/v1/reference-data/locations/cities",
-        headers=headers,
-        params=params
-    )
-    
-    if response.status_code != 200:
-        return {"error": f"Amadeus API error: {response.status_code}", "details": response.json()}
-    
-    return response.json()["data"]
+
+def _amadeus_error(response: httpx.Response) -> Dict:
+    return {"error": f"Amadeus API error: {response.status_code}", "details": response.json()}
+
+
+def _city_location(city: City, include: Optional[List[str]]) -> Dict[str, Any]:
+    location: Dict[str, Any] = {
+        "type": "location",
+        "subType": "city",
+        "name": city.name.upper(),
+        "address": {"countryCode": city.country},
+        "geoCode": {"latitude": city.latitude, "longitude": city.longitude},
+    }
+    if city.iata:
+        location["iataCode"] = city.iata
+    if include and "AIRPORTS" in include:
+        location["airports"] = [
+            {"iataCode": airport.iata, "name": airport.name, "distance_km": round(distance)}
+            for airport, distance in get_airport_index().nearby(
+                city.latitude, city.longitude, CITY_AIRPORTS_RADIUS_KM, limit=5, airline_only=True
+            )
+        ]
+    return location
+
+
+def _local_cities(input: CitySearchInput) -> List[City]:
+    return get_city_index().search(input.keyword, input.countryCode, input.max or 3)
+
+
+def _has_city_code(cities: List[City]) -> bool:
+    # Most bundled cities have no IATA code (Madrid, Berlin), and the hotel agent needs one, so those go to Amadeus.
+    return bool(cities) and cities[0].iata is not None
+
+
+def _city_search_result(cities: List[City], input: CitySearchInput, response: httpx.Response) -> str:
+    """Amadeus' cities, which are learned with their codes; the bundled matches if Amadeus has none or fails."""
+    if response.status_code == 200:
+        learned = _learn_cities(response)
+        if learned or not cities:
+            return CITY_SHAPE.render(learned)
+    elif not cities:
+        return CITY_SHAPE.render(_amadeus_error(response))
+    return CITY_SHAPE.render([_city_location(city, input.include) for city in cities])
+
+
+def _local_city_coordinates(input: CitySearchInput) -> Optional[Dict[str, float]]:
+    cities = get_city_index().search(input.keyword, input.countryCode, 1)
+    if not cities:
+        return None
+    return {"latitude": cities[0].latitude, "longitude": cities[0].longitude}
+
+
+def _learn_cities(response: httpx.Response) -> List[Dict[str, Any]]:
+    data = response.json()["data"]
+    get_city_index().add_amadeus_locations(data)
+    return data
+
+
+CITY_SHAPE = ResultShape(
+    "city_search_amadeus",
+    fields=("name", "iataCode", "address.countryCode", "geoCode.latitude", "geoCode.longitude", "airports"),
+    headers=("name", "iata", "country", "lat", "lon", "airports (iata name km)"),
+)
+
+
+async def _acity_search_amadeus(input: CitySearchInput) -> str:
+    cities = _local_cities(input)
+    if _has_city_code(cities):
+        return CITY_SHAPE.render([_city_location(city, input.include) for city in cities])
+
+    response = await amadeus_aget(CITIES_PATH, params=_city_search_params(input), headers=AMADEUS_JSON_HEADERS)
+    return _city_search_result(cities, input, response)
+
+
+@tool_with_async(_acity_search_amadeus)
+def city_search_amadeus(input: CitySearchInput) -> str:
+    """Search for cities using a keyword and optional country code, using Amadeus API."""
+    cities = _local_cities(input)
+    if _has_city_code(cities):
+        return CITY_SHAPE.render([_city_location(city, input.include) for city in cities])
+
+    response = amadeus_get(CITIES_PATH, params=_city_search_params(input), headers=AMADEUS_JSON_HEADERS)
+    return _city_search_result(cities, input, response)
 
 
 class ActivitiesInput(BaseModel):
@@ -52,81 +133,96 @@ class ActivitiesInput(BaseModel):
     longitude: float = Field(..., description="Longitude in decimal degrees. Example: 2.160873")
     radius: Optional[int] = Field(1, description="Search radius in km (0-20). Default is 1.")
 
-@tool
-def get_tours_and_activities(input: ActivitiesInput) -> dict:
-    """Returns tours and activities around a given location using the Amadeus API."""
-    token = get_amadeus_token()
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.amadeus+json"
-    }
 
-    params = {
+def _activities_params(input: ActivitiesInput) -> Dict[str, Any]:
+    return {
         "latitude": input.latitude,
         "longitude": input.longitude,
         "radius": input.radius
     }
 
-    response = requests.get(
-        "https://test.api.amadeus.com/v1/shopping/activities",
-        headers=headers,
-        params=params
-    )
 
+ACTIVITY_SHAPE = ResultShape(
+    "get_tours_and_activities",
+    fields=("name", "shortDescription", "rating", "price.amount", "price.currencyCode", "minimumDuration", "bookingLink"),
+    headers=("name", "description", "rating", "price", "currency", "duration", "booking_link"),
+    max_cell_chars=160,
+)
+
+
+def _format_activities(response: httpx.Response) -> str:
     if response.status_code != 200:
-        return {"error": f"Amadeus API error: {response.status_code}", "details": response.json()}
-    
-    return response.json()["data"][:3]
+        return ACTIVITY_SHAPE.render(_amadeus_error(response))
+    return ACTIVITY_SHAPE.render(response.json().get("data", []))
+
+
+async def _aget_tours_and_activities(input: ActivitiesInput) -> str:
+    response = await amadeus_aget(ACTIVITIES_PATH, params=_activities_params(input), headers=AMADEUS_JSON_HEADERS)
+    return _format_activities(response)
+
+
+@tool_with_async(_aget_tours_and_activities)
+def get_tours_and_activities(input: ActivitiesInput) -> str:
+    """Returns tours and activities around a given location using the Amadeus API."""
+    response = amadeus_get(ACTIVITIES_PATH, params=_activities_params(input), headers=AMADEUS_JSON_HEADERS)
+    return _format_activities(response)
+
 
+async def _aget_city_coordinates(input: CitySearchInput) -> Dict:
+    local = _local_city_coordinates(input)
+    if local:
+        return local
 
-@tool 
+    response = await amadeus_aget(CITIES_PATH, params=_city_search_params(input), headers=AMADEUS_JSON_HEADERS)
+    if response.status_code != 200:
+        return _amadeus_error(response)
+    return _learn_cities(response)[0]["geoCode"]
+
+
+@tool_with_async(_aget_city_coordinates)
 def get_city_coordinates(input: CitySearchInput)-> Dict : 
     """Search for cities using a keyword and optional country code, using Amadeus API and get it is latitude and  longitude """
-    token = get_amadeus_token()
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.amadeus+json"
-    }
+    local = _local_city_coordinates(input)
+    if local:
+        return local
 
-    params = {
-        "keyword": input.keyword,
-        "max": input.max,
-    }
-    if input.countryCode:
-        params["countryCode"] = input.countryCode
-    if input.include:
-        params["include"] = ",".join(input.include)
-
-    response = requests.get(
-        "https://test.api.amadeus.com/v1/reference-data/locations/cities",
-        headers=headers,
-        params=params
-    )
-    
+    response = amadeus_get(CITIES_PATH, params=_city_search_params(input), headers=AMADEUS_JSON_HEADERS)
     if response.status_code != 200:
-        return {"error": f"Amadeus API error: {response.status_code}", "details": response.json()}
-    
-    return response.json()["data"][0]["geoCode"]
+        return _amadeus_error(response)
+    return _learn_cities(response)[0]["geoCode"]
+
+
+def _format_user_location(response: httpx.Response) -> Dict:
+    if response.status_code == 200:
+        data = response.json()
+        return {
+            "city": data.get("city").replace("é" , "e").upper(),
+            "country": data.get("countryCode"),
+        }
+    return {"error": f"Failed to get location: {response.status_code}"}
 
-@tool
+
+async def _aget_user_location(_: dict = {}) -> Dict:
+    try:
+        return _format_user_location(await ahttp_get(IP_LOCATION_URL))
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@tool_with_async(_aget_user_location)
 def get_user_location(_: dict = {}) -> Dict:
     """Gets the user's current location using their IP address."""
     try:
-        response = requests.get("http://ip-api.com/json/")
-        if response.status_code == 200:
-            data = response.json()
-            return {
-                "city": data.get("city").replace("é" , "e").upper(),
-                "country": data.get("countryCode"),
-            }
-        else:
-            return {"error": f"Failed to get location: {response.status_code}"}
+        return _format_user_location(http_get(IP_LOCATION_URL))
     except Exception as e:
         return {"error": str(e)}
     
     
-tavily_search_tool = TavilySearch(
-    max_results=5,
-    topic="general",
-) 
-
+@lru_cache(maxsize=None)
+def get_tavily_search_tool() -> TavilySearch:
+    """Tavily web search tool, created on first use since it needs ``TAVILY_API_KEY``."""
+    return TavilySearch(
+        max_results=5,
+        topic="general",
+        api_wrapper=TavilyAPIWrapper(),
+    )
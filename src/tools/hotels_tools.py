@@ -1,12 +1,21 @@
-from langchain_core.tools import tool 
 from dotenv import load_dotenv 
 from typing import Optional, Dict , List  , Any
 from pydantic import BaseModel , Field 
-import requests
-from src.utils.help import get_amadeus_token
+import asyncio
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from src.utils.amadeus import amadeus_get, amadeus_aget
+from src.utils.cache import ResponseCache
+from src.utils.hotels import HotelList
+from src.utils.help import tool_with_async
+from src.utils.shaping import ResultShape
 from duckduckgo_search import DDGS
 from bs4 import BeautifulSoup 
+from functools import lru_cache
 from langchain_tavily import TavilySearch
+from src.utils.tavily import TavilyAPIWrapper
 
 load_dotenv()
 
@@ -14,11 +23,14 @@ load_dotenv()
 class HotelSearchInput(BaseModel):
     city_code: str = Field(..., description="City IATA code, e.g., 'PAR' for Paris")
     radius: str | int = Field(description="Maximum distance from the geographical coordinates express in defined units. The default unit is metric kilometer." , default="5")
+    latitude: Optional[float] = Field(default=None, description="Optional latitude to sort hotels by distance from, e.g. a landmark.")
+    longitude: Optional[float] = Field(default=None, description="Optional longitude to sort hotels by distance from.")
+    max_results: int = Field(default=10, description="Maximum number of hotels to return.")
     
     
 class HotelOffer(BaseModel):
     hotelids: str = Field(
-        description="Amadeus property codes on 8 chars. Mandatory parameter for a search by predefined list of hotels."
+        description="Comma-separated Amadeus property codes on 8 chars. Mandatory parameter for a search by predefined list of hotels."
     )
     adults: int = Field(default=2, description="Number of adult guests (1-9) per room.")
     checkInDate: str = Field(
@@ -45,55 +57,95 @@ class HotelOffer(BaseModel):
     )
 
 
-    
-@tool
-def search_hotels(input_data: HotelSearchInput) -> List[dict]:
-    """
-    Search for hotels offers using Amadeus API. Return a list of hotels max 10
-    """
-    url = "https://test.api.amadeus.com/v1/reference-data/locations/hotels/by-city"
-    token = get_amadeus_token()
-    headers = {"Authorization": f"Bearer {token}"}
-    params = {
-        "cityCode": input_data.city_code,
-        "radius": input_data.radius,
+
+HOTELS_BY_CITY_PATH = "/v1/reference-data/locations/hotels/by-city"
+HOTEL_OFFERS_PATH = "/v3/shopping/hotel-offers"
+
+
+# Hotel lists are fetched once per city with at least this radius and filtered locally afterwards.
+HOTEL_LIST_RADIUS_KM = int(os.getenv("HOTEL_LIST_RADIUS_KM", 50))
+hotel_lists_cache = ResponseCache.from_env("hotel_lists", ttl=86400, stale_ttl=86400, max_entries=64, local=True)
+
+
+def _hotel_list_params(city_code: str, radius_km: int) -> Dict[str, Any]:
+    return {
+        "cityCode": city_code,
+        "radius": radius_km,
+        "radiusUnit": "KM",
     }
 
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    result = []
-    for item in response.json().get("data", []):
-        result.append({
-            "name": item.get("name" , "without name"),
-            "geo_code" : item.get("geoCode" , "no geocode") , 
-            'hotelId' : item.get("hotelId" , "no id") , 
-            'address' : item.get('address'), 
-            "distance" : str(item.get("distance").get("value")) +" " + item.get("distance").get("unit")
-        })
-        
-    if len(result) > 10 : 
-        return result[:10]
-    
-    return result
 
+def _hotel_list_request(input_data: HotelSearchInput) -> tuple[str, str, int]:
+    city_code = input_data.city_code.strip().upper()
+    fetch_radius = max(math.ceil(float(input_data.radius)), HOTEL_LIST_RADIUS_KM)
+    return f"{city_code}:{fetch_radius}", city_code, fetch_radius
 
-@tool
-def get_hotel_offers(input_data: HotelOffer) -> List[Dict]:
-    """
-    Fetch hotel offers for given hotel IDs and criteria using Amadeus API.
 
-    Args:
-        input_data (HotelOffer): Filter parameters for hotel search.
+def _get_hotel_list(input_data: HotelSearchInput) -> HotelList:
+    key, city_code, fetch_radius = _hotel_list_request(input_data)
 
-    Returns:
-        List[Dict]: A list of available hotel offers with details.
+    def fetch() -> HotelList:
+        response = amadeus_get(HOTELS_BY_CITY_PATH, params=_hotel_list_params(city_code, fetch_radius))
+        response.raise_for_status()
+        return HotelList.from_response(response.json(), fetch_radius)
+
+    return hotel_lists_cache.get_or_fetch(key, fetch)
+
+
+async def _aget_hotel_list(input_data: HotelSearchInput) -> HotelList:
+    key, city_code, fetch_radius = _hotel_list_request(input_data)
+
+    async def afetch() -> HotelList:
+        response = await amadeus_aget(HOTELS_BY_CITY_PATH, params=_hotel_list_params(city_code, fetch_radius))
+        response.raise_for_status()
+        return HotelList.from_response(response.json(), fetch_radius)
+
+    return await hotel_lists_cache.aget_or_fetch(key, afetch)
+
+
+def _format_hotels(hotels: HotelList, input_data: HotelSearchInput) -> List[dict]:
+    rows = hotels.query(float(input_data.radius), input_data.latitude, input_data.longitude, limit=input_data.max_results)
+    return [
+        {
+            "name": hotels.names[i],
+            "geo_code": {"latitude": float(hotels.lats[i]), "longitude": float(hotels.lons[i])},
+            "hotelId": hotels.ids[i],
+            "address": hotels.addresses[i],
+            "distance": f"{distance:.2f} KM",
+        }
+        for i, distance in rows
+    ]
+
+
+HOTEL_SHAPE = ResultShape("search_hotels", fields=("name", "hotelId", "distance"))
+
+
+async def _asearch_hotels(input_data: HotelSearchInput) -> str:
+    return HOTEL_SHAPE.render(_format_hotels(await _aget_hotel_list(input_data), input_data))
+
+
+@tool_with_async(_asearch_hotels)
+def search_hotels(input_data: HotelSearchInput) -> str:
     """
-    url = "https://test.api.amadeus.com/v3/shopping/hotel-offers"
-    token = get_amadeus_token()
-    headers = {"Authorization": f"Bearer {token}"}
+    Search for hotels offers using Amadeus API. Return a list of hotels max 10 by default;
+    pass latitude and longitude to sort them by distance from that point.
+    """
+    return HOTEL_SHAPE.render(_format_hotels(_get_hotel_list(input_data), input_data))
+
 
+# Hotel IDs are requested in chunks of this size, with at most HOTEL_OFFERS_CONCURRENCY requests in flight.
+HOTEL_OFFERS_CHUNK_SIZE = int(os.getenv("HOTEL_OFFERS_CHUNK_SIZE", 20))
+HOTEL_OFFERS_CONCURRENCY = int(os.getenv("HOTEL_OFFERS_CONCURRENCY", 4))
+
+
+def _hotel_id_chunks(hotelids: str, size: int = HOTEL_OFFERS_CHUNK_SIZE) -> List[List[str]]:
+    ids = list(dict.fromkeys(hotel_id.strip().upper() for hotel_id in hotelids.split(",") if hotel_id.strip()))
+    return [ids[i:i + size] for i in range(0, len(ids), size)]
+
+
+def _hotel_offer_params(input_data: HotelOffer, hotel_ids: List[str]) -> Dict[str, Any]:
     params : Dict[str , Any] = {
-        "hotelIds": input_data.hotelids,
+        "hotelIds": ",".join(hotel_ids),
         "adults": input_data.adults,
         "checkInDate": input_data.checkInDate,
         "checkOutDate": input_data.checkOutDate,
@@ -104,25 +156,24 @@ def get_hotel_offers(input_data: HotelOffer) -> List[Dict]:
 
     if input_data.countryOfResidence:
         params["countryOfResidence"] = input_data.countryOfResidence
+    return params
+
 
+def _hotel_offers_error(response: httpx.Response) -> Optional[str]:
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()  # Raises HTTPError for 4xx/5xx
-    except requests.exceptions.HTTPError as http_err:
+        response.raise_for_status()  # Raises HTTPStatusError for 4xx/5xx
+    except httpx.HTTPStatusError as http_err:
         try:
-            error_json = response.json()
-            print("API Error:", error_json.get("errors", [])[0].get("title", str(http_err)))
+            return response.json().get("errors", [])[0].get("title", str(http_err))
         except Exception:
-            print("HTTP Error:", str(http_err))
-        return []
-    except Exception as e:
-        print("Unexpected error:", str(e))
-        return []
+            return str(http_err)
+    return None
+
 
-    data = response.json().get("data", [])
+def _format_hotel_offers(data: Dict[str, Any]) -> List[Dict]:
     results = []
 
-    for hotel_offer in data:
+    for hotel_offer in data.get("data", []):
         hotel_info = hotel_offer.get("hotel", {})
         offers = hotel_offer.get("offers", [])
 
@@ -147,7 +198,145 @@ def get_hotel_offers(input_data: HotelOffer) -> List[Dict]:
     return results
 
 
-tavily_search_tool = TavilySearch(
-    max_results=5,
-    topic="general",
-) 
\ No newline at end of file
+# Amadeus error code for an unknown or unsupported hotel ID ("INVALID PROPERTY CODE").
+INVALID_PROPERTY_CODE = 1257
+
+
+def _rejects_hotel_ids(response: httpx.Response, hotel_ids: List[str]) -> bool:
+    """Whether a 400 blames the hotel IDs, rather than e.g. the dates, price range or currency."""
+    try:
+        errors = response.json().get("errors") or []
+    except Exception:
+        return False
+    for error in errors:
+        if not isinstance(error, dict):
+            continue
+        text = f"{error.get('title', '')} {error.get('detail', '')}".upper()
+        if (error.get("code") == INVALID_PROPERTY_CODE or "PROPERTY CODE" in text
+                or (error.get("source") or {}).get("parameter") == "hotelIds"
+                or any(hotel_id in text for hotel_id in hotel_ids)):
+            return True
+    return False
+
+
+# (offers, failures) for one chunk of hotel IDs.
+_ChunkResult = tuple[List[Dict], List[Dict]]
+
+
+def _chunk_result(response: httpx.Response, hotel_ids: List[str]) -> Optional[_ChunkResult]:
+    """Offers or a failure for ``response``; None when the chunk should be split and retried.
+
+    Amadeus rejects the whole request with a 400 when one ID is unknown, so a
+    chunk of several IDs rejected for its hotel IDs is bisected to isolate the
+    bad ones. Any other 400 (a past date, a bad price range) would fail for
+    every half too, so it is reported once for the whole chunk.
+    """
+    error = _hotel_offers_error(response)
+    if error is None:
+        return _format_hotel_offers(response.json()), []
+    if response.status_code == 400 and len(hotel_ids) > 1 and _rejects_hotel_ids(response, hotel_ids):
+        return None
+    return [], [{"hotel_ids": hotel_ids, "error": error}]
+
+
+def _fetch_offer_chunk(input_data: HotelOffer, hotel_ids: List[str]) -> _ChunkResult:
+    try:
+        response = amadeus_get(HOTEL_OFFERS_PATH, params=_hotel_offer_params(input_data, hotel_ids))
+    except Exception as e:
+        return [], [{"hotel_ids": hotel_ids, "error": str(e)}]
+    result = _chunk_result(response, hotel_ids)
+    if result is not None:
+        return result
+    mid = len(hotel_ids) // 2
+    return _merge_chunks([_fetch_offer_chunk(input_data, hotel_ids[:mid]), _fetch_offer_chunk(input_data, hotel_ids[mid:])])
+
+
+async def _afetch_offer_chunk(input_data: HotelOffer, hotel_ids: List[str], limit: asyncio.Semaphore) -> _ChunkResult:
+    try:
+        async with limit:
+            response = await amadeus_aget(HOTEL_OFFERS_PATH, params=_hotel_offer_params(input_data, hotel_ids))
+    except Exception as e:
+        return [], [{"hotel_ids": hotel_ids, "error": str(e)}]
+    result = _chunk_result(response, hotel_ids)
+    if result is not None:
+        return result
+    mid = len(hotel_ids) // 2
+    return _merge_chunks(await asyncio.gather(
+        _afetch_offer_chunk(input_data, hotel_ids[:mid], limit),
+        _afetch_offer_chunk(input_data, hotel_ids[mid:], limit),
+    ))
+
+
+def _merge_chunks(results: List[_ChunkResult]) -> _ChunkResult:
+    return (
+        [offer for offers, _ in results for offer in offers],
+        [failure for _, failures in results for failure in failures],
+    )
+
+
+def _offer_price(offer: Dict) -> float:
+    try:
+        return float(offer["price_total"])
+    except (KeyError, TypeError, ValueError):
+        return math.inf
+
+
+def _hotel_offers_result(results: List[_ChunkResult]) -> List[Dict]:
+    """Offers from every chunk, cheapest first, followed by a summary of failed hotel IDs if any."""
+    offers, failures = _merge_chunks(results)
+    offers.sort(key=_offer_price)
+    if failures:
+        offers.append({
+            "error": f"Could not fetch offers for {sum(len(f['hotel_ids']) for f in failures)} hotel IDs",
+            "failed_chunks": failures,
+        })
+    return offers
+
+
+# Booking links and coordinates are left out: the agent only compares and quotes offers.
+HOTEL_OFFER_SHAPE = ResultShape(
+    "get_hotel_offers",
+    fields=("hotel_name", "hotel_id", "room_type", "bed_type", "price_total", "currency",
+            "check_in", "check_out", "cancellation_policy", "description"),
+    headers=("hotel", "hotel_id", "room", "bed", "price", "currency", "check_in", "check_out",
+             "cancellation", "description"),
+    max_cell_chars=100,
+)
+
+
+async def _aget_hotel_offers(input_data: HotelOffer) -> str:
+    limit = asyncio.Semaphore(HOTEL_OFFERS_CONCURRENCY)
+    results = await asyncio.gather(*(
+        _afetch_offer_chunk(input_data, chunk, limit) for chunk in _hotel_id_chunks(input_data.hotelids)
+    ))
+    return HOTEL_OFFER_SHAPE.render(_hotel_offers_result(list(results)))
+
+
+@tool_with_async(_aget_hotel_offers)
+def get_hotel_offers(input_data: HotelOffer) -> str:
+    """
+    Fetch hotel offers for given hotel IDs and criteria using Amadeus API.
+
+    Args:
+        input_data (HotelOffer): Filter parameters for hotel search.
+
+    Returns:
+        str: The available hotel offers, cheapest first, as CSV rows.
+    """
+    chunks = _hotel_id_chunks(input_data.hotelids)
+    if len(chunks) <= 1:
+        results = [_fetch_offer_chunk(input_data, chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(HOTEL_OFFERS_CONCURRENCY, len(chunks))) as pool:
+            results = list(pool.map(lambda chunk: _fetch_offer_chunk(input_data, chunk), chunks))
+    return HOTEL_OFFER_SHAPE.render(_hotel_offers_result(results))
+
+
+@lru_cache(maxsize=None)
+def get_tavily_search_tool() -> TavilySearch:
+    """Tavily web search tool, created on first use since it needs ``TAVILY_API_KEY``."""
+    return TavilySearch(
+        max_results=5,
+        topic="general",
+        api_wrapper=TavilyAPIWrapper(),
+    )
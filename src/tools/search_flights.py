@@ -1,87 +1,440 @@
-from langchain_core.tools import tool
-from typing import Optional, Dict
-import requests
+import asyncio
+import csv
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Optional, Dict, Any, List, Literal, Tuple
+import httpx
 from dotenv import load_dotenv
-from src.utils.help import get_amadeus_token
+from src.utils.airports import get_airport_index
+from src.utils.amadeus import amadeus_get, amadeus_aget
+from src.utils.cache import ResponseCache
+from src.utils.flights import FlightOffers, slim_offer
+from src.utils.help import tool_with_async
 
 load_dotenv()
 
+FLIGHT_OFFERS_PATH = "/v2/shopping/flight-offers"
+AIRPORTS_PATH = "/v1/reference-data/locations/airports"
+LOCATIONS_PATH = "/v1/reference-data/locations"
+FLIGHT_STATUS_PATH = "/v2/schedule/flights"
+CHECKIN_LINKS_PATH = "/v2/reference-data/urls/checkin-links"
 
-@tool
+# Shared by search_flight and book_flight_manually, which send identical offer queries.
+flight_offers_cache = ResponseCache.from_env("flight_offers", ttl=300, stale_ttl=600, max_entries=256)
+# Offers requested per search (Amadeus allows up to 250); they are ranked locally and the best few shown.
+FLIGHT_OFFERS_MAX = int(os.getenv("FLIGHT_OFFERS_MAX", 250))
+FLIGHT_RESULTS_SHOWN = int(os.getenv("FLIGHT_RESULTS_SHOWN", 3))
+
+Priority = Literal["best", "cheapest", "fastest", "fewest_stops"]
+
+# Fare calendar: one offers query per date combination, at most FARE_CALENDAR_MAX_QUERIES per call
+# and FARE_CALENDAR_CONCURRENCY in flight. Queries match search_flight's, so they share its cache.
+FARE_CALENDAR_MAX_FLEX_DAYS = int(os.getenv("FARE_CALENDAR_MAX_FLEX_DAYS", 7))
+FARE_CALENDAR_MAX_QUERIES = int(os.getenv("FARE_CALENDAR_MAX_QUERIES", 25))
+FARE_CALENDAR_CONCURRENCY = int(os.getenv("FARE_CALENDAR_CONCURRENCY", 4))
+FARE_CALENDAR_CHEAPEST_SHOWN = 3
+
+# Multi-airport search: up to MULTI_AIRPORT_MAX_AIRPORTS airports per side within the radius,
+# every origin/destination pair queried with at most MULTI_AIRPORT_CONCURRENCY requests in flight.
+MULTI_AIRPORT_RADIUS_KM = int(os.getenv("MULTI_AIRPORT_RADIUS_KM", 100))
+MULTI_AIRPORT_MAX_AIRPORTS = int(os.getenv("MULTI_AIRPORT_MAX_AIRPORTS", 3))
+MULTI_AIRPORT_CONCURRENCY = int(os.getenv("MULTI_AIRPORT_CONCURRENCY", 4))
+
+
+def _flight_offer_params(
+    originLocationCode: str,
+    destinationLocationCode: str,
+    departureDate: str,
+    returnDate: Optional[str],
+    adults: int,
+    travelClass: Optional[str],
+) -> Dict[str, str | int | float]:
+    params: Dict[str, str | int | float] = {
+        "originLocationCode": originLocationCode.strip().upper(),
+        "destinationLocationCode": destinationLocationCode.strip().upper(),
+        "departureDate": departureDate.strip(),
+        "adults": int(adults),
+        "max": FLIGHT_OFFERS_MAX,
+    }
+    if returnDate:
+        params["returnDate"] = returnDate.strip()
+    if travelClass:
+        params["travelClass"] = travelClass.strip().upper()
+    return params
+
+
+def _flight_offers_cache_key(params: Dict[str, str | int | float]) -> str:
+    return ":".join(
+        str(params.get(name, "-"))
+        for name in ("originLocationCode", "destinationLocationCode", "departureDate", "returnDate", "adults", "travelClass", "max")
+    )
+
+
+def _get_flight_offers(params: Dict[str, str | int | float]) -> Dict[str, Any]:
+    def fetch() -> Dict[str, Any]:
+        response = amadeus_get(FLIGHT_OFFERS_PATH, params=params)
+        response.raise_for_status()
+        return {"data": [slim_offer(offer) for offer in response.json().get("data", [])]}
+
+    return flight_offers_cache.get_or_fetch(_flight_offers_cache_key(params), fetch)
+
+
+async def _aget_flight_offers(params: Dict[str, str | int | float]) -> Dict[str, Any]:
+    async def afetch() -> Dict[str, Any]:
+        response = await amadeus_aget(FLIGHT_OFFERS_PATH, params=params)
+        response.raise_for_status()
+        return {"data": [slim_offer(offer) for offer in response.json().get("data", [])]}
+
+    return await flight_offers_cache.aget_or_fetch(_flight_offers_cache_key(params), afetch)
+
+
+def _departure_minute(preferredDepartureTime: Optional[str]) -> Optional[int]:
+    try:
+        hours, minutes = preferredDepartureTime.strip().split(":")[:2]
+        return int(hours) * 60 + int(minutes)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _format_itinerary(itinerary: Dict[str, Any]) -> str:
+    segments = itinerary["segments"]
+    departure = segments[0]["departure"]
+    arrival = segments[-1]["arrival"]
+    flight_numbers = ", ".join(
+        f"{seg['carrierCode']}{seg['number']}" for seg in segments
+    )
+    return (
+        f"• Flight Number(s): {flight_numbers}\n"
+        f"• From {departure['iataCode']} at {departure['at']}\n"
+        f"• To {arrival['iataCode']} at {arrival['at']}\n"
+        f"• Airline: {segments[0]['carrierCode']}\n"
+        f"• Duration: {itinerary['duration']}\n"
+        f"• Stops: {len(segments) - 1}\n"
+    )
+
+
+def _format_flight_offers(data: Dict[str, Any], priority: str = "best",
+                          preferredDepartureTime: Optional[str] = None) -> str:
+    offers = FlightOffers.from_response(data)
+    if not len(offers):
+        return "No flights found for the given criteria."
+
+    results = []
+    ranked = offers.rank(priority, FLIGHT_RESULTS_SHOWN, _departure_minute(preferredDepartureTime))
+    for i, index in enumerate(ranked, start=1):
+        offer = offers.offers[index]
+        itineraries = offer["itineraries"]
+        text = f"Flight {i}:\n" + _format_itinerary(itineraries[0])
+        if len(itineraries) > 1:
+            text += "Return:\n" + _format_itinerary(itineraries[1])
+        results.append(text + f"• Price: {offer['price']['total']} {offer['price']['currency']}\n")
+
+    if len(offers) > len(ranked):
+        results.append(f"Ranked by {priority} out of {len(offers)} offers.")
+    return "\n".join(results)
+
+
+async def _asearch_flight(
+    originLocationCode: str,
+    destinationLocationCode: str,
+    departureDate: str,
+    returnDate: Optional[str] = None,
+    adults: int = 1,
+    travelClass: Optional[str] = None,
+    priority: Priority = "best",
+    preferredDepartureTime: Optional[str] = None,
+) -> str:
+    params = _flight_offer_params(
+        originLocationCode, destinationLocationCode, departureDate, returnDate, adults, travelClass
+    )
+    return _format_flight_offers(await _aget_flight_offers(params), priority, preferredDepartureTime)
+
+
+@tool_with_async(_asearch_flight)
 def search_flight(
     originLocationCode: str,  # e.g., "ALG"
     destinationLocationCode: str,  # e.g., "IST"
     departureDate: str,  # format: YYYY-MM-DD
     returnDate: Optional[str] = None,  # optional return date
     adults: int = 1,
-    travelClass: Optional[str] = None  # e.g., ECONOMY, BUSINESS
+    travelClass: Optional[str] = None,  # e.g., ECONOMY, BUSINESS
+    priority: Priority = "best",
+    preferredDepartureTime: Optional[str] = None,  # e.g., "08:00"
 ) -> str:
     """
     Search for available flights between two cities using the Amadeus API.
-    
+
     Required:
     - originLocationCode: The IATA code of the departure airport.
     - destinationLocationCode: The IATA code of the arrival airport.
     - departureDate: The date of departure (YYYY-MM-DD).
-    
+
     Optional:
     - returnDate: The return date for round trip (YYYY-MM-DD).
     - adults: Number of adult passengers.
     - travelClass: Desired travel class (ECONOMY, BUSINESS, FIRST).
-    
+    - priority: How to rank the offers: best (balances price, duration and stops), cheapest, fastest or fewest_stops.
+    - preferredDepartureTime: Departure time of day the user asked for (HH:MM); offers closer to it rank higher.
+
     Returns:
-    Top 3 available flight options with price, time, stops, and airline info.
+    The top 3 of all available flight options with price, time, stops, and airline info.
     """
-    token = get_amadeus_token()
-    url = "https://test.api.amadeus.com/v2/shopping/flight-offers"
-    params: Dict[str, str | int | float] = {
-        "originLocationCode": originLocationCode,
-        "destinationLocationCode": destinationLocationCode,
-        "departureDate": departureDate,
-        "adults": adults,
+    params = _flight_offer_params(
+        originLocationCode, destinationLocationCode, departureDate, returnDate, adults, travelClass
+    )
+    return _format_flight_offers(_get_flight_offers(params), priority, preferredDepartureTime)
+
+
+def _date_window(day: str, flex_days: int) -> List[date]:
+    center = date.fromisoformat(day.strip())
+    flex = max(0, min(int(flex_days), FARE_CALENDAR_MAX_FLEX_DAYS))
+    days = (center + timedelta(days=offset) for offset in range(-flex, flex + 1))
+    return [d for d in days if d >= date.today()]
+
+
+def _fare_calendar_dates(
+    departureDate: str,
+    flexDays: int,
+    returnDate: Optional[str],
+    returnFlexDays: Optional[int],
+) -> Tuple[List[Tuple[str, Optional[str]]], int]:
+    """Date combinations to query, closest to the requested dates first, and how many were left out."""
+    departures = _date_window(departureDate, flexDays)
+    if not returnDate:
+        pairs = [(d, None) for d in departures]
+    else:
+        returns = _date_window(returnDate, flexDays if returnFlexDays is None else returnFlexDays)
+        pairs = [(d, r) for d in departures for r in returns if r >= d]
+
+    requested = (date.fromisoformat(departureDate.strip()), date.fromisoformat(returnDate.strip()) if returnDate else None)
+
+    def distance(pair: Tuple[date, Optional[date]]) -> int:
+        gap = abs((pair[0] - requested[0]).days)
+        return gap + abs((pair[1] - requested[1]).days) if pair[1] else gap
+
+    kept = sorted(sorted(pairs, key=distance)[:FARE_CALENDAR_MAX_QUERIES])
+    return [(d.isoformat(), r.isoformat() if r else None) for d, r in kept], len(pairs) - len(kept)
+
+
+def _cheapest_fare(departureDate: str, returnDate: Optional[str], data: Dict[str, Any]) -> Dict[str, Any]:
+    fare: Dict[str, Any] = {"departureDate": departureDate, "returnDate": returnDate, "price": None}
+    offers = FlightOffers.from_response(data)
+    if len(offers):
+        index = int(offers.prices.argmin())
+        offer = offers.offers[index]
+        fare.update(
+            price=float(offers.prices[index]),
+            currency=offer["price"]["currency"],
+            airline=offer["itineraries"][0]["segments"][0]["carrierCode"],
+            stops=int(offers.stops[index]),
+        )
+    return fare
+
+
+def _fare_calendar_result(
+    originLocationCode: str,
+    destinationLocationCode: str,
+    fares: List[Dict[str, Any]],
+    skipped: int,
+) -> Dict[str, Any]:
+    priced = sorted((f for f in fares if f.get("price") is not None), key=lambda f: f["price"])
+    return {
+        "origin": originLocationCode.strip().upper(),
+        "destination": destinationLocationCode.strip().upper(),
+        "currency": priced[0]["currency"] if priced else None,
+        "fares": fares,
+        "cheapest": priced[:FARE_CALENDAR_CHEAPEST_SHOWN],
+        "skipped": skipped,
     }
-    if returnDate:
-        params["returnDate"] = returnDate
-    if travelClass:
-        params["travelClass"] = travelClass
 
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(url, params=params, headers=headers)
-    response.raise_for_status()
 
-    data = response.json()
+def _fare_cell(fare: Optional[Dict[str, Any]]) -> str:
+    if fare is None:
+        return ""
+    if "error" in fare:
+        return "error"
+    return "-" if fare["price"] is None else f"{fare['price']:.2f}"
+
+
+def _format_fare_calendar(result: Dict[str, Any]) -> str:
+    fares = result["fares"]
+    if not fares:
+        return "No dates to search: the whole window is in the past."
+    if not result["cheapest"]:
+        failed = sum("error" in f for f in fares)
+        return f"No flights found on any of the {len(fares)} dates searched" + (f" ({failed} failed)." if failed else ".")
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    round_trip = fares[0]["returnDate"] is not None
+    if round_trip:
+        # Departure dates down, return dates across.
+        returns = sorted({f["returnDate"] for f in fares})
+        by_pair = {(f["departureDate"], f["returnDate"]): f for f in fares}
+        writer.writerow(["depart/return"] + returns)
+        for departure in sorted({f["departureDate"] for f in fares}):
+            writer.writerow([departure] + [_fare_cell(by_pair.get((departure, r))) for r in returns])
+    else:
+        writer.writerow(["depart", "price"])
+        for fare in fares:
+            writer.writerow([fare["departureDate"], _fare_cell(fare)])
+
+    lines = [f"Lowest fare per date, {result['origin']} to {result['destination']} ({result['currency']}):",
+             buffer.getvalue().rstrip("\n"), "Cheapest:"]
+    for i, fare in enumerate(result["cheapest"], start=1):
+        dates = fare["departureDate"] + (f" returning {fare['returnDate']}" if fare["returnDate"] else "")
+        lines.append(f"{i}. {dates}: {fare['price']:.2f} {fare['currency']} ({fare['airline']}, stops: {fare['stops']})")
+    if result["skipped"]:
+        lines.append(f"{result['skipped']} date combinations further from the requested dates were not searched.")
+    lines.append("- means no flights; call search_flight with the chosen dates for flight details.")
+    return "\n".join(lines)
+
+
+def fare_calendar(
+    originLocationCode: str,
+    destinationLocationCode: str,
+    departureDate: str,
+    flexDays: int = 3,
+    returnDate: Optional[str] = None,
+    returnFlexDays: Optional[int] = None,
+    adults: int = 1,
+    travelClass: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Cheapest offer for every date combination in the window, queried concurrently."""
+    pairs, skipped = _fare_calendar_dates(departureDate, flexDays, returnDate, returnFlexDays)
+
+    def fetch(pair: Tuple[str, Optional[str]]) -> Dict[str, Any]:
+        params = _flight_offer_params(originLocationCode, destinationLocationCode, pair[0], pair[1], adults, travelClass)
+        try:
+            return _cheapest_fare(*pair, _get_flight_offers(params))
+        except httpx.HTTPError as e:
+            return {"departureDate": pair[0], "returnDate": pair[1], "error": str(e)}
+
+    if len(pairs) <= 1:
+        fares = [fetch(pair) for pair in pairs]
+    else:
+        with ThreadPoolExecutor(max_workers=min(FARE_CALENDAR_CONCURRENCY, len(pairs))) as pool:
+            fares = list(pool.map(fetch, pairs))
+    return _fare_calendar_result(originLocationCode, destinationLocationCode, fares, skipped)
+
+
+async def afare_calendar(
+    originLocationCode: str,
+    destinationLocationCode: str,
+    departureDate: str,
+    flexDays: int = 3,
+    returnDate: Optional[str] = None,
+    returnFlexDays: Optional[int] = None,
+    adults: int = 1,
+    travelClass: Optional[str] = None,
+) -> Dict[str, Any]:
+    pairs, skipped = _fare_calendar_dates(departureDate, flexDays, returnDate, returnFlexDays)
+    limit = asyncio.Semaphore(FARE_CALENDAR_CONCURRENCY)
+
+    async def fetch(pair: Tuple[str, Optional[str]]) -> Dict[str, Any]:
+        params = _flight_offer_params(originLocationCode, destinationLocationCode, pair[0], pair[1], adults, travelClass)
+        try:
+            async with limit:
+                return _cheapest_fare(*pair, await _aget_flight_offers(params))
+        except httpx.HTTPError as e:
+            return {"departureDate": pair[0], "returnDate": pair[1], "error": str(e)}
+
+    fares = await asyncio.gather(*(fetch(pair) for pair in pairs))
+    return _fare_calendar_result(originLocationCode, destinationLocationCode, list(fares), skipped)
+
+
+async def _asearch_fare_calendar(
+    originLocationCode: str,
+    destinationLocationCode: str,
+    departureDate: str,
+    flexDays: int = 3,
+    returnDate: Optional[str] = None,
+    returnFlexDays: Optional[int] = None,
+    adults: int = 1,
+    travelClass: Optional[str] = None,
+) -> str:
+    return _format_fare_calendar(await afare_calendar(
+        originLocationCode, destinationLocationCode, departureDate, flexDays, returnDate, returnFlexDays, adults, travelClass
+    ))
+
+
+@tool_with_async(_asearch_fare_calendar)
+def search_fare_calendar(
+    originLocationCode: str,  # e.g., "ALG"
+    destinationLocationCode: str,  # e.g., "IST"
+    departureDate: str,  # format: YYYY-MM-DD, middle of the window
+    flexDays: int = 3,  # search departureDate ± flexDays
+    returnDate: Optional[str] = None,
+    returnFlexDays: Optional[int] = None,
+    adults: int = 1,
+    travelClass: Optional[str] = None,
+) -> str:
+    """
+    Find the cheapest days to fly within a flexible date window, in one call.
+    Use it instead of calling search_flight once per date when the user's dates are flexible
+    (e.g. "cheapest day that week", "around the 10th").
+
+    Required:
+    - originLocationCode: The IATA code of the departure airport.
+    - destinationLocationCode: The IATA code of the arrival airport.
+    - departureDate: Middle of the departure window (YYYY-MM-DD).
+
+    Optional:
+    - flexDays: Days either side of departureDate to search (default 3, at most 7).
+    - returnDate: Middle of the return window for a round trip (YYYY-MM-DD).
+    - returnFlexDays: Days either side of returnDate to search (defaults to flexDays).
+    - adults: Number of adult passengers.
+    - travelClass: Desired travel class (ECONOMY, BUSINESS, FIRST).
+
+    Returns:
+    The lowest fare for each date (a departure × return matrix for round trips) and the cheapest date combinations.
+    """
+    return _format_fare_calendar(fare_calendar(
+        originLocationCode, destinationLocationCode, departureDate, flexDays, returnDate, returnFlexDays, adults, travelClass
+    ))
+
+
+def _local_nearby_airports(latitude: float, longitude: float, radius: Optional[int]) -> Optional[str]:
+    # Like the Amadeus airports endpoint, list only airports passengers can fly from.
+    nearby = get_airport_index().nearby(latitude, longitude, radius or 100, airline_only=True)
+    if not nearby:
+        return None
+    return "\n".join(f"• {airport.iata} - {airport.name} ({distance:.0f} KM)" for airport, distance in nearby)
+
+
+def _format_nearby_airports(data: Dict[str, Any]) -> str:
     if not data.get("data"):
-        return "No flights found for the given criteria."
+        return "No airports found near the provided coordinates."
 
     results = []
-    for i, offer in enumerate(data["data"][:3], start=1):
-        itinerary = offer["itineraries"][0]
-        segments = itinerary["segments"]
-        departure = segments[0]["departure"]
-        arrival = segments[-1]["arrival"]
-        airline = segments[0]["carrierCode"]
-        duration = itinerary["duration"]
-        stops = len(segments) - 1
-        price = offer["price"]["total"]
-        currency = offer["price"]["currency"]
-        flight_numbers = ", ".join(
-            f"{seg['carrierCode']}{seg['number']}" for seg in segments
-        )
-        results.append(
-            f"Flight {i}:\n"
-            f"• Flight Number(s): {flight_numbers}\n"
-            f"• From {departure['iataCode']} at {departure['at']}\n"
-            f"• To {arrival['iataCode']} at {arrival['at']}\n"
-            f"• Airline: {airline}\n"
-            f"• Duration: {duration}\n"
-            f"• Stops: {stops}\n"
-            f"• Price: {price} {currency}\n"
-        )
+    for loc in data["data"]:
+        code = loc.get("iataCode", "N/A")
+        name = loc.get("name", "Unknown")
+        distance = loc.get("distance", {}).get("value", "N/A")
+        unit = loc.get("distance", {}).get("unit", "KM")
+        results.append(f"• {code} - {name} ({distance} {unit})")
 
     return "\n".join(results)
 
 
-@tool
+async def _aget_nearby_airports(
+    latitude: float,
+    longitude: float,
+    radius: Optional[int] = 100
+) -> str:
+    local = _local_nearby_airports(latitude, longitude, radius)
+    if local:
+        return local
+
+    params = {"latitude": latitude, "longitude": longitude, "radius": radius}
+    response = await amadeus_aget(AIRPORTS_PATH, params=params)
+    response.raise_for_status()
+    return _format_nearby_airports(response.json())
+
+
+@tool_with_async(_aget_nearby_airports)
 def get_nearby_airports(
     latitude: float,
     longitude: float,
@@ -89,60 +442,175 @@ def get_nearby_airports(
 ) -> str:
     """
     Find airports near a given location (based on latitude and longitude).
-    
+
     Required:
     - latitude: Latitude coordinate.
     - longitude: Longitude coordinate.
-    
+
     Optional:
     - radius: Search radius in kilometers (default is 100km).
-    
+
     Returns:
     A list of nearby airport IATA codes, names, and distance.
     """
-    token = get_amadeus_token()
-    url = "https://test.api.amadeus.com/v1/reference-data/locations/airports"
-    headers = {"Authorization": f"Bearer {token}"}
-    params = {"latitude": latitude, "longitude": longitude, "radius": radius}
+    local = _local_nearby_airports(latitude, longitude, radius)
+    if local:
+        return local
 
-    response = requests.get(url, headers=headers, params=params)
+    params = {"latitude": latitude, "longitude": longitude, "radius": radius}
+    response = amadeus_get(AIRPORTS_PATH, params=params)
     response.raise_for_status()
-    data = response.json()
+    return _format_nearby_airports(response.json())
 
-    if not data.get("data"):
-        return "No airports found near the provided coordinates."
 
-    results = []
-    for loc in data["data"]:
-        code = loc.get("iataCode", "N/A")
-        name = loc.get("name", "Unknown")
-        distance = loc.get("distance", {}).get("value", "N/A")
-        unit = loc.get("distance", {}).get("unit", "KM")
-        results.append(f"• {code} - {name} ({distance} {unit})")
+def _airports_near(code: str, radius_km: Optional[int]) -> List[str]:
+    """``code`` followed by the airports around it, from the bundled index.
 
-    return "\n".join(results)
+    A comma-separated list is used as given. Codes the index does not know,
+    such as city codes (PAR, LON), are searched on their own: Amadeus already
+    covers every airport of a city code. Only airports with scheduled service
+    are added, largest first.
+    """
+    codes = [c.strip().upper() for c in code.split(",") if c.strip()]
+    if not codes:
+        return []
+    index = get_airport_index()
+    airport = index.get(codes[0]) if len(codes) == 1 else None
+    if airport is None or not radius_km:
+        return codes[:MULTI_AIRPORT_MAX_AIRPORTS]
+
+    nearby = [
+        other for other, _ in index.nearby(airport.latitude, airport.longitude, radius_km, limit=None, airline_only=True)
+        if other.iata != airport.iata
+    ]
+    # The sort is stable, so airports of the same size stay closest first.
+    nearby.sort(key=lambda other: other.type_rank)
+    return [airport.iata] + [other.iata for other in nearby][:MULTI_AIRPORT_MAX_AIRPORTS - 1]
+
+
+def _airport_pairs(origin: str, destination: str, radius_km: Optional[int]) -> List[Tuple[str, str]]:
+    origins = _airports_near(origin, radius_km)
+    destinations = _airports_near(destination, radius_km)
+    pairs = [(o, d) for o in origins for d in destinations if o != d]
+    if not pairs:
+        raise ValueError("Both an origin and a different destination airport code are required.")
+    return pairs
+
+
+def _offer_key(offer: Dict[str, Any]) -> Tuple[Tuple[str, str, str], ...]:
+    return tuple(
+        (segment["carrierCode"], segment["number"], segment["departure"]["at"])
+        for itinerary in offer["itineraries"] for segment in itinerary["segments"]
+    )
 
 
-@tool
-def get_airport_name_from_iata(iata_code: str) -> str:
+def _format_multi_airport_offers(
+    pairs: List[Tuple[str, str]],
+    responses: List[Dict[str, Any]],
+    priority: str,
+    preferredDepartureTime: Optional[str],
+) -> str:
+    """Offers of every pair in one ranked list; a flight returned for several pairs is kept once, at its lowest price."""
+    merged: Dict[Tuple[Tuple[str, str, str], ...], Dict[str, Any]] = {}
+    failed = []
+    for (origin, destination), response in zip(pairs, responses):
+        if "error" in response:
+            failed.append(f"{origin}-{destination} ({response['error']})")
+            continue
+        for offer in response.get("data", []):
+            key = _offer_key(offer)
+            if key not in merged or float(offer["price"]["total"]) < float(merged[key]["price"]["total"]):
+                merged[key] = offer
+
+    header = f"Searched {len(pairs)} airport pairs: " + ", ".join(f"{o}-{d}" for o, d in pairs) + ".\n"
+    footer = ("\nCould not search: " + "; ".join(failed)) if failed else ""
+    return header + _format_flight_offers({"data": list(merged.values())}, priority, preferredDepartureTime) + footer
+
+
+async def _asearch_flight_multi_airport(
+    originLocationCode: str,
+    destinationLocationCode: str,
+    departureDate: str,
+    returnDate: Optional[str] = None,
+    adults: int = 1,
+    travelClass: Optional[str] = None,
+    radius: Optional[int] = MULTI_AIRPORT_RADIUS_KM,
+    priority: Priority = "best",
+    preferredDepartureTime: Optional[str] = None,
+) -> str:
+    pairs = _airport_pairs(originLocationCode, destinationLocationCode, radius)
+    limit = asyncio.Semaphore(MULTI_AIRPORT_CONCURRENCY)
+
+    async def fetch(pair: Tuple[str, str]) -> Dict[str, Any]:
+        params = _flight_offer_params(*pair, departureDate, returnDate, adults, travelClass)
+        try:
+            async with limit:
+                return await _aget_flight_offers(params)
+        except httpx.HTTPError as e:
+            return {"error": str(e)}
+
+    responses = await asyncio.gather(*(fetch(pair) for pair in pairs))
+    return _format_multi_airport_offers(pairs, list(responses), priority, preferredDepartureTime)
+
+
+@tool_with_async(_asearch_flight_multi_airport)
+def search_flight_multi_airport(
+    originLocationCode: str,  # e.g., "JFK", or "JFK,EWR" to search exactly these
+    destinationLocationCode: str,  # e.g., "CDG"
+    departureDate: str,  # format: YYYY-MM-DD
+    returnDate: Optional[str] = None,
+    adults: int = 1,
+    travelClass: Optional[str] = None,
+    radius: Optional[int] = MULTI_AIRPORT_RADIUS_KM,  # km around each airport; 0 searches only the given codes
+    priority: Priority = "best",
+    preferredDepartureTime: Optional[str] = None,  # e.g., "08:00"
+) -> str:
     """
-    Retrieve airport name and location using its IATA code.
-    
+    Search flights from every airport near the origin to every airport near the destination, in one call.
+    Use it instead of chaining get_nearby_airports and search_flight when the user is flexible about airports
+    (e.g. "any London airport", "from around New York").
+
     Required:
-    - iata_code: 3-letter IATA airport code (e.g., CDG, JFK).
-    
+    - originLocationCode: IATA code of the departure airport, or a comma-separated list of airports to search.
+    - destinationLocationCode: IATA code of the arrival airport, or a comma-separated list of airports to search.
+    - departureDate: The date of departure (YYYY-MM-DD).
+
+    Optional:
+    - returnDate: The return date for round trip (YYYY-MM-DD).
+    - adults: Number of adult passengers.
+    - travelClass: Desired travel class (ECONOMY, BUSINESS, FIRST).
+    - radius: Search radius in kilometers around each airport (default 100km).
+    - priority: How to rank the offers: best (balances price, duration and stops), cheapest, fastest or fewest_stops.
+    - preferredDepartureTime: Departure time of day the user asked for (HH:MM); offers closer to it rank higher.
+
     Returns:
-    Full airport name and location (city and country).
+    The airport pairs searched and the top 3 flights across all of them, with airports, price, time, stops, and airline info.
     """
-    token = get_amadeus_token()
-    url = "https://test.api.amadeus.com/v1/reference-data/locations"
-    params = {"keyword": iata_code, "subType": "AIRPORT"}
-    headers = {"Authorization": f"Bearer {token}"}
+    pairs = _airport_pairs(originLocationCode, destinationLocationCode, radius)
+
+    def fetch(pair: Tuple[str, str]) -> Dict[str, Any]:
+        params = _flight_offer_params(*pair, departureDate, returnDate, adults, travelClass)
+        try:
+            return _get_flight_offers(params)
+        except httpx.HTTPError as e:
+            return {"error": str(e)}
+
+    if len(pairs) <= 1:
+        responses = [fetch(pair) for pair in pairs]
+    else:
+        with ThreadPoolExecutor(max_workers=min(MULTI_AIRPORT_CONCURRENCY, len(pairs))) as pool:
+            responses = list(pool.map(fetch, pairs))
+    return _format_multi_airport_offers(pairs, responses, priority, preferredDepartureTime)
+
+
+def _local_airport(iata_code: str) -> Optional[str]:
+    airport = get_airport_index().get(iata_code)
+    if airport is None:
+        return None
+    return f"{airport.iata} - {airport.name}, {airport.city or 'Unknown'}, {airport.country}"
 
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    data = response.json()
 
+def _format_airport(iata_code: str, data: Dict[str, Any]) -> str:
     if not data.get("data"):
         return f"No information found for IATA code: {iata_code}"
 
@@ -153,31 +621,47 @@ def get_airport_name_from_iata(iata_code: str) -> str:
     return f"{iata_code.upper()} - {name}, {city}, {country}"
 
 
-@tool
-def check_flight_status(flight_number: str, scheduled_date: str) -> str:
+async def _aget_airport_name_from_iata(iata_code: str) -> str:
+    local = _local_airport(iata_code)
+    if local:
+        return local
+
+    params = {"keyword": iata_code, "subType": "AIRPORT"}
+    response = await amadeus_aget(LOCATIONS_PATH, params=params)
+    response.raise_for_status()
+    return _format_airport(iata_code, response.json())
+
+
+@tool_with_async(_aget_airport_name_from_iata)
+def get_airport_name_from_iata(iata_code: str) -> str:
     """
-    Check the status of a specific flight on a given date.
-    
+    Retrieve airport name and location using its IATA code.
+
     Required:
-    - flight_number: Airline + flight number (e.g., TK652).
-    - scheduled_date: Date in YYYY-MM-DD format.
-    
+    - iata_code: 3-letter IATA airport code (e.g., CDG, JFK).
+
     Returns:
-    Flight's departure and arrival details.
+    Full airport name and location (city and country).
     """
-    token = get_amadeus_token()
-    url = "https://test.api.amadeus.com/v2/schedule/flights"
-    headers = {"Authorization": f"Bearer {token}"}
-    params = {
+    local = _local_airport(iata_code)
+    if local:
+        return local
+
+    params = {"keyword": iata_code, "subType": "AIRPORT"}
+    response = amadeus_get(LOCATIONS_PATH, params=params)
+    response.raise_for_status()
+    return _format_airport(iata_code, response.json())
+
+
+def _flight_status_params(flight_number: str, scheduled_date: str) -> Dict[str, str]:
+    return {
         "carrierCode": flight_number[:2],
         "flightNumber": flight_number[2:],
         "scheduledDepartureDate": scheduled_date,
     }
 
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    data = response.json()
 
+def _format_flight_status(flight_number: str, scheduled_date: str, data: Dict[str, Any]) -> str:
     if not data.get("data"):
         return f"No status found for flight {flight_number} on {scheduled_date}."
 
@@ -207,36 +691,76 @@ def check_flight_status(flight_number: str, scheduled_date: str) -> str:
     return "\n".join(result) if result else f"Incomplete data for {flight_number}."
 
 
-@tool
-def get_checkin_links(airline_code: str) -> str:
+async def _acheck_flight_status(flight_number: str, scheduled_date: str) -> str:
+    params = _flight_status_params(flight_number, scheduled_date)
+    response = await amadeus_aget(FLIGHT_STATUS_PATH, params=params)
+    response.raise_for_status()
+    return _format_flight_status(flight_number, scheduled_date, response.json())
+
+
+@tool_with_async(_acheck_flight_status)
+def check_flight_status(flight_number: str, scheduled_date: str) -> str:
     """
-    Get the official check-in URL for a specific airline.
-    
+    Check the status of a specific flight on a given date.
+
     Required:
-    - airline_code: 2-letter airline IATA code (e.g., TK, AF).
-    
+    - flight_number: Airline + flight number (e.g., TK652).
+    - scheduled_date: Date in YYYY-MM-DD format.
+
     Returns:
-    Direct link to the airline's check-in page.
+    Flight's departure and arrival details.
     """
-    token = get_amadeus_token()
-    url = "https://test.api.amadeus.com/v2/reference-data/urls/checkin-links"
-    headers = {"Authorization": f"Bearer {token}"}
-    params = {"airlineCode": airline_code}
+    params = _flight_status_params(flight_number, scheduled_date)
+    response = amadeus_get(FLIGHT_STATUS_PATH, params=params)
+    response.raise_for_status()
+    return _format_flight_status(flight_number, scheduled_date, response.json())
 
-    try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        data = response.json()
 
-        if not data.get("data"):
-            return f"No check-in link found for airline: {airline_code.upper()}"
+def _format_manual_booking(data: Dict[str, Any]) -> str:
+    offers = FlightOffers.from_response(data)
+    if not len(offers):
+        return "No flights found for the given criteria."
 
-        return data["data"][0].get("href", f"No link available for {airline_code.upper()}")
-    except requests.exceptions.RequestException as e:
-        return f"Error fetching check-in link: {str(e)}"
+    offer = offers.offers[offers.rank("best", limit=1)[0]]
+    itinerary = offer["itineraries"][0]
+    segments = itinerary["segments"]
+    departure = segments[0]["departure"]
+    arrival = segments[-1]["arrival"]
+    airline = segments[0]["carrierCode"]
+    flight_number = segments[0]["number"]
+    duration = itinerary["duration"]
+    stops = len(segments) - 1
+    price = offer["price"]["total"]
+    currency = offer["price"]["currency"]
+
+    return (
+        "⚠️ This tool does not support live booking.\n"
+        "Here is the flight info for manual booking:\n\n"
+        f"• From: {departure['iataCode']} at {departure['at']}\n"
+        f"• To: {arrival['iataCode']} at {arrival['at']}\n"
+        f"• Airline: {airline}\n"
+        f"• Flight Number: {airline}{flight_number}\n"
+        f"• Duration: {duration}\n"
+        f"• Stops: {stops}\n"
+        f"• Price: {price} {currency}"
+    )
 
 
-@tool
+async def _abook_flight_manually(
+    originLocationCode: str,
+    destinationLocationCode: str,
+    departureDate: str,
+    returnDate: Optional[str] = None,
+    adults: int = 1,
+    travelClass: Optional[str] = None,
+) -> str:
+    params = _flight_offer_params(
+        originLocationCode, destinationLocationCode, departureDate, returnDate, adults, travelClass
+    )
+    return _format_manual_booking(await _aget_flight_offers(params))
+
+
+@tool_with_async(_abook_flight_manually)
 def book_flight_manually(
     originLocationCode: str,
     destinationLocationCode: str,
@@ -247,72 +771,57 @@ def book_flight_manually(
 ) -> str:
     """
     This tool provides flight details for manual booking (not real-time booking).
-    
+
     Required:
     - originLocationCode: IATA code of departure airport.
     - destinationLocationCode: IATA code of destination airport.
     - departureDate: Flight departure date.
-    
+
     Optional:
     - returnDate: Return trip date.
     - adults: Number of passengers.
     - travelClass: ECONOMY, BUSINESS, etc.
-    
+
     Returns:
     A single recommended flight with info for manual booking.
     """
-    token = get_amadeus_token()
-    url = "https://test.api.amadeus.com/v2/shopping/flight-offers"
-    params = {
-        "originLocationCode": originLocationCode,
-        "destinationLocationCode": destinationLocationCode,
-        "departureDate": departureDate,
-        "adults": adults,
-    }
-
-    if returnDate:
-        params["returnDate"] = returnDate
-    if travelClass:
-        params["travelClass"] = travelClass
+    params = _flight_offer_params(
+        originLocationCode, destinationLocationCode, departureDate, returnDate, adults, travelClass
+    )
+    return _format_manual_booking(_get_flight_offers(params))
 
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(url, params=params, headers=headers)
-    response.raise_for_status()
 
-    data = response.json()
+def _format_checkin_links(airlineCode: str, data: Dict[str, Any]) -> str:
     if not data.get("data"):
-        return "No flights found for the given criteria."
+        return f"No check-in links found for airline: {airlineCode.upper()}"
 
-    offer = data["data"][0]
-    itinerary = offer["itineraries"][0]
-    segments = itinerary["segments"]
-    departure = segments[0]["departure"]
-    arrival = segments[-1]["arrival"]
-    airline = segments[0]["carrierCode"]
-    flight_number = segments[0]["number"]
-    duration = itinerary["duration"]
-    stops = len(segments) - 1
-    price = offer["price"]["total"]
-    currency = offer["price"]["currency"]
+    links = []
+    for entry in data["data"]:
+        channel = entry.get("channel", "Unknown")
+        href = entry.get("href", "No URL")
+        links.append(f"• {channel} Check-in: {href}")
 
-    return (
-        "⚠️ This tool does not support live booking.\n"
-        "Here is the flight info for manual booking:\n\n"
-        f"• From: {departure['iataCode']} at {departure['at']}\n"
-        f"• To: {arrival['iataCode']} at {arrival['at']}\n"
-        f"• Airline: {airline}\n"
-        f"• Flight Number: {airline}{flight_number}\n"
-        f"• Duration: {duration}\n"
-        f"• Stops: {stops}\n"
-        f"• Price: {price} {currency}"
-    )
-    
-from langchain_core.tools import tool
-import requests
-from typing import Optional
-from src.utils.help import get_amadeus_token
+    return f"✈️ Online Check-in Links for {airlineCode.upper()}:\n" + "\n".join(links)
 
-@tool
+
+async def _aget_checkin_links(
+    airlineCode: str,
+    language: Optional[str] = "en-GB"
+) -> str:
+    params = {
+        "airlineCode": airlineCode,
+        "language": language
+    }
+
+    try:
+        response = await amadeus_aget(CHECKIN_LINKS_PATH, params=params)
+        response.raise_for_status()
+        return _format_checkin_links(airlineCode, response.json())
+    except httpx.HTTPError as e:
+        return f"❌ Error fetching check-in link: {str(e)}"
+
+
+@tool_with_async(_aget_checkin_links)
 def get_checkin_links(
     airlineCode: str,  # e.g., "BA", "AF", "1X"
     language: Optional[str] = "en-GB"  # e.g., "EN", "en-GB"
@@ -329,35 +838,14 @@ def get_checkin_links(
     Returns:
     Direct check-in URLs (web & mobile) for the airline, or an appropriate message if unavailable.
     """
-    token = get_amadeus_token()
-    url = "https://test.api.amadeus.com/v2/reference-data/urls/checkin-links"
-    headers = {"Authorization": f"Bearer {token}"}
     params = {
         "airlineCode": airlineCode,
         "language": language
     }
 
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = amadeus_get(CHECKIN_LINKS_PATH, params=params)
         response.raise_for_status()
-        data = response.json()
-
-        if not data.get("data"):
-            return f"No check-in links found for airline: {airlineCode.upper()}"
-
-        links = []
-        for entry in data["data"]:
-            channel = entry.get("channel", "Unknown")
-            href = entry.get("href", "No URL")
-            links.append(f"• {channel} Check-in: {href}")
-
-        return f"✈️ Online Check-in Links for {airlineCode.upper()}:\n" + "\n".join(links)
-
-    except requests.exceptions.RequestException as e:
+        return _format_checkin_links(airlineCode, response.json())
+    except httpx.HTTPError as e:
         return f"❌ Error fetching check-in link: {str(e)}"
-
-
-
-result = get_checkin_links.invoke({"airlineCode" : "BA", "language" :"EN"})
-
-
@@ -0,0 +1,155 @@
+import csv
+import math
+import re
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+AIRPORTS_CSV = Path(__file__).resolve().parent.parent / "data" / "airports.csv"
+
+EARTH_RADIUS_KM = 6371.0088
+# Spatial grid cell size in degrees; a radius query only scans the cells its bounding box touches.
+GRID_CELL_DEG = 1.0
+
+# OurAirports facility types of the airports airlines may serve, largest first.
+AIRPORT_TYPE_RANKS = {"large_airport": 0, "medium_airport": 1, "small_airport": 2}
+# For rows without OurAirports data: military fields, air parks, seaplane docks and heliports, which airlines do not serve.
+NON_AIRLINE_AIRPORT = re.compile(
+    r"\b(?:air base|air force|raf|army|naval|air facility|air park|airfield|aerodrome|seaplane|heliport|skyport)\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class Airport:
+    iata: str
+    name: str
+    city: str
+    country: str
+    latitude: float
+    longitude: float
+    type: str = ""  # OurAirports type, e.g. "large_airport"; empty when unknown
+    scheduled: Optional[bool] = None  # has scheduled airline service; None when unknown
+
+    @property
+    def type_rank(self) -> int:
+        return AIRPORT_TYPE_RANKS.get(self.type, len(AIRPORT_TYPE_RANKS))
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km from one point to arrays of points."""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class AirportIndex:
+    """Array-backed airport store with O(1) IATA lookup and a lat/lon grid for radius queries.
+
+    Names, cities, countries and types are kept in parallel lists and
+    coordinates in NumPy arrays; ``by_iata`` maps a code to its row. The grid
+    buckets row indices into ``GRID_CELL_DEG`` cells so nearby queries only
+    compute distances for a handful of candidates. ``airline`` marks the rows
+    with scheduled service, judged by name when the data does not say.
+    """
+
+    def __init__(self, codes: List[str], names: List[str], cities: List[str], countries: List[str],
+                 lats: np.ndarray, lons: np.ndarray, types: Optional[List[str]] = None,
+                 scheduled: Optional[List[Optional[bool]]] = None):
+        self.codes = codes
+        self.names = names
+        self.cities = cities
+        self.countries = countries
+        self.lats = lats
+        self.lons = lons
+        self.types = types or [""] * len(codes)
+        self.scheduled = scheduled or [None] * len(codes)
+        self.airline = np.array([
+            known if known is not None else not NON_AIRLINE_AIRPORT.search(name)
+            for name, known in zip(names, self.scheduled)
+        ], dtype=bool)
+        self.by_iata: Dict[str, int] = {code: i for i, code in enumerate(codes)}
+        grid: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for i, cell in enumerate(zip(self._cells(lats), self._cells(lons))):
+            grid[cell].append(i)
+        self._grid = {cell: np.array(rows, dtype=np.int32) for cell, rows in grid.items()}
+
+    @staticmethod
+    def _cells(values: np.ndarray) -> List[int]:
+        return np.floor(values / GRID_CELL_DEG).astype(int).tolist()
+
+    @classmethod
+    def from_csv(cls, path: Path = AIRPORTS_CSV) -> "AirportIndex":
+        codes, names, cities, countries, lats, lons, types, scheduled = [], [], [], [], [], [], [], []
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                codes.append(row["iata"])
+                names.append(row["name"])
+                cities.append(row["city"])
+                countries.append(row["country"])
+                lats.append(float(row["lat"]))
+                lons.append(float(row["lon"]))
+                types.append(row["type"])
+                scheduled.append({"1": True, "0": False}.get(row["scheduled"]))
+        return cls(codes, names, cities, countries, np.array(lats), np.array(lons), types, scheduled)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def _airport(self, i: int) -> Airport:
+        return Airport(self.codes[i], self.names[i], self.cities[i], self.countries[i],
+                       float(self.lats[i]), float(self.lons[i]), self.types[i], self.scheduled[i])
+
+    def get(self, iata_code: str) -> Optional[Airport]:
+        i = self.by_iata.get(iata_code.strip().upper())
+        return None if i is None else self._airport(i)
+
+    def _candidates(self, latitude: float, longitude: float, radius_km: float) -> np.ndarray:
+        dlat = radius_km / 111.0
+        # Longitude degrees shrink towards the poles; near them, scan every longitude cell.
+        cos_lat = math.cos(math.radians(min(abs(latitude) + dlat, 89.9)))
+        dlon = 180.0 if cos_lat < 1e-3 else min(radius_km / (111.0 * cos_lat), 180.0)
+        lat_cells = range(math.floor((latitude - dlat) / GRID_CELL_DEG), math.floor((latitude + dlat) / GRID_CELL_DEG) + 1)
+        n_lon_cells = int(360 / GRID_CELL_DEG)
+        lon_start = math.floor((longitude - dlon) / GRID_CELL_DEG)
+        lon_end = math.floor((longitude + dlon) / GRID_CELL_DEG)
+        lon_cells = {((c + n_lon_cells // 2) % n_lon_cells) - n_lon_cells // 2 for c in range(lon_start, lon_end + 1)}
+        rows = [self._grid[(la, lo)] for la in lat_cells for lo in lon_cells if (la, lo) in self._grid]
+        return np.concatenate(rows) if rows else np.empty(0, dtype=np.int32)
+
+    def nearby(self, latitude: float, longitude: float, radius_km: float = 100,
+               limit: Optional[int] = 10, airline_only: bool = False) -> List[Tuple[Airport, float]]:
+        """Airports within ``radius_km`` of a point, closest first, with their distance in km.
+
+        ``airline_only`` leaves out airports without scheduled service, e.g. closed
+        ones, general-aviation fields, air bases and heliports.
+        """
+        rows = self._candidates(latitude, longitude, radius_km)
+        if airline_only:
+            rows = rows[self.airline[rows]]
+        if rows.size == 0:
+            return []
+        distances = haversine_km(latitude, longitude, self.lats[rows], self.lons[rows])
+        mask = distances <= radius_km
+        rows, distances = rows[mask], distances[mask]
+        order = np.argsort(distances, kind="stable")[:limit]
+        return [(self._airport(int(rows[i])), float(distances[i])) for i in order]
+
+
+_index: Optional[AirportIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_airport_index() -> AirportIndex:
+    """Shared index, loaded from the bundled CSV on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = AirportIndex.from_csv()
+    return _index
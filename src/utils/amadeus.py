@@ -0,0 +1,84 @@
+from typing import Any, Dict, Optional
+
+import httpx
+
+from src.utils.help import amadeus_token_manager
+from src.utils.http_client import ahttp_get, http_get
+from src.utils.rate_limit import RateLimiter
+from src.utils.singleflight import SingleFlight
+
+AMADEUS_BASE_URL = "https://test.api.amadeus.com"
+
+# Identical GETs in flight at the same time share one upstream request.
+amadeus_requests = SingleFlight()
+# Every request sent to Amadeus waits for a token here; the test environment allows 10 per second.
+amadeus_limiter = RateLimiter.from_env("amadeus", rate=10, burst=2, background_reserve=1)
+
+
+def _request_key(path: str, params: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]]) -> str:
+    query = sorted((k, str(v)) for k, v in (params or {}).items() if v is not None)
+    extra = sorted((headers or {}).items())
+    return f"GET {path} {query} {extra}"
+
+
+def amadeus_get(
+    path: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> httpx.Response:
+    """GET an Amadeus endpoint with the cached bearer token over the pooled client.
+
+    Args:
+        path (str): Endpoint path, e.g. ``/v2/shopping/flight-offers``.
+        params (dict): Query parameters; ``None`` values are dropped.
+        headers (dict): Extra headers merged over the authorization header.
+
+    Concurrent calls with the same path, params and headers are coalesced into
+    one HTTP request whose response is shared by every caller. Each attempt of
+    that request (see ``http_get`` for retries) first waits its turn in
+    ``amadeus_limiter``, at the caller's priority. A 401 means the token was
+    revoked before it expired: it is invalidated and the request is sent once
+    more with a new one.
+
+    Returns:
+        httpx.Response: The raw response; callers decide how to handle errors.
+    """
+    def send_with(token: str) -> httpx.Response:
+        return http_get(f"{AMADEUS_BASE_URL}{path}", params=params, limiter=amadeus_limiter, headers=_headers(token, headers))
+
+    def send() -> httpx.Response:
+        token = amadeus_token_manager.get_token()
+        response = send_with(token)
+        if response.status_code == 401:
+            amadeus_token_manager.invalidate(token)
+            response = send_with(amadeus_token_manager.get_token())
+        return response
+
+    return amadeus_requests.do(_request_key(path, params, headers), send)
+
+
+async def amadeus_aget(
+    path: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> httpx.Response:
+    """Async counterpart of ``amadeus_get``."""
+    async def send_with(token: str) -> httpx.Response:
+        return await ahttp_get(f"{AMADEUS_BASE_URL}{path}", params=params, limiter=amadeus_limiter, headers=_headers(token, headers))
+
+    async def send() -> httpx.Response:
+        token = await amadeus_token_manager.aget_token()
+        response = await send_with(token)
+        if response.status_code == 401:
+            amadeus_token_manager.invalidate(token)
+            response = await send_with(await amadeus_token_manager.aget_token())
+        return response
+
+    return await amadeus_requests.ado(_request_key(path, params, headers), send)
+
+
+def _headers(token: str, extra: Optional[Dict[str, str]]) -> Dict[str, str]:
+    request_headers = {"Authorization": f"Bearer {token}"}
+    if extra:
+        request_headers.update(extra)
+    return request_headers
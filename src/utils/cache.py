@@ -0,0 +1,313 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from dotenv import load_dotenv
+
+from src.utils.rate_limit import background_priority
+
+load_dotenv()
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    stored_at: float  # wall-clock seconds, so entries can be shared between processes
+
+
+class InMemoryBackend:
+    """Process-local LRU store bounded by ``max_entries``."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[CacheEntry, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            entry, expires_at = item
+            if time.time() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (entry, entry.stored_at + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def aget(self, key: str) -> Optional[CacheEntry]:
+        return self.get(key)
+
+    async def aset(self, key: str, entry: CacheEntry, ttl: float) -> None:
+        self.set(key, entry, ttl)
+
+
+class RedisBackend:
+    """Redis store shared by every worker; values must be JSON-serializable.
+
+    Size is bounded by Redis itself (``maxmemory`` with an LRU eviction policy);
+    keys also carry an expiry so they disappear once fully stale.
+    """
+
+    def __init__(self, url: str, prefix: str = "travel_agent:cache:"):
+        import redis
+        import redis.asyncio
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._aclient = redis.asyncio.Redis.from_url(url)
+
+    def _encode(self, entry: CacheEntry) -> str:
+        return json.dumps({"v": entry.value, "t": entry.stored_at})
+
+    def _decode(self, raw: Optional[bytes]) -> Optional[CacheEntry]:
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return CacheEntry(value=data["v"], stored_at=data["t"])
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        return self._decode(self._client.get(self.prefix + key))
+
+    def set(self, key: str, entry: CacheEntry, ttl: float) -> None:
+        self._client.set(self.prefix + key, self._encode(entry), ex=max(int(ttl), 1))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self.prefix + key)
+
+    async def aget(self, key: str) -> Optional[CacheEntry]:
+        return self._decode(await self._aclient.get(self.prefix + key))
+
+    async def aset(self, key: str, entry: CacheEntry, ttl: float) -> None:
+        await self._aclient.set(self.prefix + key, self._encode(entry), ex=max(int(ttl), 1))
+
+
+class SQLiteBackend:
+    """On-disk store in a SQLite file (WAL mode), shared by the workers of one host; values must be JSON-serializable.
+
+    Expired rows are dropped on read and swept every ``sweep_every`` writes;
+    beyond ``max_entries`` the least recently stored rows are dropped.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10_000, sweep_every: int = 100):
+        import sqlite3
+        from pathlib import Path
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.sweep_every = sweep_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, stored_at, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if time.time() >= row[2]:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+        return CacheEntry(value=json.loads(row[0]), stored_at=row[1])
+
+    def set(self, key: str, entry: CacheEntry, ttl: float) -> None:
+        value = json.dumps(entry.value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", (key, value, entry.stored_at, entry.stored_at + ttl)
+            )
+            self._writes += 1
+            if self._writes % self.sweep_every == 0:
+                self._conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+                self._conn.execute(
+                    "DELETE FROM entries WHERE key IN "
+                    "(SELECT key FROM entries ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    async def aget(self, key: str) -> Optional[CacheEntry]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, entry: CacheEntry, ttl: float) -> None:
+        await asyncio.to_thread(self.set, key, entry, ttl)
+
+
+def backend_from_env(max_entries: int) -> InMemoryBackend | RedisBackend:
+    """Pick the cache backend from ``RESPONSE_CACHE_BACKEND`` (``memory`` or ``redis``)."""
+    if os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower() == "redis":
+        return RedisBackend(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    return InMemoryBackend(max_entries=max_entries)
+
+
+class ResponseCache:
+    """TTL cache for upstream responses with stale-while-revalidate.
+
+    Entries younger than ``ttl`` are served directly. Entries up to
+    ``ttl + stale_ttl`` old are still served, but trigger one background
+    refresh per key. Older entries, and misses, fetch inline.
+
+    Args:
+        name (str): Cache name, used as key prefix and in ``stats()``.
+        backend: ``InMemoryBackend`` or ``RedisBackend``.
+        ttl (float): Seconds an entry is considered fresh.
+        stale_ttl (float): Extra seconds a stale entry may be served while it is refreshed.
+    """
+
+    def __init__(self, name: str, backend, ttl: float = 300.0, stale_ttl: float = 600.0):
+        self.name = name
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_errors = 0
+        self._refreshing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, name: str, ttl: float, stale_ttl: float, max_entries: int = 512,
+                 local: bool = False) -> "ResponseCache":
+        """Build a cache whose TTLs and size can be overridden with ``<NAME>_CACHE_*`` variables.
+
+        ``local`` always uses an ``InMemoryBackend``, for values that are not JSON-serializable.
+        """
+        prefix = f"{name.upper()}_CACHE"
+        max_entries = int(os.getenv(f"{prefix}_MAX_ENTRIES", max_entries))
+        return cls(
+            name,
+            InMemoryBackend(max_entries=max_entries) if local else backend_from_env(max_entries),
+            ttl=float(os.getenv(f"{prefix}_TTL", ttl)),
+            stale_ttl=float(os.getenv(f"{prefix}_STALE_TTL", stale_ttl)),
+        )
+
+    def _key(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    def _entry(self, value: Any) -> CacheEntry:
+        return CacheEntry(value=value, stored_at=time.time())
+
+    def _age(self, entry: CacheEntry) -> float:
+        return time.time() - entry.stored_at
+
+    def _claim_refresh(self, key: str) -> bool:
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _release_refresh(self, key: str, failed: bool) -> None:
+        with self._lock:
+            self._refreshing.discard(key)
+            if failed:
+                self.refresh_errors += 1
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, calling ``fetch`` on a miss."""
+        key = self._key(key)
+        entry = self.backend.get(key)
+        if entry is not None:
+            age = self._age(entry)
+            if age < self.ttl:
+                self.hits += 1
+                return entry.value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                if self._claim_refresh(key):
+                    threading.Thread(target=self._refresh, args=(key, fetch), daemon=True).start()
+                return entry.value
+
+        self.misses += 1
+        value = fetch()
+        self.backend.set(key, self._entry(value), self.ttl + self.stale_ttl)
+        return value
+
+    async def aget_or_fetch(self, key: str, afetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Async counterpart of ``get_or_fetch``; stale refreshes run as event-loop tasks."""
+        key = self._key(key)
+        entry = await self.backend.aget(key)
+        if entry is not None:
+            age = self._age(entry)
+            if age < self.ttl:
+                self.hits += 1
+                return entry.value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                if self._claim_refresh(key):
+                    task = asyncio.create_task(self._arefresh(key, afetch))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                return entry.value
+
+        self.misses += 1
+        value = await afetch()
+        await self.backend.aset(key, self._entry(value), self.ttl + self.stale_ttl)
+        return value
+
+    def _refresh(self, key: str, fetch: Callable[[], Any]) -> None:
+        failed = False
+        try:
+            # A stale entry is still being served, so the refresh yields to interactive requests.
+            with background_priority():
+                value = fetch()
+            self.backend.set(key, self._entry(value), self.ttl + self.stale_ttl)
+        except Exception:
+            failed = True
+        finally:
+            self._release_refresh(key, failed)
+
+    async def _arefresh(self, key: str, afetch: Callable[[], Awaitable[Any]]) -> None:
+        failed = False
+        try:
+            with background_priority():
+                value = await afetch()
+            await self.backend.aset(key, self._entry(value), self.ttl + self.stale_ttl)
+        except Exception:
+            failed = True
+        finally:
+            self._release_refresh(key, failed)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refresh_errors": self.refresh_errors,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,525 @@
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator, Sequence
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import ormsgpack
+from dotenv import load_dotenv
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+
+load_dotenv()
+
+# Blob type for a message-list channel stored as references into the ``messages`` table.
+MESSAGE_REFS = "message_refs"
+# SQLite caps bound parameters per statement; id lookups are batched below it.
+SQL_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS messages (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    message_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, message_id)
+);
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL
+);
+"""
+THREAD_TABLES = ("checkpoints", "blobs", "writes", "messages", "threads")
+
+
+def _is_message_list(value: Any) -> bool:
+    return (
+        isinstance(value, list)
+        and bool(value)
+        and all(isinstance(m, BaseMessage) and m.id for m in value)
+    )
+
+
+class SQLiteCheckpointer(BaseCheckpointSaver[str]):
+    """File-backed checkpointer on SQLite in WAL mode, shareable by several worker processes.
+
+    Values are encoded with the saver's serde (msgpack). Like ``InMemorySaver``,
+    a channel is only written when its version changes. Message-list channels
+    such as ``messages`` are stored incrementally: each message is written
+    once to the ``messages`` table, and a checkpoint stores only the ordered
+    list of message ids. Step cost therefore stays flat as a thread grows.
+    Messages are treated as immutable once written. A message replaced under
+    the same id keeps its first stored version.
+
+    Each thread's last write time is kept in the ``threads`` table, so
+    ``expire`` can drop idle threads from the state every worker shares.
+
+    Args:
+        path: SQLite database file; created with its tables if missing.
+        keep_last (int): Checkpoints kept per thread and namespace by the automatic pruning
+            that runs every ``prune_every`` writes to a thread; 0 disables it.
+    """
+
+    def __init__(self, path: str | Path, keep_last: int = 20, prune_every: int = 50, *, serde=None):
+        super().__init__(serde=serde)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.keep_last = keep_last
+        self.prune_every = prune_every
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        # Threads from files written before the threads table existed start their idle time now.
+        self._conn.execute(
+            "INSERT OR IGNORE INTO threads SELECT DISTINCT thread_id, ? FROM checkpoints", (time.time(),)
+        )
+        self._lock = threading.RLock()
+        # (thread_id, checkpoint_ns) -> message ids known to be stored, so only new messages are encoded.
+        self._known_messages: "OrderedDict[Tuple[str, str], Set[str]]" = OrderedDict()
+        self._puts_since_prune: Dict[Tuple[str, str], int] = {}
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # -- encoding ---------------------------------------------------------
+
+    def _known(self, thread_id: str, checkpoint_ns: str) -> Set[str]:
+        key = (thread_id, checkpoint_ns)
+        known = self._known_messages.get(key)
+        if known is None:
+            rows = self._conn.execute(
+                "SELECT message_id FROM messages WHERE thread_id = ? AND checkpoint_ns = ?", key
+            )
+            known = self._known_messages[key] = {row[0] for row in rows}
+            while len(self._known_messages) > 1024:
+                self._known_messages.popitem(last=False)
+        self._known_messages.move_to_end(key)
+        return known
+
+    def _dump_channel(self, thread_id: str, checkpoint_ns: str, value: Any) -> Tuple[str, bytes]:
+        if not _is_message_list(value):
+            return self.serde.dumps_typed(value)
+        known = self._known(thread_id, checkpoint_ns)
+        new = [m for m in value if m.id not in known]
+        if new:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO messages VALUES (?, ?, ?, ?, ?)",
+                [(thread_id, checkpoint_ns, m.id, *self.serde.dumps_typed(m)) for m in new],
+            )
+            known.update(m.id for m in new)
+        return MESSAGE_REFS, ormsgpack.packb([m.id for m in value])
+
+    def _load_messages(self, thread_id: str, checkpoint_ns: str, ids: List[str]) -> List[BaseMessage]:
+        by_id: Dict[str, BaseMessage] = {}
+        for i in range(0, len(ids), SQL_BATCH):
+            batch = ids[i:i + SQL_BATCH]
+            rows = self._conn.execute(
+                f"SELECT message_id, type, value FROM messages WHERE thread_id = ? AND checkpoint_ns = ? "
+                f"AND message_id IN ({','.join('?' * len(batch))})",
+                (thread_id, checkpoint_ns, *batch),
+            )
+            for message_id, type_, value in rows:
+                by_id[message_id] = self.serde.loads_typed((type_, value))
+        return [by_id[message_id] for message_id in ids if message_id in by_id]
+
+    def _load_blobs(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        for channel, version in versions.items():
+            row = self._conn.execute(
+                "SELECT type, value FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if row is None or row[0] == "empty":
+                continue
+            if row[0] == MESSAGE_REFS:
+                values[channel] = self._load_messages(thread_id, checkpoint_ns, ormsgpack.unpackb(row[1]))
+            else:
+                values[channel] = self.serde.loads_typed(row)
+        return values
+
+    def _tuple(self, thread_id: str, checkpoint_ns: str, row: tuple) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, type_, checkpoint, metadata = row
+        checkpoint_: Checkpoint = self.serde.loads_typed((type_, checkpoint))
+        writes = self._conn.execute(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint={
+                **checkpoint_,
+                "channel_values": self._load_blobs(thread_id, checkpoint_ns, checkpoint_["channel_versions"]),
+            },
+            metadata=self.serde.loads_typed((type_, metadata)),
+            pending_writes=[(task_id, channel, self.serde.loads_typed((t, v))) for task_id, channel, t, v in writes],
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_checkpoint_id}}
+                if parent_checkpoint_id
+                else None
+            ),
+        )
+
+    # -- BaseCheckpointSaver ----------------------------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        query = (
+            "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata FROM checkpoints "
+            "WHERE thread_id = ? AND checkpoint_ns = ?"
+        )
+        params: Tuple = (thread_id, checkpoint_ns)
+        if checkpoint_id := get_checkpoint_id(config):
+            query += " AND checkpoint_id = ?"
+            params += (checkpoint_id,)
+        else:
+            query += " ORDER BY checkpoint_id DESC LIMIT 1"
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+            return self._tuple(thread_id, checkpoint_ns, row) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata FROM checkpoints"
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY checkpoint_id DESC"
+
+        # Tuples are built under the lock and yielded after it is released, so a slow or
+        # abandoned consumer never blocks other threads' reads and writes.
+        tuples = []
+        with self._lock:
+            for thread_id, checkpoint_ns, *row in self._conn.execute(query, params).fetchall():
+                if limit is not None and len(tuples) >= limit:
+                    break
+                if filter:
+                    metadata = self.serde.loads_typed((row[2], row[4]))
+                    if not all(metadata.get(k) == v for k, v in filter.items()):
+                        continue
+                tuples.append(self._tuple(thread_id, checkpoint_ns, tuple(row)))
+        yield from tuples
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        c = checkpoint.copy()
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        values: Dict[str, Any] = c.pop("channel_values")  # type: ignore[misc]
+        type_, checkpoint_blob = self.serde.dumps_typed(c)
+        _, metadata_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (thread_id, checkpoint_ns, channel, str(version),
+                         *(self._dump_channel(thread_id, checkpoint_ns, values[channel]) if channel in values else ("empty", b"")))
+                        for channel, version in new_versions.items()
+                    ],
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                     type_, checkpoint_blob, metadata_blob),
+                )
+                self._conn.execute("INSERT OR REPLACE INTO threads VALUES (?, ?)", (thread_id, time.time()))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                # The known-ids cache may list messages whose insert was rolled back.
+                self._known_messages.pop((thread_id, checkpoint_ns), None)
+                raise
+            self._maybe_prune(thread_id, checkpoint_ns)
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        special, regular = [], []
+        for idx, (channel, value) in enumerate(writes):
+            row = (thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx), channel,
+                   *self.serde.dumps_typed(value), task_path)
+            (special if channel in WRITES_IDX_MAP else regular).append(row)
+        # Special writes (errors, interrupts) overwrite; regular writes keep the first attempt, as in InMemorySaver.
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", special)
+            self._conn.executemany("INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", regular)
+
+    def _delete_threads(self, thread_ids: Sequence[str]) -> None:
+        """Delete every row of ``thread_ids``; runs inside the caller's transaction."""
+        for i in range(0, len(thread_ids), SQL_BATCH):
+            batch = list(thread_ids[i:i + SQL_BATCH])
+            for table in THREAD_TABLES:
+                self._conn.execute(f"DELETE FROM {table} WHERE thread_id IN ({','.join('?' * len(batch))})", batch)
+
+    def _forget(self, thread_ids: Sequence[str]) -> None:
+        deleted = set(thread_ids)
+        for key in [key for key in self._known_messages if key[0] in deleted]:
+            del self._known_messages[key]
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._delete_threads([thread_id])
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._forget([thread_id])
+
+    def expire(self, ttl: float, interval: float = 0.0) -> List[str]:
+        """Delete the threads no worker has written for ``ttl`` seconds; returns their ids.
+
+        The idle time comes from the shared ``threads`` table and is checked in
+        the same write transaction as the delete, so a thread another worker
+        just wrote to is never removed. The sweep is skipped when any worker
+        sharing the file swept less than ``interval`` seconds ago.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                last_sweep = self._conn.execute("SELECT value FROM meta WHERE key = 'last_sweep'").fetchone()
+                if last_sweep and now - last_sweep[0] < interval:
+                    self._conn.execute("COMMIT")
+                    return []
+                self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('last_sweep', ?)", (now,))
+                expired = [row[0] for row in self._conn.execute(
+                    "SELECT thread_id FROM threads WHERE updated_at < ?", (now - ttl,)
+                )]
+                self._delete_threads(expired)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._forget(expired)
+        return expired
+
+    def prune(self, thread_ids: Sequence[str], *, strategy: str = "keep_latest") -> None:
+        """Drop old checkpoints: ``keep_latest`` keeps the newest per namespace, ``delete`` removes all."""
+        for thread_id in thread_ids:
+            if strategy == "delete":
+                self.delete_thread(thread_id)
+                continue
+            with self._lock:
+                namespaces = [row[0] for row in self._conn.execute(
+                    "SELECT DISTINCT checkpoint_ns FROM checkpoints WHERE thread_id = ?", (thread_id,)
+                )]
+                for checkpoint_ns in namespaces:
+                    self._prune(thread_id, checkpoint_ns, keep=1)
+
+    def _maybe_prune(self, thread_id: str, checkpoint_ns: str) -> None:
+        if not self.keep_last:
+            return
+        key = (thread_id, checkpoint_ns)
+        self._puts_since_prune[key] = self._puts_since_prune.get(key, 0) + 1
+        if self._puts_since_prune[key] >= self.prune_every:
+            self._puts_since_prune.pop(key)
+            self._prune(thread_id, checkpoint_ns, keep=self.keep_last)
+
+    def _prune(self, thread_id: str, checkpoint_ns: str, keep: int) -> None:
+        """Keep the newest ``keep`` checkpoints of a namespace, with the blobs and messages they reference."""
+        scope = (thread_id, checkpoint_ns)
+        # Everything is read inside the write transaction so checkpoints added by other workers are kept.
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            kept = self._conn.execute(
+                "SELECT checkpoint_id, type, checkpoint FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT ?",
+                (*scope, keep),
+            ).fetchall()
+            if not kept:
+                self._conn.execute("COMMIT")
+                return
+            oldest_kept = kept[-1][0]
+            versions = set()
+            for _, type_, checkpoint in kept:
+                versions.update(
+                    (ch, str(v)) for ch, v in self.serde.loads_typed((type_, checkpoint))["channel_versions"].items()
+                )
+            self._conn.execute(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?", (*scope, oldest_kept)
+            )
+            self._conn.execute(
+                "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?", (*scope, oldest_kept)
+            )
+            blobs = self._conn.execute(
+                "SELECT channel, version, type, value FROM blobs WHERE thread_id = ? AND checkpoint_ns = ?", scope
+            ).fetchall()
+            self._conn.executemany(
+                "DELETE FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                [(*scope, ch, v) for ch, v, _, _ in blobs if (ch, v) not in versions],
+            )
+            referenced = {
+                message_id
+                for ch, v, type_, value in blobs
+                if type_ == MESSAGE_REFS and (ch, v) in versions
+                for message_id in ormsgpack.unpackb(value)
+            }
+            orphans = [row[0] for row in self._conn.execute(
+                "SELECT message_id FROM messages WHERE thread_id = ? AND checkpoint_ns = ?", scope
+            ) if row[0] not in referenced]
+            self._conn.executemany(
+                "DELETE FROM messages WHERE thread_id = ? AND checkpoint_ns = ? AND message_id = ?",
+                [(*scope, m) for m in orphans],
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        if scope in self._known_messages:
+            self._known_messages[scope].difference_update(orphans)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # -- async: SQLite calls are short, so they run in a worker thread ----
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    async def aexpire(self, ttl: float, interval: float = 0.0) -> List[str]:
+        return await asyncio.to_thread(self.expire, ttl, interval)
+
+    async def aprune(self, thread_ids: Sequence[str], *, strategy: str = "keep_latest") -> None:
+        await asyncio.to_thread(self.prune, thread_ids, strategy=strategy)
+
+
+def create_checkpointer(name: str) -> BaseCheckpointSaver:
+    """Checkpointer for the graph ``name``, chosen by ``CHECKPOINTER`` (``memory`` or ``sqlite``).
+
+    SQLite checkpoints go to ``<CHECKPOINT_DIR>/<name>.sqlite`` so graphs sharing
+    thread ids do not share state.
+    """
+    if os.getenv("CHECKPOINTER", "memory").lower() != "sqlite":
+        return InMemorySaver()
+    return SQLiteCheckpointer(
+        Path(os.getenv("CHECKPOINT_DIR", ".checkpoints")) / f"{name}.sqlite",
+        keep_last=int(os.getenv("CHECKPOINT_KEEP_LAST", 20)),
+    )
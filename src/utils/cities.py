@@ -0,0 +1,146 @@
+import bisect
+import csv
+import threading
+import unicodedata
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+CITIES_CSV = Path(__file__).resolve().parent.parent / "data" / "cities.csv"
+
+
+def normalize_name(name: str) -> str:
+    """Upper-case, accent-free, single-spaced form used as the index key (``São-Paulo`` -> ``SAO PAULO``)."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.upper().replace("-", " ").split())
+
+
+@dataclass(frozen=True)
+class City:
+    name: str
+    country: str
+    latitude: float
+    longitude: float
+    population: int = 0
+    iata: Optional[str] = None
+
+
+class CityIndex:
+    """Prefix index over normalized city names, kept as a sorted array searched with ``bisect``.
+
+    Seeded from the bundled ``cities.csv`` and grown with every city the
+    Amadeus API returns, so repeated keyword and coordinate lookups are
+    answered without network I/O. Cities learned from Amadeus replace the
+    seeded entry for the same name and country, since they carry the
+    Amadeus city code.
+    """
+
+    def __init__(self, cities: Iterable[City] = ()):
+        self._lock = threading.Lock()
+        self._keys: List[Tuple[str, str]] = []  # (normalized name, country), sorted
+        self._cities: List[City] = []  # parallel to _keys
+        for city in cities:
+            self._add(city)
+
+    @classmethod
+    def from_csv(cls, path: Path = CITIES_CSV) -> "CityIndex":
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        index = cls()
+        entries = [
+            (
+                (normalize_name(row["name"]), row["country"]),
+                City(
+                    name=row["name"],
+                    country=row["country"],
+                    latitude=float(row["lat"]),
+                    longitude=float(row["lon"]),
+                    population=int(row["population"]),
+                    iata=row["iata"] or None,
+                ),
+            )
+            for row in rows
+        ]
+        entries.sort(key=lambda entry: entry[0])
+        # Keep the most populous city when a name repeats within a country.
+        for key, city in entries:
+            if index._keys and index._keys[-1] == key:
+                if city.population > index._cities[-1].population:
+                    index._cities[-1] = city
+                continue
+            index._keys.append(key)
+            index._cities.append(city)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _add(self, city: City) -> None:
+        key = (normalize_name(city.name), city.country)
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            existing = self._cities[i]
+            self._cities[i] = replace(
+                city,
+                population=city.population or existing.population,
+                iata=city.iata or existing.iata,
+            )
+        else:
+            self._keys.insert(i, key)
+            self._cities.insert(i, city)
+
+    def add(self, city: City) -> None:
+        with self._lock:
+            self._add(city)
+
+    def add_amadeus_locations(self, locations: List[Dict[str, Any]]) -> None:
+        """Learn the cities of a ``/reference-data/locations/cities`` response."""
+        for location in locations:
+            geo = location.get("geoCode") or {}
+            country = (location.get("address") or {}).get("countryCode")
+            if not location.get("name") or not country or "latitude" not in geo:
+                continue
+            self.add(City(
+                name=location["name"].title(),
+                country=country,
+                latitude=float(geo["latitude"]),
+                longitude=float(geo["longitude"]),
+                iata=location.get("iataCode"),
+            ))
+
+    def iata_codes(self) -> FrozenSet[str]:
+        """Every city code in the index, e.g. ``PAR`` or ``NYC``."""
+        with self._lock:
+            return frozenset(city.iata for city in self._cities if city.iata)
+
+    def search(self, keyword: str, country: Optional[str] = None, limit: Optional[int] = 3) -> List[City]:
+        """Cities whose name starts with ``keyword``, optionally in ``country``, most populous first."""
+        prefix = normalize_name(keyword)
+        if not prefix:
+            return []
+        country = country.upper() if country else None
+        matches = []
+        with self._lock:
+            i = bisect.bisect_left(self._keys, (prefix, ""))
+            while i < len(self._keys) and self._keys[i][0].startswith(prefix):
+                if country is None or self._keys[i][1] == country:
+                    matches.append((self._keys[i][0] != prefix, -self._cities[i].population, i, self._cities[i]))
+                i += 1
+        # Exact name matches first, then by population.
+        matches.sort(key=lambda m: m[:3])
+        return [m[3] for m in matches[:limit]]
+
+
+_index: Optional[CityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_city_index() -> CityIndex:
+    """Shared index, loaded from the bundled CSV on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = CityIndex.from_csv()
+    return _index
@@ -0,0 +1,126 @@
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ISO_DURATION = re.compile(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?")
+
+# Criterion weights per ranking preset; "best" can be tuned with FLIGHT_RANK_WEIGHTS="price=0.5,duration=0.3,stops=0.2".
+RANKING_PRESETS: Dict[str, Dict[str, float]] = {
+    "best": {"price": 0.5, "duration": 0.3, "stops": 0.2},
+    "cheapest": {"price": 1.0, "duration": 0.05, "stops": 0.05},
+    "fastest": {"price": 0.05, "duration": 1.0, "stops": 0.1},
+    "fewest_stops": {"price": 0.1, "duration": 0.1, "stops": 1.0},
+}
+
+
+def _weights_from_env() -> None:
+    spec = os.getenv("FLIGHT_RANK_WEIGHTS")
+    if spec:
+        RANKING_PRESETS["best"] = {
+            name.strip(): float(weight) for name, weight in (item.split("=") for item in spec.split(",") if "=" in item)
+        }
+
+
+_weights_from_env()
+
+
+def duration_minutes(duration: str) -> float:
+    """Minutes in an ISO 8601 duration such as ``PT2H30M`` or ``P1DT2H``; NaN if it does not parse."""
+    match = ISO_DURATION.fullmatch(duration or "")
+    if not match or not any(match.groups()):
+        return np.nan
+    days, hours, minutes = (int(part or 0) for part in match.groups())
+    return days * 1440 + hours * 60 + minutes
+
+
+def slim_offer(offer: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of an Amadeus flight offer the tools show, so cached responses stay small."""
+    return {
+        "price": {"total": offer["price"]["total"], "currency": offer["price"]["currency"]},
+        "itineraries": [
+            {
+                "duration": itinerary.get("duration"),
+                "segments": [
+                    {
+                        "carrierCode": segment["carrierCode"],
+                        "number": segment["number"],
+                        "departure": {"iataCode": segment["departure"]["iataCode"], "at": segment["departure"]["at"]},
+                        "arrival": {"iataCode": segment["arrival"]["iataCode"], "at": segment["arrival"]["at"]},
+                    }
+                    for segment in itinerary["segments"]
+                ],
+            }
+            for itinerary in offer["itineraries"]
+        ],
+    }
+
+
+class FlightOffers:
+    """Columnar copy of a ``/v2/shopping/flight-offers`` response, ranked locally.
+
+    The offers are kept as returned, alongside NumPy columns of their total
+    price, total flight time in minutes, total stops and outbound departure
+    time (minutes after midnight), so a whole response is scored in a few
+    vectorized operations.
+    """
+
+    def __init__(self, offers: List[Dict[str, Any]], prices: np.ndarray, durations: np.ndarray,
+                 stops: np.ndarray, departures: np.ndarray):
+        self.offers = offers
+        self.prices = prices
+        self.durations = durations
+        self.stops = stops
+        self.departures = departures
+
+    @classmethod
+    def from_response(cls, data: Dict[str, Any]) -> "FlightOffers":
+        offers = data.get("data", [])
+        prices, durations, stops, departures = [], [], [], []
+        for offer in offers:
+            itineraries = offer["itineraries"]
+            prices.append(float(offer["price"]["total"]))
+            durations.append(sum(duration_minutes(itinerary.get("duration")) for itinerary in itineraries))
+            stops.append(sum(len(itinerary["segments"]) - 1 for itinerary in itineraries))
+            at = itineraries[0]["segments"][0]["departure"]["at"]  # 2026-11-02T07:30:00
+            departures.append(int(at[11:13]) * 60 + int(at[14:16]))
+        return cls(offers, np.array(prices, dtype=float), np.array(durations, dtype=float),
+                   np.array(stops, dtype=float), np.array(departures, dtype=float))
+
+    def __len__(self) -> int:
+        return len(self.offers)
+
+    def scores(self, weights: Dict[str, float], departure_minute: Optional[float] = None) -> np.ndarray:
+        """Weighted sum of each criterion scaled to [0, 1] across the offers; lower is better.
+
+        ``departure`` in ``weights`` only counts when ``departure_minute`` is
+        given, and scores the gap to that time of day.
+        """
+        columns = {"price": self.prices, "duration": self.durations, "stops": self.stops}
+        if departure_minute is not None:
+            gap = np.abs(self.departures - departure_minute)
+            columns["departure"] = np.minimum(gap, 1440 - gap)
+        total = np.zeros(len(self))
+        for name, weight in weights.items():
+            column = columns.get(name)
+            if column is None or not weight:
+                continue
+            low, high = np.nanmin(column), np.nanmax(column)
+            scaled = (column - low) / (high - low) if high > low else np.zeros(len(self))
+            # Offers missing a value rank as the worst on that criterion.
+            total += weight * np.nan_to_num(scaled, nan=1.0)
+        return total
+
+    def rank(self, preset: str = "best", limit: Optional[int] = 3, departure_minute: Optional[float] = None) -> List[int]:
+        """Indices of the best offers under a ``RANKING_PRESETS`` preset, best first; ties keep the API order."""
+        if not len(self):
+            return []
+        weights = dict(RANKING_PRESETS.get(preset, RANKING_PRESETS["best"]))
+        if departure_minute is not None:
+            weights.setdefault("departure", 0.3)
+        order = np.argsort(self.scores(weights, departure_minute), kind="stable")
+        return [int(i) for i in order[:limit]]
@@ -1,6 +1,8 @@
-import requests
+import asyncio
 import os 
 import sys 
+import threading
+import time
 from dotenv import load_dotenv 
 from typing import Dict , List
 from langchain_core.messages import ToolMessage 
@@ -11,20 +13,141 @@ from typing import Optional
 from langchain_core.utils.utils import secret_from_env
 from langchain_openai import ChatOpenAI
 from pydantic import Field, SecretStr
-from typing import Dict, Set, Any, List, Union
+from typing import Dict, Set, Any, List, Union, Callable
 from langchain_core.messages import BaseMessage 
+from langchain_core.tools import StructuredTool
+from src.utils.http_client import http_post
 
 load_dotenv() 
-def get_amadeus_token() -> str:
-    url = "https://test.api.amadeus.com/v1/security/oauth2/token"
+
+AMADEUS_TOKEN_URL = "https://test.api.amadeus.com/v1/security/oauth2/token"
+
+
+def _fetch_amadeus_token() -> Dict[str, Any]:
     payload = {
         "grant_type": "client_credentials",
         "client_id": os.getenv("AMADEUS_CLIENT_ID"),
         "client_secret": os.getenv("AMADEUS_CLIENT_SECRET"),
     }
-    response = requests.post(url, data=payload)
+    response = http_post(AMADEUS_TOKEN_URL, data=payload, idempotent=True)
     response.raise_for_status()
-    return response.json()["access_token"]
+    return response.json()
+
+
+class AmadeusTokenManager:
+    """Process-wide cache for the Amadeus OAuth access token.
+
+    The token is reused until ``refresh_margin`` seconds before it expires. Inside
+    that window callers keep getting the current token while a single background
+    thread fetches the next one. Only a missing or expired token makes callers
+    wait, and then all of them share one request to the token endpoint.
+
+    Args:
+        fetcher (Callable): Returns the token endpoint JSON (``access_token`` and ``expires_in``).
+        refresh_margin (float): Seconds before expiry at which a background refresh starts.
+        expiry_skew (float): Seconds before expiry at which the token is no longer handed out.
+    """
+
+    def __init__(
+        self,
+        fetcher: Callable[[], Dict[str, Any]] = _fetch_amadeus_token,
+        refresh_margin: float = 60.0,
+        expiry_skew: float = 5.0,
+    ):
+        self._fetcher = fetcher
+        self._refresh_margin = refresh_margin
+        self._expiry_skew = expiry_skew
+        self._cond = threading.Condition()
+        self._token: Optional[str] = None
+        self._refresh_at = 0.0
+        self._expires_at = 0.0
+        self._refreshing = False
+        self._last_error: Optional[BaseException] = None
+        self.fetch_count = 0
+
+    def get_token(self) -> str:
+        """Return a valid access token, fetching one only when needed."""
+        token = self._token
+        if token is not None and time.monotonic() < self._refresh_at:
+            return token
+
+        with self._cond:
+            if self._token is not None and time.monotonic() < self._expires_at:
+                if not self._refreshing:
+                    self._refreshing = True
+                    threading.Thread(
+                        target=self._refresh, name="amadeus-token-refresh", daemon=True
+                    ).start()
+                return self._token
+
+            if self._refreshing:
+                while self._refreshing:
+                    self._cond.wait()
+                return self._current_or_raise()
+            self._refreshing = True
+
+        self._refresh()
+        with self._cond:
+            return self._current_or_raise()
+
+    async def aget_token(self) -> str:
+        """Async variant of ``get_token``; never blocks the event loop on a refresh."""
+        token = self._token
+        if token is not None and time.monotonic() < self._refresh_at:
+            return token
+        return await asyncio.to_thread(self.get_token)
+
+    def invalidate(self, token: Optional[str] = None) -> None:
+        """Drop the cached token, e.g. after the API rejected it with a 401.
+
+        With ``token``, only drop it if it is still the cached one, so callers
+        whose requests all failed with the same token trigger one refresh.
+        """
+        with self._cond:
+            if token is not None and token != self._token:
+                return
+            self._token = None
+            self._refresh_at = self._expires_at = 0.0
+
+    def _current_or_raise(self) -> str:
+        if self._token is not None and time.monotonic() < self._expires_at:
+            return self._token
+        if self._last_error is not None:
+            raise self._last_error
+        raise RuntimeError("Amadeus token refresh did not produce a token")
+
+    def _refresh(self) -> None:
+        try:
+            data = self._fetcher()
+            token = data["access_token"]
+            expires_in = float(data.get("expires_in", 1799))
+        except Exception as e:
+            with self._cond:
+                self._last_error = e
+                self._refreshing = False
+                self._cond.notify_all()
+            return
+
+        now = time.monotonic()
+        with self._cond:
+            self.fetch_count += 1
+            self._token = token
+            self._refresh_at = now + max(expires_in - self._refresh_margin, 0.0)
+            self._expires_at = now + max(expires_in - self._expiry_skew, 0.0)
+            self._last_error = None
+            self._refreshing = False
+            self._cond.notify_all()
+
+
+amadeus_token_manager = AmadeusTokenManager()
+
+
+def get_amadeus_token() -> str:
+    return amadeus_token_manager.get_token()
+
+
+async def aget_amadeus_token() -> str:
+    return await amadeus_token_manager.aget_token()
 
 
 
@@ -47,7 +170,8 @@ def handle_tool_error(state) -> Dict  :
         "messages" : [
             ToolMessage(
                 content=f"Error : {repr(error)} \n please fix your mistakes" , 
-                tool_call_id = tc["id"]
+                tool_call_id = tc["id"] , 
+                status="error"
             ) 
             for tc in tool_calls
         ]
@@ -70,6 +194,22 @@ def create_tool_node_with_fallback(tools : List) -> Dict :
     
     
 
+def tool_with_async(coroutine: Callable) -> Callable[[Callable], StructuredTool]:
+    """
+        Decorator that turns a sync function into a tool backed by ``coroutine`` for ``ainvoke``.
+
+    Args :
+        coroutine (Callable) : Async implementation with the same signature as the decorated function.
+
+    Return :
+        Callable : A decorator returning a StructuredTool named after the decorated function.
+    """
+    def decorator(func: Callable) -> StructuredTool:
+        return StructuredTool.from_function(func=func, coroutine=coroutine)
+
+    return decorator
+
+
 def print_event(event: dict, _printed: set, max_length=1500):
     current_state = event.get("dialog_state")
     if current_state:
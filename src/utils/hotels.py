@@ -0,0 +1,63 @@
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.airports import haversine_km
+
+
+class HotelList:
+    """Columnar copy of one city's ``/locations/hotels/by-city`` response.
+
+    Ids, names and addresses are kept in parallel lists and coordinates and
+    distances in NumPy arrays, so searches with a smaller radius or a
+    different sort point are answered by filtering the cached arrays.
+
+    Args:
+        radius_km (float): Radius the list was fetched with; queries up to it can be answered locally.
+    """
+
+    def __init__(self, radius_km: float, ids: List[str], names: List[str], addresses: List[Optional[Dict]],
+                 lats: np.ndarray, lons: np.ndarray, distances: np.ndarray):
+        self.radius_km = radius_km
+        self.ids = ids
+        self.names = names
+        self.addresses = addresses
+        self.lats = lats
+        self.lons = lons
+        self.distances = distances  # km from the city centre, as reported by Amadeus
+
+    @classmethod
+    def from_response(cls, data: Dict[str, Any], radius_km: float) -> "HotelList":
+        ids, names, addresses, lats, lons, distances = [], [], [], [], [], []
+        for item in data.get("data", []):
+            geo = item.get("geoCode") or {}
+            distance = item.get("distance") or {}
+            ids.append(item.get("hotelId", "no id"))
+            names.append(item.get("name", "without name"))
+            addresses.append(item.get("address"))
+            lats.append(geo.get("latitude", math.nan))
+            lons.append(geo.get("longitude", math.nan))
+            value = distance.get("value", math.nan)
+            distances.append(value * 1.609344 if distance.get("unit") == "MILE" else value)
+        return cls(radius_km, ids, names, addresses,
+                   np.array(lats, dtype=float), np.array(lons, dtype=float), np.array(distances, dtype=float))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def query(self, radius_km: float, latitude: Optional[float] = None, longitude: Optional[float] = None,
+              limit: Optional[int] = 10) -> List[Tuple[int, float]]:
+        """Rows within ``radius_km`` of the city centre with their distance in km.
+
+        Without a point, rows keep the API's order and distance to the centre;
+        with one, they are sorted by distance to that point.
+        """
+        rows = np.flatnonzero(self.distances <= radius_km)
+        if latitude is None or longitude is None:
+            rows = rows[:limit]
+            return [(int(i), float(self.distances[i])) for i in rows]
+        distances = haversine_km(latitude, longitude, self.lats[rows], self.lons[rows])
+        # Hotels without coordinates sort last.
+        order = np.argsort(np.nan_to_num(distances, nan=np.inf), kind="stable")[:limit]
+        return [(int(rows[i]), float(distances[i])) for i in order]
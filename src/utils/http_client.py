@@ -0,0 +1,258 @@
+import asyncio
+import os
+import threading
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from dotenv import load_dotenv
+
+from src.utils.resilience import RETRYABLE_STATUS, CircuitBreaker, HttpRetryPolicy
+
+load_dotenv()
+
+DEFAULT_TIMEOUT = httpx.Timeout(
+    float(os.getenv("HTTP_READ_TIMEOUT", "20")),
+    connect=float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")),
+)
+
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "50")),
+    max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE_PER_HOST", "20")),
+    keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+)
+
+# Hosts that need a pool sized differently from DEFAULT_LIMITS.
+HOST_LIMITS: Dict[str, httpx.Limits] = {
+    "ip-api.com": httpx.Limits(max_connections=5, max_keepalive_connections=2, keepalive_expiry=30.0),
+}
+
+# Endpoints that need timeouts other than DEFAULT_TIMEOUT, matched on "host/path" prefixes, longest first.
+ENDPOINT_TIMEOUTS: Dict[str, httpx.Timeout] = {
+    "test.api.amadeus.com/v1/security/oauth2/token": httpx.Timeout(10.0, connect=3.0),
+    "test.api.amadeus.com/v2/shopping/flight-offers": httpx.Timeout(30.0, connect=5.0),
+    "test.api.amadeus.com/v3/shopping/hotel-offers": httpx.Timeout(30.0, connect=5.0),
+    "test.api.amadeus.com/": httpx.Timeout(10.0, connect=3.0),
+    "api.tavily.com/": httpx.Timeout(15.0, connect=3.0),
+    "ip-api.com/": httpx.Timeout(3.0, connect=2.0),
+}
+
+HTTP_RETRY = HttpRetryPolicy.from_env()
+
+_clients: Dict[str, httpx.Client] = {}
+_clients_lock = threading.Lock()
+
+# Async clients hold connections bound to the loop that opened them, so they are kept per loop.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def _http2_enabled() -> bool:
+    if os.getenv("HTTP2_ENABLED", "false").lower() not in ("1", "true", "yes"):
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_http_client(url: str) -> httpx.Client:
+    """Return the shared keep-alive client for the origin of ``url``.
+
+    One client (and therefore one connection pool) is kept per origin, so the
+    pool limits in ``HOST_LIMITS`` / ``DEFAULT_LIMITS`` apply per host.
+    """
+    origin = _origin(url)
+    client = _clients.get(origin)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(origin)
+        if client is None:
+            client = httpx.Client(
+                timeout=DEFAULT_TIMEOUT,
+                limits=HOST_LIMITS.get(urlsplit(url).hostname or "", DEFAULT_LIMITS),
+                http2=_http2_enabled(),
+            )
+            _clients[origin] = client
+    return client
+
+
+def get_async_http_client(url: str) -> httpx.AsyncClient:
+    """Async counterpart of ``get_http_client`` for the running event loop."""
+    loop = asyncio.get_running_loop()
+    origin = _origin(url)
+    with _clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(origin)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=DEFAULT_TIMEOUT,
+                limits=HOST_LIMITS.get(urlsplit(url).hostname or "", DEFAULT_LIMITS),
+                http2=_http2_enabled(),
+            )
+            clients[origin] = client
+    return client
+
+
+def _drop_none(params: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if params is None:
+        return None
+    return {k: v for k, v in params.items() if v is not None}
+
+
+def endpoint_timeout(url: str) -> httpx.Timeout:
+    """Timeout for ``url`` from ``ENDPOINT_TIMEOUTS``, or ``DEFAULT_TIMEOUT``."""
+    parts = urlsplit(url)
+    endpoint = f"{parts.hostname}{parts.path or '/'}"
+    for prefix in sorted(ENDPOINT_TIMEOUTS, key=len, reverse=True):
+        if endpoint.startswith(prefix):
+            return ENDPOINT_TIMEOUTS[prefix]
+    return DEFAULT_TIMEOUT
+
+
+def get_breaker(url: str) -> CircuitBreaker:
+    """The circuit breaker of the host of ``url``; one per host, shared by sync and async calls."""
+    host = urlsplit(url).hostname or url
+    with _clients_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker.from_env(host)
+    return breaker
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    with _clients_lock:
+        breakers = dict(_breakers)
+    return {host: breaker.stats() for host, breaker in breakers.items()}
+
+
+def _failure(response: Optional[httpx.Response], error: Optional[Exception]) -> Optional[str]:
+    """What went wrong, for the breaker; None when the upstream answered normally (4xx included)."""
+    if error is not None:
+        return f"{type(error).__name__}: {error}"
+    if response.status_code >= 500:
+        return f"HTTP {response.status_code}"
+    return None
+
+
+def _send(url: str, send: Callable[[], httpx.Response], retry: bool, limiter=None) -> httpx.Response:
+    """Send through the host's breaker, retrying 429/5xx and transport errors when ``retry`` is set.
+
+    ``limiter`` (a ``RateLimiter``) is waited on before every attempt, retries included. The
+    breaker is asked only after that wait, so a request never holds the half-open trial slot
+    while queued, and the breaker's state is checked just before the request goes out.
+    The last response is returned as is; callers still decide how to handle error statuses.
+    """
+    breaker = get_breaker(url)
+    attempts = HTTP_RETRY.max_attempts if retry else 1
+    for attempt in range(1, attempts + 1):
+        if limiter is not None:
+            limiter.acquire()
+        breaker.allow()
+        response, error = None, None
+        try:
+            response = send()
+        except httpx.TransportError as e:
+            error = e
+        except BaseException:
+            # Not the upstream's fault (e.g. a bad URL or a cancelled task); just free a trial slot.
+            breaker.release()
+            raise
+        failure = _failure(response, error)
+        breaker.record(failure is None, failure)
+        # Once the breaker has opened, the last outcome is returned as is instead of a CircuitOpenError.
+        if attempt == attempts or breaker.state == "open" or (error is None and response.status_code not in RETRYABLE_STATUS):
+            if error is not None:
+                raise error
+            return response
+        time.sleep(HTTP_RETRY.delay(attempt, response))
+
+
+async def _asend(url: str, send: Callable[[], Awaitable[httpx.Response]], retry: bool, limiter=None) -> httpx.Response:
+    """Async counterpart of ``_send``."""
+    breaker = get_breaker(url)
+    attempts = HTTP_RETRY.max_attempts if retry else 1
+    for attempt in range(1, attempts + 1):
+        if limiter is not None:
+            await limiter.aacquire()
+        breaker.allow()
+        response, error = None, None
+        try:
+            response = await send()
+        except httpx.TransportError as e:
+            error = e
+        except BaseException:
+            # Not the upstream's fault (e.g. a bad URL or a cancelled task); just free a trial slot.
+            breaker.release()
+            raise
+        failure = _failure(response, error)
+        breaker.record(failure is None, failure)
+        # Once the breaker has opened, the last outcome is returned as is instead of a CircuitOpenError.
+        if attempt == attempts or breaker.state == "open" or (error is None and response.status_code not in RETRYABLE_STATUS):
+            if error is not None:
+                raise error
+            return response
+        await asyncio.sleep(HTTP_RETRY.delay(attempt, response))
+
+
+def http_get(url: str, params: Optional[Dict[str, Any]] = None, limiter=None, **kwargs) -> httpx.Response:
+    """GET ``url`` through the pooled client, with the endpoint's timeout, retries and breaker.
+
+    ``None`` params are dropped; ``limiter`` is waited on before each attempt.
+    """
+    kwargs.setdefault("timeout", endpoint_timeout(url))
+    client = get_http_client(url)
+    return _send(url, lambda: client.get(url, params=_drop_none(params), **kwargs), retry=True, limiter=limiter)
+
+
+def http_post(url: str, idempotent: bool = False, **kwargs) -> httpx.Response:
+    """POST to ``url`` through the pooled client; only ``idempotent`` requests are retried."""
+    kwargs.setdefault("timeout", endpoint_timeout(url))
+    client = get_http_client(url)
+    return _send(url, lambda: client.post(url, **kwargs), retry=idempotent)
+
+
+async def ahttp_get(url: str, params: Optional[Dict[str, Any]] = None, limiter=None, **kwargs) -> httpx.Response:
+    """Async counterpart of ``http_get``."""
+    kwargs.setdefault("timeout", endpoint_timeout(url))
+    client = get_async_http_client(url)
+    return await _asend(url, lambda: client.get(url, params=_drop_none(params), **kwargs), retry=True, limiter=limiter)
+
+
+async def ahttp_post(url: str, idempotent: bool = False, **kwargs) -> httpx.Response:
+    """Async counterpart of ``http_post``."""
+    kwargs.setdefault("timeout", endpoint_timeout(url))
+    client = get_async_http_client(url)
+    return await _asend(url, lambda: client.post(url, **kwargs), retry=idempotent)
+
+
+async def aclose_http_clients() -> None:
+    """Close the async clients of the running loop, then the sync clients."""
+    with _clients_lock:
+        clients = list(_async_clients.pop(asyncio.get_running_loop(), {}).values())
+    for client in clients:
+        await client.aclose()
+    close_http_clients()
+
+
+def close_http_clients() -> None:
+    """Close every pooled client; called on application shutdown."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
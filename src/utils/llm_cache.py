@@ -0,0 +1,142 @@
+import hashlib
+import os
+import threading
+import time
+import warnings
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, Generation
+
+from src.utils.cache import CacheEntry, InMemoryBackend, SQLiteBackend
+
+load_dotenv()
+warnings.filterwarnings("ignore", message="The function `loads` is in beta", category=LangChainBetaWarning)
+
+# Only model outputs are ever revived from the cache.
+CACHED_TYPES = [Generation, ChatGeneration, ChatGenerationChunk, AIMessage, AIMessageChunk]
+
+
+def _cacheable(return_val: RETURN_VAL_TYPE) -> bool:
+    """False for responses that must not be replayed: empty ones, which the assistant retries, and errors."""
+    if not return_val:
+        return False
+    for generation in return_val:
+        message = getattr(generation, "message", None)
+        metadata = {**(generation.generation_info or {}), **(getattr(message, "response_metadata", None) or {})}
+        if metadata.get("finish_reason") == "error" or metadata.get("error"):
+            return False
+        if not generation.text.strip() and not getattr(message, "tool_calls", None):
+            return False
+    return True
+
+
+class LLMCache(BaseCache):
+    """Exact-match cache of chat model responses, passed to a model as ``cache=``.
+
+    LangChain calls it with the serialized messages (``prompt``) and a string
+    describing the model: its id, temperature and every bound kwarg, including
+    tools and structured-output schemas. The key is a hash of both, so any
+    change to the prompt, history or tool set is a miss. Responses are stored
+    with ``langchain_core.load.dumps`` so any backend holding JSON works.
+    Empty and error responses are not stored.
+
+    Args:
+        name (str): Agent using the cache; hits and misses are counted per name.
+        backend: ``InMemoryBackend`` (LRU, per process) or ``SQLiteBackend`` (on disk, shared).
+        ttl (float): Seconds a response is served from the cache.
+    """
+
+    def __init__(self, name: str, backend, ttl: float = 3600.0):
+        self.name = name
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _key(self, prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode()).hexdigest()
+
+    def _count(self, entry: Optional[CacheEntry]) -> Optional[RETURN_VAL_TYPE]:
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return loads(entry.value, allowed_objects=CACHED_TYPES)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        return self._count(self.backend.get(self._key(prompt, llm_string)))
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if not _cacheable(return_val):
+            return
+        entry = CacheEntry(value=dumps(return_val), stored_at=time.time())
+        self.backend.set(self._key(prompt, llm_string), entry, self.ttl)
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        return self._count(await self.backend.aget(self._key(prompt, llm_string)))
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if not _cacheable(return_val):
+            return
+        entry = CacheEntry(value=dumps(return_val), stored_at=time.time())
+        await self.backend.aset(self._key(prompt, llm_string), entry, self.ttl)
+
+    def clear(self, **kwargs: Any) -> None:
+        """Only resets the counters: the backend may be shared with other agents and processes."""
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_backend = None
+_backend_lock = threading.Lock()
+_caches: Dict[str, LLMCache] = {}
+_caches_lock = threading.Lock()
+
+
+def _shared_backend(kind: str):
+    # One store for every agent: the model description in the key keeps their entries apart.
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1024))
+            if kind == "sqlite":
+                _backend = SQLiteBackend(os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite"), max_entries=max_entries)
+            else:
+                _backend = InMemoryBackend(max_entries=max_entries)
+        return _backend
+
+
+def llm_cache(name: str) -> Optional[LLMCache]:
+    """Cache for the agent ``name`` when ``LLM_CACHE`` is ``memory`` or ``sqlite``; None (no caching) by default."""
+    kind = os.getenv("LLM_CACHE", "off").lower()
+    if kind not in ("memory", "sqlite"):
+        return None
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = LLMCache(name, _shared_backend(kind), ttl=float(os.getenv("LLM_CACHE_TTL", 3600)))
+        return _caches[name]
+
+
+def llm_cache_stats() -> Dict[str, Any]:
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {
+        "enabled": bool(caches),
+        "agents": [cache.stats() for cache in caches],
+    }
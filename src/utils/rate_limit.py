@@ -0,0 +1,242 @@
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+Priority = Literal["interactive", "background"]
+# Lower rank is served first.
+PRIORITY_RANKS: Dict[str, int] = {"interactive": 0, "background": 1}
+
+_priority: ContextVar[str] = ContextVar("request_priority", default="interactive")
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+@contextmanager
+def background_priority() -> Iterator[None]:
+    """Mark the upstream calls made inside the block, e.g. cache refreshes, as background work."""
+    token = _priority.set("background")
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class LocalBucket:
+    """Token bucket held in process memory: ``rate`` tokens per second, at most ``burst`` saved up."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, need: float) -> float:
+        """Take one token if at least ``need`` are available; otherwise seconds until there will be."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= need:
+                self._tokens -= 1
+                return 0.0
+            return (need - self._tokens) / self.rate
+
+    async def atake(self, need: float) -> float:
+        return self.take(need)
+
+
+# Same algorithm as LocalBucket, run atomically in Redis on the server's clock.
+_TAKE_SCRIPT = """
+local rate, burst, need = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1e6
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= need then tokens = tokens - 1 else wait = (need - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisBucket:
+    """Token bucket in Redis, shared by every worker that uses the same ``key``."""
+
+    def __init__(self, url: str, key: str, rate: float, burst: float):
+        import redis
+        import redis.asyncio
+
+        self.rate = rate
+        self.burst = burst
+        self.key = key
+        self._take = redis.Redis.from_url(url).register_script(_TAKE_SCRIPT)
+        self._atake = redis.asyncio.Redis.from_url(url).register_script(_TAKE_SCRIPT)
+
+    def take(self, need: float) -> float:
+        return float(self._take(keys=[self.key], args=[self.rate, self.burst, need]))
+
+    async def atake(self, need: float) -> float:
+        return float(await self._atake(keys=[self.key], args=[self.rate, self.burst, need]))
+
+
+class RateLimiter:
+    """Token-bucket limiter for calls to one upstream API, with priorities.
+
+    Callers queue in priority order, then arrival order. Only the caller at
+    the head of the queue asks the bucket for a token and sleeps until one is
+    due; the others sleep until they reach the head. Background callers also
+    leave ``background_reserve`` tokens in the bucket, so with a Redis bucket
+    they yield to interactive calls from other workers too.
+
+    Args:
+        name (str): Upstream name, used as the Redis key and in ``stats()``.
+        rate (float): Requests per second; 0 disables the limiter.
+        burst (float): Requests that may go out back to back after an idle period.
+        background_reserve (float): Extra tokens a background call needs in the bucket before it may take one.
+        bucket: ``LocalBucket`` or ``RedisBucket``; defaults to a ``LocalBucket``.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float = 1.0, background_reserve: float = 0.0, bucket=None):
+        self.name = name
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.background_reserve = max(0.0, min(background_reserve, self.burst - 1.0))
+        self.bucket = bucket or LocalBucket(rate, self.burst)
+        self._queue: List[tuple] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._stats = {
+            priority: {"requests": 0, "waited": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+            for priority in PRIORITY_RANKS
+        }
+
+    @classmethod
+    def from_env(cls, name: str, rate: float, burst: float = 1.0, background_reserve: float = 0.0) -> "RateLimiter":
+        """Build a limiter configured by ``<NAME>_RATE_LIMIT``, ``<NAME>_RATE_BURST`` and ``<NAME>_RATE_BACKGROUND_RESERVE``.
+
+        ``RATE_LIMIT_BACKEND=redis`` shares the bucket between workers through ``REDIS_URL``.
+        """
+        prefix = f"{name.upper()}_RATE"
+        rate = float(os.getenv(f"{prefix}_LIMIT", rate))
+        burst = max(float(os.getenv(f"{prefix}_BURST", burst)), 1.0)
+        background_reserve = float(os.getenv(f"{prefix}_BACKGROUND_RESERVE", background_reserve))
+        bucket = None
+        if rate > 0 and os.getenv("RATE_LIMIT_BACKEND", "memory").lower() == "redis":
+            url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+            bucket = RedisBucket(url, f"travel_agent:rate:{name}", rate, burst)
+        return cls(name, rate, burst, background_reserve, bucket)
+
+    def _need(self, priority: str) -> float:
+        return 1.0 + (self.background_reserve if priority == "background" else 0.0)
+
+    def _join(self, priority: str, wake: Callable[[], None]) -> tuple:
+        # (rank, arrival, wake); arrival numbers are unique, so entries never compare their callbacks.
+        entry = (PRIORITY_RANKS.get(priority, 0), next(self._seq), wake)
+        with self._lock:
+            heapq.heappush(self._queue, entry)
+        return entry
+
+    def _is_head(self, entry: tuple) -> bool:
+        with self._lock:
+            return bool(self._queue) and self._queue[0] is entry
+
+    def _leave(self, entry: tuple) -> None:
+        with self._lock:
+            if entry not in self._queue:
+                return
+            was_head = self._queue[0] is entry
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+            wake_head = self._queue[0][2] if was_head and self._queue else None
+        if wake_head is not None:
+            wake_head()
+
+    def _record(self, priority: str, waited: float) -> float:
+        with self._lock:
+            stats = self._stats[priority]
+            stats["requests"] += 1
+            if waited > 0.001:
+                stats["waited"] += 1
+            stats["wait_seconds_total"] += waited
+            stats["wait_seconds_max"] = max(stats["wait_seconds_max"], waited)
+        return waited
+
+    def acquire(self, priority: Optional[Priority] = None) -> float:
+        """Block until a request may be sent; returns the seconds spent waiting."""
+        if self.rate <= 0:
+            return 0.0
+        priority = priority or current_priority()
+        start = time.monotonic()
+        event = threading.Event()
+        entry = self._join(priority, event.set)
+        try:
+            while True:
+                event.clear()
+                if not self._is_head(entry):
+                    event.wait()
+                    continue
+                delay = self.bucket.take(self._need(priority))
+                if delay <= 0:
+                    break
+                event.wait(delay)
+        finally:
+            self._leave(entry)
+        return self._record(priority, time.monotonic() - start)
+
+    async def aacquire(self, priority: Optional[Priority] = None) -> float:
+        """Async counterpart of ``acquire``; waits without blocking the event loop."""
+        if self.rate <= 0:
+            return 0.0
+        priority = priority or current_priority()
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        entry = self._join(priority, lambda: loop.call_soon_threadsafe(event.set))
+        try:
+            while True:
+                event.clear()
+                if not self._is_head(entry):
+                    await event.wait()
+                    continue
+                delay = await self.bucket.atake(self._need(priority))
+                if delay <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._leave(entry)
+        return self._record(priority, time.monotonic() - start)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            per_priority = {
+                priority: {**stats, "avg_wait_seconds": stats["wait_seconds_total"] / stats["requests"] if stats["requests"] else 0.0}
+                for priority, stats in self._stats.items()
+            }
+            queued = len(self._queue)
+        return {
+            "name": self.name,
+            "rate": self.rate,
+            "burst": self.burst,
+            "backend": "redis" if isinstance(self.bucket, RedisBucket) else "memory",
+            "queued": queued,
+            "priorities": per_priority,
+        }
@@ -0,0 +1,128 @@
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Responses worth another attempt: rate limiting and server-side failures.
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """Raised instead of sending a request while the upstream's circuit breaker is open."""
+
+
+@dataclass(frozen=True)
+class HttpRetryPolicy:
+    """Attempts per outbound request and the full-jitter exponential backoff between them.
+
+    Args:
+        max_attempts (int): Attempts per request, the first one included.
+        backoff (float): Upper bound of the first delay in seconds; doubles after each attempt.
+        max_backoff (float): Cap on any single delay, ``Retry-After`` included.
+    """
+
+    max_attempts: int = 3
+    backoff: float = 0.25
+    max_backoff: float = 4.0
+
+    @classmethod
+    def from_env(cls) -> "HttpRetryPolicy":
+        return cls(
+            max_attempts=max(int(os.getenv("HTTP_RETRY_MAX_ATTEMPTS", cls.max_attempts)), 1),
+            backoff=float(os.getenv("HTTP_RETRY_BACKOFF", cls.backoff)),
+            max_backoff=float(os.getenv("HTTP_RETRY_MAX_BACKOFF", cls.max_backoff)),
+        )
+
+    def delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Seconds to wait after failed ``attempt`` (1-based); a numeric ``Retry-After`` wins when present."""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        # Full jitter, so workers retrying the same outage do not hit the upstream in lockstep.
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Fails fast while an upstream is down.
+
+    After ``failure_threshold`` consecutive failures (transport errors,
+    timeouts or 5xx responses) the breaker opens and every call raises
+    ``CircuitOpenError`` without touching the network. After
+    ``reset_timeout`` seconds one trial call is let through: success closes
+    the breaker, failure opens it again.
+
+    Args:
+        name (str): Upstream host, shown in ``stats()``.
+        failure_threshold (int): Consecutive failures that open the breaker.
+        reset_timeout (float): Seconds the breaker stays open before a trial call.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, name: str) -> "CircuitBreaker":
+        return cls(
+            name,
+            failure_threshold=int(os.getenv("HTTP_BREAKER_FAILURE_THRESHOLD", 5)),
+            reset_timeout=float(os.getenv("HTTP_BREAKER_RESET_TIMEOUT", 30)),
+        )
+
+    def allow(self) -> None:
+        """Raise ``CircuitOpenError`` unless a call may go out now."""
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "closed" or (self.state == "half_open" and not self._trial_in_flight):
+                self._trial_in_flight = self.state == "half_open"
+                return
+            self.rejected += 1
+            retry_in = max(self.reset_timeout - (time.monotonic() - self._opened_at), 0)
+        raise CircuitOpenError(f"{self.name} is unavailable (circuit open, retry in {retry_in:.0f}s): {self._last_error}")
+
+    def release(self) -> None:
+        """End a call without an outcome, so a half-open breaker can try again."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record(self, ok: bool, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._trial_in_flight = False
+            if ok:
+                self.state = "closed"
+                self.failures = 0
+                return
+            self.failures += 1
+            self._last_error = error
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.opened += 1
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "opened": self.opened,
+                "rejected": self.rejected,
+                "last_error": self._last_error,
+            }
@@ -0,0 +1,104 @@
+import csv
+import io
+import json
+import math
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Default token budget for one tool result, overridable per tool with <NAME>_RESULT_MAX_TOKENS.
+TOOL_RESULT_MAX_TOKENS = int(os.getenv("TOOL_RESULT_MAX_TOKENS", 800))
+
+
+def approx_tokens(text: str) -> int:
+    """About four characters per token, the same estimate ``count_tokens_approximately`` uses."""
+    return math.ceil(len(text) / 4)
+
+
+def pick(record: Dict[str, Any], path: str) -> Any:
+    """Value at a dotted ``path`` such as ``price.total``; None when any step is missing."""
+    value: Any = record
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _cell(value: Any, max_chars: int) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        # Nested records such as a city's airports: "ALG 12, ORN 40".
+        value = ", ".join(" ".join(str(v) for v in item.values()) if isinstance(item, dict) else str(item) for item in value)
+    elif isinstance(value, dict):
+        value = " ".join(str(v) for v in value.values())
+    elif isinstance(value, float):
+        value = f"{value:.5g}"
+    text = " ".join(str(value).split())
+    return text if len(text) <= max_chars else text[:max_chars - 1].rstrip() + "…"
+
+
+@dataclass(frozen=True)
+class ResultShape:
+    """How a tool's records are shown to the model.
+
+    Only ``fields`` (dotted paths into each record) are kept. Records are
+    rendered as CSV under a header row, and rows stop once the result would
+    exceed ``max_tokens``. A last line then says how many results were left
+    out. Records carrying an ``error`` key are listed after the table.
+
+    Args:
+        name (str): Tool name; ``<NAME>_RESULT_MAX_TOKENS`` overrides the budget.
+        fields: Dotted paths of the fields to keep, in column order.
+        headers: Column names, defaulting to the last part of each path.
+        max_tokens (int): Approximate token budget of the rendered result.
+        max_cell_chars (int): Longer values, such as room descriptions, are cut to this length.
+    """
+
+    name: str
+    fields: Sequence[str]
+    headers: Optional[Sequence[str]] = None
+    max_tokens: Optional[int] = None
+    max_cell_chars: int = 120
+
+    @property
+    def budget(self) -> int:
+        default = self.max_tokens or TOOL_RESULT_MAX_TOKENS
+        return int(os.getenv(f"{self.name.upper()}_RESULT_MAX_TOKENS", default))
+
+    def render(self, records: Sequence[Dict[str, Any]] | Dict[str, Any]) -> str:
+        if isinstance(records, dict):
+            records = [records]
+        errors = [r for r in records if "error" in r]
+        rows = [r for r in records if "error" not in r]
+        if not rows and not errors:
+            return "No results."
+
+        error_text = "".join(f"Error: {_cell(json.dumps(e, default=str), 400)}\n" for e in errors)
+        if not rows:
+            return error_text.rstrip("\n")
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(self.headers or [path.rsplit(".", 1)[-1] for path in self.fields])
+        budget = self.budget - approx_tokens(error_text)
+        shown = 0
+        for record in rows:
+            mark = buffer.tell()
+            writer.writerow([_cell(pick(record, path), self.max_cell_chars) for path in self.fields])
+            # Always show one row, even over budget, so the model sees what the data looks like.
+            if shown and approx_tokens(buffer.getvalue()) > budget:
+                buffer.seek(mark)
+                buffer.truncate()
+                break
+            shown += 1
+
+        text = buffer.getvalue()
+        if shown < len(rows):
+            text += f"… {len(rows) - shown} more results available; narrow the search to see them.\n"
+        return (text + error_text).rstrip("\n")
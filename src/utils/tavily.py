@@ -0,0 +1,38 @@
+from typing import Any, Dict
+
+import httpx
+from langchain_tavily._utilities import TAVILY_API_URL, TavilySearchAPIWrapper
+
+from src.utils.http_client import ahttp_post, http_post
+
+
+class TavilyAPIWrapper(TavilySearchAPIWrapper):
+    """Tavily search client that sends through ``src.utils.http_client``.
+
+    The stock wrapper posts with ``requests`` and no timeout, so a hung
+    connection pins the tool's thread. This one gets the pooled client's
+    endpoint timeout, retries and circuit breaker instead.
+    """
+
+    def _search_request(self, query: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "url": f"{self.api_base_url or TAVILY_API_URL}/search",
+            "json": {"query": query, **{k: v for k, v in params.items() if v is not None}},
+            "headers": {
+                "Authorization": f"Bearer {self.tavily_api_key.get_secret_value()}",
+                "Content-Type": "application/json",
+                "X-Client-Source": "langchain-tavily",
+            },
+        }
+
+    @staticmethod
+    def _results(response: httpx.Response) -> Dict[str, Any]:
+        if response.status_code != 200:
+            raise ValueError(f"Error {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    def raw_results(self, query: str, **params: Any) -> Dict[str, Any]:
+        return self._results(http_post(idempotent=True, **self._search_request(query, params)))
+
+    async def raw_results_async(self, query: str, **params: Any) -> Dict[str, Any]:
+        return self._results(await ahttp_post(idempotent=True, **self._search_request(query, params)))
@@ -0,0 +1,46 @@
+import numpy as np
+
+from src.utils.airports import AirportIndex, get_airport_index, haversine_km
+
+
+def test_iata_lookup_is_case_insensitive():
+    airport = get_airport_index().get("cdg")
+
+    assert airport.iata == "CDG"
+    assert airport.country == "FR"
+    assert get_airport_index().get("ZZZ") is None
+
+
+def test_nearby_paris_returns_closest_first():
+    nearby = get_airport_index().nearby(48.8566, 2.3522, radius_km=40)
+    codes = [airport.iata for airport, _ in nearby]
+
+    assert "ORY" in codes and "CDG" in codes
+    distances = [d for _, d in nearby]
+    assert distances == sorted(distances)
+    assert all(d <= 40 for d in distances)
+
+
+def test_grid_matches_brute_force_across_the_antimeridian():
+    index = AirportIndex(
+        ["AAA", "BBB", "CCC"], ["a", "b", "c"], ["", "", ""], ["", "", ""],
+        np.array([-17.0, -17.2, 10.0]), np.array([179.9, -179.9, 0.0]),
+    )
+    codes = [airport.iata for airport, _ in index.nearby(-17.1, 180.0, radius_km=50)]
+    expected = haversine_km(-17.1, 180.0, index.lats, index.lons) <= 50
+
+    assert sorted(codes) == sorted(np.array(index.codes)[expected].tolist()) == ["AAA", "BBB"]
+
+
+def test_airline_only_leaves_out_airports_without_scheduled_service():
+    index = AirportIndex(
+        ["AAA", "BBB", "CCC", "DDD"], ["A Intl", "B Field", "C Heliport", "D Airport"], [""] * 4, [""] * 4,
+        np.array([0.0, 0.01, 0.02, 0.03]), np.array([0.0] * 4),
+        types=["large_airport", "small_airport", "", ""], scheduled=[True, False, None, None],
+    )
+
+    codes = [airport.iata for airport, _ in index.nearby(0.0, 0.0, radius_km=50, airline_only=True)]
+
+    # Known service decides; without data, the name does.
+    assert codes == ["AAA", "DDD"]
+    assert [airport.iata for airport, _ in get_airport_index().nearby(52.52, 13.405, 50, airline_only=True)] == ["BER"]
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+
+import httpx
+
+from src.utils import amadeus
+from src.utils.help import AmadeusTokenManager
+
+
+def _counting_fetcher(expires_in=1799, delay=0.0):
+    calls = []
+
+    def fetch():
+        calls.append(time.monotonic())
+        time.sleep(delay)
+        return {"access_token": f"token-{len(calls)}", "expires_in": expires_in}
+
+    return fetch, calls
+
+
+def test_token_is_reused_until_refresh_window():
+    fetch, calls = _counting_fetcher()
+    manager = AmadeusTokenManager(fetcher=fetch)
+
+    assert manager.get_token() == "token-1"
+    assert manager.get_token() == "token-1"
+    assert len(calls) == 1
+
+
+def test_concurrent_callers_share_one_fetch():
+    fetch, calls = _counting_fetcher(delay=0.05)
+    manager = AmadeusTokenManager(fetcher=fetch)
+    tokens = []
+
+    threads = [threading.Thread(target=lambda: tokens.append(manager.get_token())) for _ in range(50)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert tokens == ["token-1"] * 50
+
+
+def test_refresh_window_serves_current_token_and_refreshes_in_background():
+    fetch, calls = _counting_fetcher(expires_in=61)
+    manager = AmadeusTokenManager(fetcher=fetch, refresh_margin=60.0)
+
+    assert manager.get_token() == "token-1"
+    time.sleep(1.1)
+    assert manager.get_token() == "token-1"
+
+    deadline = time.monotonic() + 2
+    while len(calls) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(calls) == 2
+
+
+def test_a_revoked_token_is_replaced_and_the_request_retried_once(monkeypatch):
+    fetch, calls = _counting_fetcher()
+    monkeypatch.setattr(amadeus, "amadeus_token_manager", AmadeusTokenManager(fetcher=fetch))
+    sent = []
+
+    def get(url, params=None, limiter=None, headers=None):
+        sent.append(headers["Authorization"])
+        # Only the first token was revoked; a request to /denied is refused with any token.
+        return httpx.Response(401 if headers["Authorization"] == "Bearer token-1" or url.endswith("/denied") else 200)
+
+    async def aget(url, params=None, limiter=None, headers=None):
+        return get(url, params, limiter, headers)
+
+    monkeypatch.setattr(amadeus, "http_get", get)
+    monkeypatch.setattr(amadeus, "ahttp_get", aget)
+
+    assert amadeus.amadeus_get("/ok").status_code == 200
+    assert asyncio.run(amadeus.amadeus_aget("/ok")).status_code == 200
+    assert amadeus.amadeus_get("/denied").status_code == 401
+
+    assert sent == ["Bearer token-1", "Bearer token-2", "Bearer token-2", "Bearer token-2", "Bearer token-3"]
+    assert len(calls) == 3
+
+
+def test_invalidating_a_stale_token_keeps_the_newer_one():
+    fetch, calls = _counting_fetcher()
+    manager = AmadeusTokenManager(fetcher=fetch)
+    stale = manager.get_token()
+    manager.invalidate(stale)
+    assert manager.get_token() == "token-2"
+
+    manager.invalidate(stale)
+
+    assert manager.get_token() == "token-2"
+    assert len(calls) == 2
@@ -0,0 +1,68 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+
+from src.agents.agent_utils import GIVE_UP_ANSWER, Assistant, RetryPolicy, model_stats, worker_failed
+
+
+def _model(replies, prompts):
+    replies = iter(replies)
+
+    def reply(state):
+        prompts.append(len(state["messages"]))
+        return AIMessage(content=next(replies))
+
+    return RunnableLambda(reply)
+
+
+def test_empty_responses_are_retried_a_bounded_number_of_times_with_one_nudge():
+    prompts = []
+    assistant = Assistant(_model(["", "", "", "never asked"], prompts), retry=RetryPolicy(max_attempts=3, backoff=0),
+                          model="stuck-model")
+
+    result = assistant({"messages": [HumanMessage(content="hi")]})
+
+    assert result["messages"][0].content == GIVE_UP_ANSWER
+    assert prompts == [1, 2, 2]
+    assert model_stats()["stuck-model"]["empty_rate"] == 1.0
+    assert model_stats()["stuck-model"]["gave_up"] == 1
+
+
+def test_fallback_model_answers_when_the_primary_fails():
+    def fail(state):
+        raise TimeoutError("model timed out")
+
+    prompts = []
+    assistant = Assistant(RunnableLambda(fail), retry=RetryPolicy(max_attempts=3, backoff=0),
+                          fallback=_model(["from fallback"], prompts), model="slow-model", fallback_model="backup-model")
+
+    result = assistant({"messages": [HumanMessage(content="hi")]})
+
+    assert result["messages"][0].content == "from fallback"
+    assert model_stats()["slow-model"]["errors"] == 1
+    assert model_stats()["slow-model"]["fallbacks"] == 1
+    assert model_stats()["backup-model"]["calls"] == 1
+
+
+def test_worker_failure_is_reported_from_the_run_not_the_wording_of_the_answer():
+    history = [HumanMessage(content="Flights that could not be cancelled?"), AIMessage(content="Sorry, I failed before.")]
+
+    def run(*added):
+        return worker_failed(history + list(added), len(history))
+
+    calls = AIMessage(content="", tool_calls=[{"name": "search_flight", "args": {}, "id": "1"}])
+    assert not run(AIMessage(content="No results were found, but I can't complain: here are 2 error-free options."))
+    assert run(AIMessage(content=GIVE_UP_ANSWER))
+    assert run(calls, ToolMessage(content='{"error": "timeout"}', tool_call_id="1"), AIMessage(content="Here you go"))
+    assert run(calls, ToolMessage(content="Error : boom", tool_call_id="1", status="error"), AIMessage(content="Done"))
+    assert not run(calls, ToolMessage(content='[{"price": 120}]', tool_call_id="1"), AIMessage(content="Done"))
+
+
+def test_retry_policy_reads_every_setting_from_the_environment(monkeypatch):
+    monkeypatch.setenv("HOTEL_AGENT_RETRY_MAX_ATTEMPTS", "5")
+    monkeypatch.setenv("HOTEL_AGENT_RETRY_BACKOFF", "1")
+    monkeypatch.setenv("HOTEL_AGENT_RETRY_MAX_BACKOFF", "3")
+
+    policy = RetryPolicy.from_env("hotel_agent")
+
+    assert policy == RetryPolicy(max_attempts=5, backoff=1.0, max_backoff=3.0)
+    assert [policy.delay(attempt) for attempt in range(1, 6)] == [0.0, 1.0, 2.0, 3.0, 3.0]
@@ -0,0 +1,66 @@
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from src.utils.checkpointer import SQLiteCheckpointer
+
+
+def _graph(checkpointer):
+    builder = StateGraph(MessagesState)
+    builder.add_node("reply", lambda state: {"messages": [AIMessage(content=f"answer {len(state['messages'])}")]})
+    builder.add_edge(START, "reply")
+    builder.add_edge("reply", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def _count(saver, table):
+    return saver._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_history_survives_a_new_saver_and_each_message_is_stored_once(tmp_path):
+    path = tmp_path / "graph.sqlite"
+    config = {"configurable": {"thread_id": "t1"}}
+    graph = _graph(SQLiteCheckpointer(path))
+    for i in range(3):
+        graph.invoke({"messages": [HumanMessage(content=f"question {i}")]}, config)
+
+    reopened = SQLiteCheckpointer(path)
+    messages = _graph(reopened).get_state(config).values["messages"]
+
+    assert [m.content for m in messages] == [
+        "question 0", "answer 1", "question 1", "answer 3", "question 2", "answer 5",
+    ]
+    assert _count(reopened, "messages") == 6
+
+
+def test_pruning_keeps_the_latest_state_and_delete_removes_the_thread(tmp_path):
+    saver = SQLiteCheckpointer(tmp_path / "graph.sqlite", keep_last=0)
+    graph = _graph(saver)
+    config = {"configurable": {"thread_id": "t1"}}
+    for i in range(3):
+        graph.invoke({"messages": [HumanMessage(content=f"question {i}")]}, config)
+
+    saver.prune(["t1"])
+
+    assert _count(saver, "checkpoints") == 1
+    assert len(graph.get_state(config).values["messages"]) == 6
+
+    saver.delete_thread("t1")
+
+    assert graph.get_state(config).values == {}
+    assert _count(saver, "messages") == 0
+
+
+def test_threads_written_before_a_restart_expire_once_per_interval(tmp_path):
+    path = tmp_path / "graph.sqlite"
+    graph = _graph(SQLiteCheckpointer(path))
+    for thread_id in ("old", "new"):
+        graph.invoke({"messages": [HumanMessage(content="hi")]}, {"configurable": {"thread_id": thread_id}})
+
+    reopened = SQLiteCheckpointer(path)
+    reopened._conn.execute("UPDATE threads SET updated_at = updated_at - 100 WHERE thread_id = 'old'")
+
+    assert reopened.expire(ttl=50, interval=60) == ["old"]
+    assert SQLiteCheckpointer(path).expire(ttl=0, interval=60) == []  # another worker swept just now
+    assert _count(reopened, "messages") == 2
+    assert reopened.expire(ttl=-1) == ["new"]
+    assert _count(reopened, "checkpoints") == 0
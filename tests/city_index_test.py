@@ -0,0 +1,26 @@
+from src.utils.cities import City, CityIndex, get_city_index, normalize_name
+
+
+def test_normalize_name_strips_accents_and_dashes():
+    assert normalize_name("  São-Paulo ") == "SAO PAULO"
+
+
+def test_prefix_search_prefers_exact_match_then_population():
+    cities = get_city_index().search("paris")
+
+    assert cities[0].name == "Paris"
+    assert cities[0].country == "FR"
+    assert cities[0].iata == "PAR"
+
+
+def test_country_filter_and_learning_from_api_responses():
+    index = CityIndex([City("Rome", "IT", 41.89, 12.48, 2_000_000), City("Rome", "US", 34.25, -85.16, 36_000)])
+    assert [c.country for c in index.search("rom", country="us")] == ["US"]
+
+    index.add_amadeus_locations([
+        {"name": "TIMIMOUN", "iataCode": "TMX", "address": {"countryCode": "DZ"},
+         "geoCode": {"latitude": 29.26, "longitude": 0.23}},
+    ])
+    learned = index.search("Timi")
+    assert learned[0].iata == "TMX"
+    assert learned[0].latitude == 29.26
@@ -0,0 +1,57 @@
+import asyncio
+
+import httpx
+
+from src.tools import destination_tools
+from src.tools.destination_tools import CitySearchInput
+from src.utils.cities import City, CityIndex
+
+MADRID = {
+    "type": "location", "subType": "city", "name": "MADRID", "iataCode": "MAD",
+    "address": {"countryCode": "ES"}, "geoCode": {"latitude": 40.41, "longitude": -3.70},
+}
+
+
+def _fake_amadeus(monkeypatch, status=200, data=()):
+    calls = []
+
+    def get(path, params=None, headers=None):
+        calls.append(params["keyword"])
+        return httpx.Response(status, json={"data": list(data)} if status == 200 else {"errors": []})
+
+    async def aget(path, params=None, headers=None):
+        return get(path, params, headers)
+
+    index = CityIndex([City("Madrid", "ES", 40.4168, -3.7038, 3_255_944), City("Paris", "FR", 48.85, 2.35, 2_138_551, "PAR")])
+    monkeypatch.setattr(destination_tools, "get_city_index", lambda: index)
+    monkeypatch.setattr(destination_tools, "amadeus_get", get)
+    monkeypatch.setattr(destination_tools, "amadeus_aget", aget)
+    return calls
+
+
+def test_cities_without_a_code_are_looked_up_once_and_learned(monkeypatch):
+    calls = _fake_amadeus(monkeypatch, data=[MADRID])
+
+    first = asyncio.run(destination_tools._acity_search_amadeus(CitySearchInput(keyword="Madrid", include=[])))
+    second = destination_tools.city_search_amadeus.func(CitySearchInput(keyword="Madrid", include=[]))
+    paris = destination_tools.city_search_amadeus.func(CitySearchInput(keyword="Paris", include=[]))
+
+    assert calls == ["Madrid"]
+    assert "MAD" in first and "MAD" in second and "PAR" in paris
+
+
+def test_bundled_city_is_returned_when_amadeus_fails(monkeypatch):
+    calls = _fake_amadeus(monkeypatch, status=500)
+
+    result = destination_tools.city_search_amadeus.func(CitySearchInput(keyword="Madrid", include=[]))
+
+    assert calls == ["Madrid"]
+    assert "MADRID" in result and "error" not in result
+
+
+def test_city_airports_only_list_airports_with_scheduled_service():
+    def airports(city):
+        return [a["iataCode"] for a in destination_tools._city_location(city, ["AIRPORTS"])["airports"]]
+
+    assert airports(City("Berlin", "DE", 52.52, 13.405)) == ["BER"]  # not the closed TXL
+    assert airports(City("Los Angeles", "US", 34.05, -118.24))[:2] == ["LAX", "BUR"]
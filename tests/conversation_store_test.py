@@ -0,0 +1,109 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from backend.app.core.conversations import ConversationStore
+from src.utils.checkpointer import SQLiteCheckpointer
+
+
+class RecordingSaver(InMemorySaver):
+    def __init__(self):
+        super().__init__()
+        self.deleted = []
+
+    async def adelete_thread(self, thread_id):
+        self.deleted.append(thread_id)
+        await super().adelete_thread(thread_id)
+
+
+async def _turn(store, saver, thread_id=None, reply="ok"):
+    async with store.turn("flight", saver, thread_id) as config:
+        thread_id = config["configurable"]["thread_id"]
+        store.record("flight", thread_id, [HumanMessage(content="hi"), AIMessage(content=reply)])
+        return thread_id
+
+
+def test_least_recently_used_thread_is_evicted_with_its_checkpoint():
+    async def run():
+        saver = RecordingSaver()
+        store = ConversationStore(max_threads=2)
+        first = await _turn(store, saver)
+        second = await _turn(store, saver)
+        await _turn(store, saver, first)  # first is now the most recently used
+        await _turn(store, saver)
+        return saver, store, first, second
+
+    saver, store, first, second = asyncio.run(run())
+
+    assert saver.deleted == [second]
+    assert store.stats()["threads"] == 2
+    assert store.stats()["evictions"]["max_threads"] == 1
+
+
+def test_memory_cap_and_ttl():
+    async def run():
+        saver = RecordingSaver()
+        store = ConversationStore(max_bytes=100)
+        await _turn(store, saver, reply="x" * 80)
+        await _turn(store, saver, reply="y" * 80)
+        expiring = ConversationStore(ttl=-1)
+        await _turn(expiring, saver)
+        return store, expiring
+
+    store, expiring = asyncio.run(run())
+
+    assert store.stats()["threads"] == 1
+    assert store.stats()["evictions"]["max_bytes"] == 1
+    assert expiring.stats()["threads"] == 0
+    assert expiring.stats()["evictions"]["expired"] == 1
+
+
+def test_turns_on_the_same_thread_are_serialized():
+    async def run():
+        store = ConversationStore()
+        order = []
+
+        async def turn(label):
+            async with store.turn("flight", None, "t1"):
+                order.append(f"{label}-start")
+                await asyncio.sleep(0.01)
+                order.append(f"{label}-end")
+
+        await asyncio.gather(turn("a"), turn("b"))
+        return order
+
+    assert asyncio.run(run()) == ["a-start", "a-end", "b-start", "b-end"]
+
+
+def test_workers_sharing_a_database_only_expire_threads_idle_everywhere(tmp_path):
+    path = tmp_path / "flight.sqlite"
+    config = {"configurable": {"checkpoint_ns": ""}}
+
+    def put(saver, thread_id):
+        checkpoint = {"v": 1, "id": f"{thread_id}-1", "ts": "", "channel_values": {}, "channel_versions": {},
+                      "versions_seen": {}}
+        saver.put({"configurable": {**config["configurable"], "thread_id": thread_id}}, checkpoint, {}, {})
+
+    async def run():
+        saver_a, saver_b = SQLiteCheckpointer(path), SQLiteCheckpointer(path)
+        worker_a = ConversationStore(max_threads=1, ttl=3600)
+        worker_b = ConversationStore(ttl=3600)
+        for thread_id in ("shared", "other"):
+            async with worker_a.turn("flight", saver_a, thread_id):
+                put(saver_a, thread_id)
+        async with worker_b.turn("flight", saver_b, "shared"):
+            pass
+        # Worker A's LRU dropped "shared", but worker B is still serving it.
+        assert worker_a.stats()["evictions"]["max_threads"] == 1
+        assert saver_b.get_tuple({"configurable": {"thread_id": "shared", "checkpoint_ns": ""}}) is not None
+
+        saver_a._conn.execute("UPDATE threads SET updated_at = 0 WHERE thread_id = 'other'")
+        swept = await worker_b.sweep(force=True)
+        return swept, worker_b, saver_a
+
+    swept, worker_b, saver_a = asyncio.run(run())
+
+    assert swept == 1 and worker_b.stats()["swept_threads"] == 1
+    assert saver_a.get_tuple({"configurable": {"thread_id": "other", "checkpoint_ns": ""}}) is None
+    assert saver_a.get_tuple({"configurable": {"thread_id": "shared", "checkpoint_ns": ""}}) is not None
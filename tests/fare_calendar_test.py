@@ -0,0 +1,51 @@
+import asyncio
+from datetime import date, timedelta
+
+import httpx
+
+from src.tools import search_flights
+from tests.flight_ranking_test import _offer
+
+START = date.today() + timedelta(days=30)
+
+
+def _day(offset):
+    return (START + timedelta(days=offset)).isoformat()
+
+
+def _fake_offers(queries):
+    async def aget(params):
+        queries.append((params["departureDate"], params.get("returnDate")))
+        if params["departureDate"] == _day(-1):
+            raise httpx.ConnectError("upstream down")
+        # Cheaper the later you leave.
+        offset = (date.fromisoformat(params["departureDate"]) - START).days
+        return {"data": [_offer(900, "PT3H", 0), _offer(300 - 10 * offset, "PT4H", 1)]}
+
+    return aget
+
+
+def test_one_way_window_returns_the_cheapest_day_per_date(monkeypatch):
+    queries = []
+    monkeypatch.setattr(search_flights, "_aget_flight_offers", _fake_offers(queries))
+
+    result = asyncio.run(search_flights.afare_calendar("alg", "ist", _day(0), flexDays=2))
+
+    assert sorted(queries) == [(_day(i), None) for i in range(-2, 3)]
+    assert [f["departureDate"] for f in result["cheapest"]] == [_day(2), _day(1), _day(0)]
+    assert "error" in next(f for f in result["fares"] if f["departureDate"] == _day(-1))
+    assert result["cheapest"][0]["price"] < 900
+
+
+def test_round_trip_matrix_skips_combinations_furthest_from_the_requested_dates(monkeypatch):
+    queries = []
+    monkeypatch.setattr(search_flights, "_aget_flight_offers", _fake_offers(queries))
+    monkeypatch.setattr(search_flights, "FARE_CALENDAR_MAX_QUERIES", 5)
+
+    result = asyncio.run(search_flights.afare_calendar("ALG", "IST", _day(0), 1, _day(7), 1))
+    text = search_flights._format_fare_calendar(result)
+
+    assert len(queries) == 5 and result["skipped"] == 4
+    assert (_day(0), _day(7)) in queries
+    assert text.splitlines()[1] == f"depart/return,{_day(6)},{_day(7)},{_day(8)}"
+    assert "4 date combinations further from the requested dates were not searched." in text
@@ -0,0 +1,19 @@
+from src.agents.fast_router import FastRouter
+from src.agents.router_benchmark import evaluate_fast_path, load_examples
+
+
+def test_fast_path_never_misroutes_the_benchmark_set():
+    result = evaluate_fast_path(load_examples())
+
+    assert result["precision"] == 1.0, result["mistakes"]
+    assert result["hit_rate"] >= 0.6
+
+
+def test_multi_domain_and_vague_queries_fall_back():
+    router = FastRouter()
+
+    assert router.route("flights ALG to IST on 2026-11-02") == "flight_agent"
+    assert router.route("I'm flying to Rome next week, where should I stay?") is None
+    assert router.route("yes, the second one please") is None
+    assert router.stats()["hits"] == 1
+    assert router.stats()["fallbacks"] == 2
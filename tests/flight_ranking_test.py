@@ -0,0 +1,36 @@
+from src.utils.flights import FlightOffers, duration_minutes
+
+
+def _offer(price, duration, stops, departure="2026-11-02T07:30:00"):
+    segments = [
+        {"carrierCode": "AH", "number": str(1000 + i), "departure": {"iataCode": "ALG", "at": departure},
+         "arrival": {"iataCode": "IST", "at": "2026-11-02T12:00:00"}}
+        for i in range(stops + 1)
+    ]
+    return {"price": {"total": str(price), "currency": "EUR"}, "itineraries": [{"duration": duration, "segments": segments}]}
+
+
+DATA = {"data": [
+    _offer(420, "PT3H40M", 0, "2026-11-02T21:00:00"),
+    _offer(180, "PT14H05M", 2, "2026-11-02T06:00:00"),
+    _offer(210, "PT5H", 1, "2026-11-02T09:15:00"),
+]}
+
+
+def test_iso_durations():
+    assert duration_minutes("PT2H30M") == 150
+    assert duration_minutes("P1DT2H") == 1560
+
+
+def test_presets_rank_the_whole_response():
+    offers = FlightOffers.from_response(DATA)
+
+    assert offers.rank("cheapest") == [1, 2, 0]
+    assert offers.rank("fastest", limit=1) == [0]
+    assert offers.rank("best", limit=1) == [2]
+
+
+def test_preferred_departure_time_pulls_offers_closer_to_it_up():
+    offers = FlightOffers.from_response(DATA)
+
+    assert offers.rank("best", limit=1, departure_minute=21 * 60) == [0]
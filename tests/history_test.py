@@ -0,0 +1,51 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.agents.history import SUMMARY_NAME, HistoryManager
+
+
+def _conversation(turns: int):
+    messages = []
+    for i in range(turns):
+        messages += [
+            HumanMessage(content=f"question {i} " + "word " * 200, id=f"h{i}"),
+            AIMessage(content="", id=f"c{i}", tool_calls=[{"name": "search_flight", "args": {}, "id": f"call{i}"}]),
+            ToolMessage(content="offer " * 300, tool_call_id=f"call{i}", id=f"t{i}"),
+            AIMessage(content=f"answer {i}", id=f"a{i}"),
+        ]
+    return messages
+
+
+def test_short_history_is_sent_unchanged():
+    history = HistoryManager("test", max_tokens=100_000)
+    messages = _conversation(2)
+
+    assert history.compact(messages) == messages
+    assert history.stats()["tokens_saved"] == 0
+
+
+def test_old_turns_are_summarized_under_the_budget():
+    history = HistoryManager("test", max_tokens=2000, keep_turns=2)
+    messages = _conversation(6)
+
+    compacted = history.compact(messages)
+
+    assert compacted[0].name == SUMMARY_NAME
+    assert "question 0" in compacted[0].content and "answer 3" in compacted[0].content
+    assert "offer" not in compacted[0].content
+    assert [m.id for m in compacted[1:]] == [m.id for m in messages[-8:]]
+    assert history.last_report.tokens_saved > 0
+
+
+def test_rolling_summary_only_folds_in_new_turns():
+    calls = []
+
+    def summarize(previous, messages):
+        calls.append([m.id for m in messages])
+        return (previous or "") + "|" + ",".join(m.id for m in messages)
+
+    history = HistoryManager("test", max_tokens=2000, keep_turns=2, summarize=summarize)
+    history.compact(_conversation(5))
+    compacted = history.compact(_conversation(6))
+
+    assert calls[1] == ["h3", "c3", "t3", "a3"]
+    assert "h0" in compacted[0].content
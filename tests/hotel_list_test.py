@@ -0,0 +1,31 @@
+from src.utils.hotels import HotelList
+
+
+RESPONSE = {
+    "data": [
+        {"hotelId": "FAR", "name": "Far", "geoCode": {"latitude": 48.95, "longitude": 2.35},
+         "distance": {"value": 11.1, "unit": "KM"}},
+        {"hotelId": "NEAR", "name": "Near", "geoCode": {"latitude": 48.86, "longitude": 2.35},
+         "distance": {"value": 1.2, "unit": "KM"}},
+        {"hotelId": "MID", "name": "Mid", "geoCode": {"latitude": 48.88, "longitude": 2.30},
+         "distance": {"value": 2.0, "unit": "MILE"}},
+    ]
+}
+
+
+def test_radius_filter_keeps_api_order():
+    hotels = HotelList.from_response(RESPONSE, radius_km=50)
+
+    rows = hotels.query(radius_km=5)
+
+    assert [hotels.ids[i] for i, _ in rows] == ["NEAR", "MID"]
+    assert round(rows[1][1], 2) == 3.22
+
+
+def test_sort_by_distance_to_point():
+    hotels = HotelList.from_response(RESPONSE, radius_km=50)
+
+    rows = hotels.query(radius_km=50, latitude=48.96, longitude=2.35, limit=2)
+
+    assert [hotels.ids[i] for i, _ in rows] == ["FAR", "MID"]
+    assert rows[0][1] < 2
@@ -0,0 +1,99 @@
+import asyncio
+
+import httpx
+
+from src.tools import hotels_tools
+from src.tools.hotels_tools import HotelOffer
+
+OFFER = HotelOffer(hotelids="", checkInDate="2026-12-01", checkOutDate="2026-12-03")
+IDS = [f"HOTEL{i:03d}" for i in range(45)]
+
+
+def _fake_amadeus(monkeypatch, bad=(), down=(), invalid_request=False):
+    """Stub both Amadeus clients: a chunk with a ``bad`` ID gets a 400, one with a ``down`` ID a transport error.
+
+    With ``invalid_request`` every request is rejected for its dates instead.
+    """
+    calls = []
+
+    def respond(path, params):
+        ids = params["hotelIds"].split(",")
+        calls.append(ids)
+        request = httpx.Request("GET", f"https://amadeus.test{path}")
+        if any(hotel_id in down for hotel_id in ids):
+            raise httpx.ConnectError("upstream down", request=request)
+        if invalid_request:
+            error = {"status": 400, "code": 425, "title": "INVALID DATE", "source": {"parameter": "checkInDate"}}
+            return httpx.Response(400, json={"errors": [error]}, request=request)
+        if any(hotel_id in bad for hotel_id in ids):
+            error = {"status": 400, "code": 1257, "title": "INVALID PROPERTY CODE", "source": {"parameter": "hotelIds"}}
+            return httpx.Response(400, json={"errors": [error]}, request=request)
+        data = [
+            {"hotel": {"hotelId": hotel_id, "name": hotel_id}, "offers": [{"price": {"total": str(1000 - int(hotel_id[5:]))}}]}
+            for hotel_id in ids
+        ]
+        return httpx.Response(200, json={"data": data}, request=request)
+
+    async def arespond(path, params):
+        return respond(path, params)
+
+    monkeypatch.setattr(hotels_tools, "amadeus_get", respond)
+    monkeypatch.setattr(hotels_tools, "amadeus_aget", arespond)
+    return calls
+
+
+def _fetch_both(ids):
+    """Fetch ``ids`` in chunks with the sync and the async implementation; both results must match."""
+    chunks = hotels_tools._hotel_id_chunks(",".join(ids))
+    sync = [hotels_tools._fetch_offer_chunk(OFFER, chunk) for chunk in chunks]
+
+    async def run():
+        limit = asyncio.Semaphore(hotels_tools.HOTEL_OFFERS_CONCURRENCY)
+        return await asyncio.gather(*(hotels_tools._afetch_offer_chunk(OFFER, chunk, limit) for chunk in chunks))
+
+    assert list(asyncio.run(run())) == sync
+    return sync
+
+
+def test_all_chunks_ok(monkeypatch):
+    calls = _fake_amadeus(monkeypatch)
+
+    results = _fetch_both(IDS)
+
+    assert [len(ids) for ids in calls[:3]] == [20, 20, 5]
+    offers = hotels_tools._hotel_offers_result(results)
+    assert len(offers) == 45 and "error" not in offers[-1]
+    assert offers[0]["hotel_id"] == "HOTEL044"
+
+
+def test_one_bad_id_is_isolated_by_bisecting_its_chunk(monkeypatch):
+    calls = _fake_amadeus(monkeypatch, bad={"HOTEL007"})
+
+    offers, failures = hotels_tools._merge_chunks(_fetch_both(IDS[:20]))
+
+    assert len(offers) == 19
+    assert failures == [{"hotel_ids": ["HOTEL007"], "error": "INVALID PROPERTY CODE"}]
+    # 20 -> 10 + 10 -> 5 + 5 -> 2 + 3 -> 1 + 2: 9 requests for each of the sync and async fetches.
+    assert len(calls) == 2 * 9
+
+
+def test_every_id_bad_or_unreachable(monkeypatch):
+    _fake_amadeus(monkeypatch, bad=set(IDS[:20]), down={"HOTEL020"})
+
+    offers = hotels_tools._hotel_offers_result(_fetch_both(IDS[:25]))
+
+    assert len(offers) == 1
+    assert offers[0]["error"] == "Could not fetch offers for 25 hotel IDs"
+    failed = offers[0]["failed_chunks"]
+    # Rejected IDs are narrowed down one by one; a chunk that could not be sent is reported whole.
+    assert [f["hotel_ids"] for f in failed] == [[hotel_id] for hotel_id in IDS[:20]] + [IDS[20:25]]
+    assert failed[-1]["error"] == "upstream down"
+
+
+def test_a_bad_request_is_reported_once_per_chunk_without_splitting(monkeypatch):
+    calls = _fake_amadeus(monkeypatch, invalid_request=True)
+
+    offers = hotels_tools._hotel_offers_result(_fetch_both(IDS[:40]))
+
+    assert len(calls) == 2 * 2
+    assert [(len(f["hotel_ids"]), f["error"]) for f in offers[0]["failed_chunks"]] == [(20, "INVALID DATE")] * 2
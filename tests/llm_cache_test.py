@@ -0,0 +1,42 @@
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+
+from src.utils.cache import InMemoryBackend, SQLiteBackend
+from src.utils.llm_cache import LLMCache
+
+
+def test_identical_prompts_are_served_from_the_cache():
+    cache = LLMCache("flight_agent", InMemoryBackend())
+    llm = FakeListChatModel(responses=["first", "second", "third"], cache=cache)
+
+    assert llm.invoke([HumanMessage(content="flights ALG to IST")]).content == "first"
+    assert llm.invoke([HumanMessage(content="flights ALG to IST")]).content == "first"
+    assert llm.invoke([HumanMessage(content="hotels in Paris")]).content == "second"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_model_settings_are_part_of_the_key(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "llm.sqlite"))
+    prompt = [HumanMessage(content="weather in Rome")]
+    FakeListChatModel(responses=["cold"], cache=LLMCache("a", backend)).invoke(prompt)
+
+    # Another process with the same model reads the stored answer; one with a different stop sequence does not.
+    reopened = SQLiteBackend(str(tmp_path / "llm.sqlite"))
+    same = LLMCache("a", reopened)
+    other = LLMCache("b", reopened)
+    FakeListChatModel(responses=["cold"], cache=same).invoke(prompt)
+    FakeListChatModel(responses=["cold"], cache=other).invoke(prompt, stop=["."])
+
+    assert same.stats()["hits"] == 1 and same.stats()["misses"] == 0
+    assert other.stats()["hits"] == 0 and other.stats()["misses"] == 1
+
+
+def test_empty_responses_are_not_cached():
+    cache = LLMCache("flight_agent", InMemoryBackend())
+    llm = FakeListChatModel(responses=["", "an answer", "unused"], cache=cache)
+
+    assert llm.invoke([HumanMessage(content="flights ALG to IST")]).content == ""
+    assert llm.invoke([HumanMessage(content="flights ALG to IST")]).content == "an answer"
+    assert llm.invoke([HumanMessage(content="flights ALG to IST")]).content == "an answer"
+    assert cache.stats()["misses"] == 2 and cache.stats()["hits"] == 1
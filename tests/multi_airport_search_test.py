@@ -0,0 +1,61 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.tools import search_flights
+from tests.flight_ranking_test import _offer
+
+
+def _fake_offers(queries):
+    def get(params):
+        pair = (params["originLocationCode"], params["destinationLocationCode"])
+        queries.append(pair)
+        if pair == ("JFK", "SAW"):
+            raise httpx.ConnectError("upstream down")
+        # The same AH1000 flight comes back for every pair; only the EWR-IST one is a distinct, cheaper flight.
+        offers = [_offer(500, "PT10H", 0)]
+        if pair == ("EWR", "IST"):
+            offers.append(_offer(350, "PT11H", 0, "2026-11-02T18:00:00"))
+        return {"data": offers}
+
+    return get
+
+
+def test_nearby_airports_are_the_largest_ones_with_scheduled_service():
+    assert search_flights._airports_near("jfk", 100) == ["JFK", "LGA", "EWR"]
+    assert search_flights._airports_near("LHR", 100) == ["LHR", "LGW", "LTN"]  # not Biggin Hill or RAF Northolt
+    assert search_flights._airports_near("CDG", 100) == ["CDG", "ORY", "BVA"]  # not Le Bourget
+    assert search_flights._airports_near("NRT", 100) == ["NRT", "HND", "IBR"]
+    assert search_flights._airports_near("ALG", 100) == ["ALG"]
+    assert search_flights._airports_near("PAR", 100) == ["PAR"]
+    assert search_flights._airports_near("LHR, LGW", 100) == ["LHR", "LGW"]
+    assert search_flights._airports_near(" ", 100) == []
+    with pytest.raises(ValueError):
+        search_flights._airport_pairs("", "IST", 100)
+
+
+def test_every_pair_is_searched_and_offers_are_merged_once(monkeypatch):
+    queries = []
+    get = _fake_offers(queries)
+
+    async def aget(params):
+        return get(params)
+
+    monkeypatch.setattr(search_flights, "_aget_flight_offers", aget)
+    monkeypatch.setattr(search_flights, "_airports_near", lambda code, radius: {"JFK": ["JFK", "EWR"], "IST": ["IST", "SAW"]}[code])
+
+    text = asyncio.run(search_flights._asearch_flight_multi_airport("JFK", "IST", "2026-11-02", priority="cheapest"))
+
+    assert sorted(queries) == [("EWR", "IST"), ("EWR", "SAW"), ("JFK", "IST"), ("JFK", "SAW")]
+    assert "Flight 2:" in text and "Flight 3:" not in text
+    assert text.index("350") < text.index("500")
+    assert text.endswith("Could not search: JFK-SAW (upstream down)")
+
+
+def test_offline_nearby_airports_only_list_airports_with_scheduled_service():
+    text = search_flights._local_nearby_airports(40.71, -74.0, 100)
+    codes = [line.split()[1] for line in text.splitlines()]
+
+    assert codes[:4] == ["LGA", "EWR", "JFK", "HPN"]
+    assert not {"NYS", "TEB", "LDJ", "CDW"} & set(codes)
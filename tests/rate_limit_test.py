@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import time
+
+from src.utils.rate_limit import RateLimiter, background_priority
+
+
+def test_requests_are_spaced_at_the_configured_rate():
+    limiter = RateLimiter("test", rate=50, burst=2)
+
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    elapsed = time.monotonic() - start
+
+    # Two go out at once, the other four one token (20ms) apart.
+    assert 0.07 <= elapsed < 0.5
+    assert limiter.stats()["priorities"]["interactive"]["requests"] == 6
+    assert limiter.stats()["priorities"]["interactive"]["waited"] == 4
+
+
+def test_interactive_requests_overtake_queued_background_ones():
+    limiter = RateLimiter("test", rate=20, burst=1)
+    limiter.acquire()
+    order = []
+
+    def call(priority):
+        limiter.acquire(priority)
+        order.append(priority)
+
+    background = [threading.Thread(target=call, args=("background",)) for _ in range(2)]
+    for thread in background:
+        thread.start()
+    time.sleep(0.01)
+    interactive = threading.Thread(target=call, args=("interactive",))
+    interactive.start()
+    for thread in background + [interactive]:
+        thread.join()
+
+    assert order == ["interactive", "background", "background"]
+    assert limiter.stats()["priorities"]["background"]["wait_seconds_max"] > 0.05
+
+
+def test_async_callers_take_their_priority_from_the_context():
+    limiter = RateLimiter("test", rate=20, burst=1)
+    order = []
+
+    async def refresh():
+        with background_priority():
+            await limiter.aacquire()
+        order.append("background")
+
+    async def ask():
+        await limiter.aacquire()
+        order.append("interactive")
+
+    async def main():
+        await limiter.aacquire()
+        task = asyncio.create_task(refresh())
+        await asyncio.sleep(0.01)
+        await asyncio.gather(ask(), task)
+
+    asyncio.run(main())
+
+    assert order == ["interactive", "background"]
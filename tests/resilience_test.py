@@ -0,0 +1,119 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.utils import http_client
+from src.utils.rate_limit import RateLimiter
+from src.utils.resilience import CircuitBreaker, CircuitOpenError, HttpRetryPolicy
+
+
+def _upstream(monkeypatch, host, statuses):
+    """Serve ``statuses`` in order from ``host`` (an exception instance is raised instead); returns the call log."""
+    calls = []
+    statuses = iter(statuses)
+
+    def handler(request):
+        calls.append(request.url.path)
+        status = next(statuses)
+        if isinstance(status, Exception):
+            raise status
+        return httpx.Response(status, json={})
+
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setitem(http_client._clients, f"https://{host}", httpx.Client(transport=transport))
+    monkeypatch.setattr(http_client, "HTTP_RETRY", HttpRetryPolicy(max_attempts=3, backoff=0))
+    return calls
+
+
+def test_429_and_5xx_are_retried_but_4xx_are_not(monkeypatch):
+    calls = _upstream(monkeypatch, "retry.test", [429, 503, 200, 404])
+
+    assert http_client.http_get("https://retry.test/a").status_code == 200
+    assert http_client.http_get("https://retry.test/b").status_code == 404
+    assert calls == ["/a", "/a", "/a", "/b"]
+
+
+def test_breaker_opens_after_repeated_failures_and_fails_fast(monkeypatch):
+    calls = _upstream(monkeypatch, "down.test", [httpx.ConnectTimeout("timed out")] * 3 + [500] * 3)
+    monkeypatch.setitem(http_client._breakers, "down.test", CircuitBreaker("down.test", failure_threshold=5, reset_timeout=60))
+
+    with pytest.raises(httpx.ConnectTimeout):
+        http_client.http_get("https://down.test/x")
+    assert http_client.http_get("https://down.test/x").status_code == 500
+    with pytest.raises(CircuitOpenError):
+        http_client.http_get("https://down.test/x")
+
+    # The fifth failure opened the breaker: the second call returned that response, and the third never went out.
+    assert len(calls) == 5
+    stats = http_client.breaker_stats()["down.test"]
+    assert stats["state"] == "open" and stats["rejected"] == 1 and stats["last_error"] == "HTTP 500"
+
+
+def test_half_open_breaker_lets_one_trial_through_and_closes_on_success():
+    breaker = CircuitBreaker("flaky.test", failure_threshold=1, reset_timeout=0.05)
+    breaker.record(False, "HTTP 503")
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+    time.sleep(0.06)
+    breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record(True)
+
+    assert breaker.stats()["state"] == "closed"
+    breaker.allow()
+
+
+def test_endpoint_timeouts_match_the_longest_prefix():
+    assert http_client.endpoint_timeout("https://test.api.amadeus.com/v2/shopping/flight-offers?max=5").read == 30.0
+    assert http_client.endpoint_timeout("https://test.api.amadeus.com/v1/reference-data/locations").read == 10.0
+    assert http_client.endpoint_timeout("https://example.com/") is http_client.DEFAULT_TIMEOUT
+
+
+def test_async_requests_share_the_breaker(monkeypatch):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(502)
+
+    monkeypatch.setattr(http_client, "HTTP_RETRY", HttpRetryPolicy(max_attempts=2, backoff=0))
+    monkeypatch.setitem(http_client._breakers, "async.test", CircuitBreaker("async.test", failure_threshold=2))
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        http_client._async_clients[loop] = {"https://async.test": httpx.AsyncClient(transport=httpx.MockTransport(handler))}
+        response = await http_client.ahttp_get("https://async.test/y")
+        with pytest.raises(CircuitOpenError):
+            await http_client.ahttp_get("https://async.test/y")
+        await http_client.aclose_http_clients()
+        return response
+
+    assert asyncio.run(main()).status_code == 502
+    assert calls == ["/y", "/y"]
+
+
+class SlowBucket:
+    """Token bucket that makes the first caller wait 0.1s."""
+
+    def __init__(self):
+        self.waits = [0.1]
+
+    def take(self, need):
+        return self.waits.pop() if self.waits else 0.0
+
+
+def test_breaker_is_checked_after_waiting_for_the_rate_limiter(monkeypatch):
+    calls = _upstream(monkeypatch, "queued.test", [200])
+    breaker = CircuitBreaker("queued.test", failure_threshold=1, reset_timeout=0.05)
+    breaker.record(False, "HTTP 503")
+    monkeypatch.setitem(http_client._breakers, "queued.test", breaker)
+
+    # The breaker is open when the request queues, and half-open by the time its turn comes.
+    response = http_client.http_get("https://queued.test/z", limiter=RateLimiter("queued", rate=10, burst=1, bucket=SlowBucket()))
+
+    assert response.status_code == 200 and calls == ["/z"]
+    assert breaker.stats()["state"] == "closed" and breaker.stats()["rejected"] == 0
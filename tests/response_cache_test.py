@@ -0,0 +1,45 @@
+import time
+
+from src.utils.cache import CacheEntry, InMemoryBackend, ResponseCache
+
+
+def test_hit_after_miss_and_counters():
+    cache = ResponseCache("test", InMemoryBackend(), ttl=60, stale_ttl=60)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"data": [1, 2, 3]}
+
+    assert cache.get_or_fetch("ALG:IST", fetch) == {"data": [1, 2, 3]}
+    assert cache.get_or_fetch("ALG:IST", fetch) == {"data": [1, 2, 3]}
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_bound_evicts_least_recently_used():
+    backend = InMemoryBackend(max_entries=2)
+    now = time.time()
+    backend.set("a", CacheEntry("A", now), ttl=60)
+    backend.set("b", CacheEntry("B", now), ttl=60)
+    backend.get("a")
+    backend.set("c", CacheEntry("C", now), ttl=60)
+
+    assert backend.get("b") is None
+    assert backend.get("a").value == "A"
+    assert len(backend) == 2
+
+
+def test_stale_entry_is_served_and_refreshed_in_background():
+    backend = InMemoryBackend()
+    cache = ResponseCache("test", backend, ttl=10, stale_ttl=60)
+    backend.set("test:key", CacheEntry("old", time.time() - 20), ttl=70)
+
+    assert cache.get_or_fetch("key", lambda: "new") == "old"
+
+    deadline = time.monotonic() + 2
+    while backend.get("test:key").value != "new" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert backend.get("test:key").value == "new"
+    assert cache.stats()["stale_hits"] == 1
@@ -0,0 +1,34 @@
+from src.utils.shaping import ResultShape, approx_tokens
+
+OFFERS = [
+    {"hotel_name": f"Hotel {i}", "price": {"total": f"{100 + i}.00"}, "description": "Large room " * 40,
+     "booking_link": "https://api.example.com/offers/" + "x" * 60}
+    for i in range(50)
+]
+
+
+def test_only_whitelisted_fields_are_rendered_as_csv():
+    shape = ResultShape("offers", fields=("hotel_name", "price.total"), headers=("hotel", "price"))
+
+    lines = shape.render(OFFERS[:2]).splitlines()
+
+    assert lines == ["hotel,price", "Hotel 0,100.00", "Hotel 1,101.00"]
+
+
+def test_rows_stop_at_the_token_budget_with_a_marker():
+    shape = ResultShape("offers", fields=("hotel_name", "price.total", "description"), max_tokens=200, max_cell_chars=60)
+
+    text = shape.render(OFFERS)
+    rows = text.splitlines()[1:-1]
+
+    assert approx_tokens(text) <= 200 + 20
+    assert text.splitlines()[-1].startswith(f"… {50 - len(rows)} more results available")
+    assert all(len(row) < 100 for row in rows)
+
+
+def test_error_records_are_listed_after_the_table():
+    shape = ResultShape("offers", fields=("hotel_name",))
+
+    text = shape.render(OFFERS[:1] + [{"error": "Could not fetch offers for 3 hotel IDs"}])
+
+    assert text.splitlines() == ["hotel_name", "Hotel 0", 'Error: {"error": "Could not fetch offers for 3 hotel IDs"}']
@@ -0,0 +1,38 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Seconds allowed for `import backend.app.main` in a fresh interpreter; it took ~4s when agents were built at import.
+IMPORT_BUDGET_S = float(os.getenv("STARTUP_IMPORT_BUDGET", 3.0))
+
+MEASURE = """
+import json, sys, time
+start = time.perf_counter()
+import backend.app.main
+print(json.dumps({
+    "seconds": time.perf_counter() - start,
+    "loaded": sorted(m for m in sys.modules if m.startswith(("src.tools", "langchain_together", "langchain_tavily"))
+                     or m in ("src.agents.flight_agent", "src.agents.hotels_agent",
+                              "src.agents.destination_agent", "src.agents.team_agent")),
+}))
+"""
+
+
+def _import_main() -> dict:
+    # No API keys: importing the app must not need them, nor make network calls.
+    env = {k: v for k, v in os.environ.items() if not k.endswith(("_API_KEY", "_MODEL_ID"))}
+    env["PYTHONPATH"] = str(ROOT)
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE], cwd=ROOT, env=env, capture_output=True, text=True, timeout=120, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_app_import_is_fast_and_builds_no_agents():
+    runs = [_import_main() for _ in range(2)]
+
+    assert runs[0]["loaded"] == []
+    assert min(run["seconds"] for run in runs) < IMPORT_BUDGET_S
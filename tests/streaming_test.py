@@ -0,0 +1,64 @@
+import asyncio
+import json
+import logging
+
+from langchain_core.messages import AIMessageChunk, ToolMessage
+
+from backend.app.core.streaming import STREAM_ERROR_MESSAGE, stream_graph_events
+
+EVENTS = [
+    {"event": "on_chat_model_stream", "metadata": {"langgraph_node": "supervisor"},
+     "data": {"chunk": AIMessageChunk(content="route to flights")}},
+    {"event": "on_chat_model_stream", "metadata": {"langgraph_node": "assistant"},
+     "data": {"chunk": AIMessageChunk(content="Looking")}},
+    {"event": "on_tool_start", "name": "search_flight", "data": {"input": {"origin": "ALG"}}},
+    {"event": "on_tool_end", "name": "search_flight", "data": {"output": ToolMessage(content="x" * 600, tool_call_id="1")}},
+]
+
+
+class FakeGraph:
+    def __init__(self, events, error=None):
+        self.events = events
+        self.error = error
+
+    async def astream_events(self, state, config, version):
+        for event in self.events:
+            yield event
+        if self.error is not None:
+            raise self.error
+
+
+def _stream(graph):
+    async def on_complete(final_state):
+        return {"response": final_state["answer"]}
+
+    async def run():
+        config = {"configurable": {"thread_id": "t1"}}
+        return [event async for event in stream_graph_events(graph, {}, config, on_complete)]
+
+    return [
+        (lines[0].removeprefix("event: "), json.loads(lines[1].removeprefix("data: ")))
+        for lines in (event.strip().split("\n") for event in asyncio.run(run()))
+    ]
+
+
+def test_events_are_translated_and_the_final_state_is_completed():
+    final = {"event": "on_chain_end", "parent_ids": [], "data": {"output": {"answer": "ALG-IST at 9:00"}}}
+
+    events = _stream(FakeGraph(EVENTS + [final]))
+
+    assert [name for name, _ in events] == ["token", "tool_start", "tool_end", "final"]
+    assert events[0][1] == {"content": "Looking", "node": "assistant"}
+    assert len(events[2][1]["output"]) == 500
+    assert events[3][1] == {"response": "ALG-IST at 9:00"}
+
+
+def test_a_failure_is_logged_and_reported_without_its_details(caplog):
+    error = RuntimeError("POST https://api.example.com/?key=secret failed")
+
+    with caplog.at_level(logging.ERROR, logger="backend.app.core.streaming"):
+        events = _stream(FakeGraph(EVENTS, error))
+
+    assert [name for name, _ in events] == ["token", "tool_start", "tool_end", "error"]
+    assert events[-1][1] == {"error": STREAM_ERROR_MESSAGE, "type": "RuntimeError"}
+    assert "secret" in caplog.text and "t1" in caplog.text
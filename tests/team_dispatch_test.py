@@ -0,0 +1,70 @@
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.types import Command
+
+from src.agents import team_agent
+from src.agents.agent_utils import GIVE_UP_ANSWER, worker_update
+
+
+def _stub_team(monkeypatch, plans, answers):
+    """Team graph whose router returns ``plans`` in turn and whose workers reply from ``answers``; returns the call log."""
+    calls = []
+    plans = iter(plans)
+    monkeypatch.setattr(team_agent, "_fast_path", lambda state: None)
+    monkeypatch.setattr(team_agent, "router_llm", lambda: RunnableLambda(
+        lambda messages: {"workers": next(plans), "reasoning": "stub"}))
+
+    def worker(name):
+        def run(state, config=None):
+            calls.append(name)
+            answer = AIMessage(content=answers[name].pop(0))
+            return Command(update=worker_update(state, {"messages": state["messages"] + [answer]}, name), goto="supervisor")
+
+        async def arun(state, config=None):
+            return run(state, config)
+
+        return run, arun
+
+    for name in team_agent.WORKER_SECTIONS:
+        run, arun = worker(name)
+        monkeypatch.setattr(team_agent, name, run)
+        monkeypatch.setattr(team_agent, f"a{name}", arun)
+    return team_agent.build_team_agent().graph, calls
+
+
+def _ask(graph, mode, thread_id):
+    config = {"configurable": {"thread_id": thread_id, "dispatch_mode": mode}}
+    return graph.invoke({"messages": [HumanMessage(content="Plan a week in Rome")]}, config)
+
+
+def test_parallel_dispatch_merges_every_answer_in_section_order(monkeypatch):
+    graph, calls = _stub_team(monkeypatch, [["destination_agent", "hotel_agent", "flight_agent"]], {
+        "flight_node": [GIVE_UP_ANSWER],
+        "hotel_node": ["Hotel Roma, 120 EUR"],
+        "destination_node": ["See the Colosseum"],
+    })
+
+    result = _ask(graph, "parallel", "t-parallel")
+
+    assert sorted(calls) == ["destination_node", "flight_node", "hotel_node"]
+    reply = result["messages"][-1]
+    assert reply.name == "team_merge"
+    headings = [line for line in reply.content.splitlines() if line.startswith("## ")]
+    assert headings == [f"## {section}" for section in team_agent.WORKER_SECTIONS.values()]
+    assert [msg.name for msg in result["messages"]].count("team_merge") == 1
+    # The failed flight branch is reported in its own section and does not drop the others.
+    assert GIVE_UP_ANSWER in reply.content and "Hotel Roma" in reply.content and "Colosseum" in reply.content
+
+
+def test_sequential_plan_is_remade_only_after_a_flagged_failure(monkeypatch):
+    graph, calls = _stub_team(monkeypatch, [["flight_agent", "hotel_agent"], ["flight_agent"]], {
+        "flight_node": [GIVE_UP_ANSWER, "Error-free itinerary: no results were missing"],
+        "hotel_node": [],
+    })
+
+    result = _ask(graph, "sequential", "t-sequential")
+
+    # The give-up answer made the router re-plan; the wording of the second answer did not.
+    assert calls == ["flight_node", "flight_node"]
+    assert result["replans"] == 1 and result["worker_failed"] is False
+    assert result["messages"][-1].content.startswith("Error-free itinerary")